@@ -0,0 +1,70 @@
+"""
+Alembic environment
+Migrációk futtatása az alkalmazás beállításaival
+"""
+
+from logging.config import fileConfig
+from pathlib import Path
+import sys
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+# A backend könyvtár importálhatóvá tétele (alembic.ini a repo gyökerében van)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config.settings import settings  # noqa: E402
+from app.config.database import Base  # noqa: E402
+from app import models  # noqa: E402,F401
+
+config = context.config
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Materializált nézetek modelljei kimaradnak az autogenerate-ből"""
+    return not (type_ == "table" and object.info.get("is_view"))
+
+
+def run_migrations_offline():
+    """Migrációk SQL szkriptként (adatbázis kapcsolat nélkül)"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Migrációk futtatása élő adatbázis kapcsolaton"""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object
+        )
+        
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,41 @@
+"""keyset pagination indexes
+
+Összetett (created_at, id) indexek a cursor alapú lapozáshoz:
+általános lista, kategória lista és ellenőrzésre váró állások.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY nem futhat tranzakcióban, így nem zároljuk a jobs táblát
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_active_created_id "
+            "ON jobs (created_at DESC, id DESC) WHERE active"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_category_created_id "
+            "ON jobs (category_id, created_at DESC, id DESC) WHERE active"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_pending_created_id "
+            "ON jobs (created_at DESC, id DESC) WHERE active AND NOT verified"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_jobs_pending_created_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_jobs_category_created_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_jobs_active_created_id")
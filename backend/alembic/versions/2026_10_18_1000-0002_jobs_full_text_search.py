@@ -0,0 +1,61 @@
+"""jobs full text search
+
+Generált tsvector oszlop (cím, cég, leírás súlyozva) magyar szótővel és
+ékezet-összevonással (unaccent), valamint GIN index a kereséshez.
+
+Figyelem: a STORED generált oszlop hozzáadása újraírja a jobs táblát,
+ezért karbantartási ablakban futtassuk.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    
+    # hungarian konfiguráció másolata, ahol a szótövezés előtt unaccent fut
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'hungarian_unaccent') THEN
+                CREATE TEXT SEARCH CONFIGURATION hungarian_unaccent (COPY = hungarian);
+                ALTER TEXT SEARCH CONFIGURATION hungarian_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word
+                    WITH unaccent, hungarian_stem;
+            END IF;
+        END
+        $$
+    """)
+    
+    op.execute("""
+        ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('hungarian_unaccent', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('hungarian_unaccent', coalesce(company, '')), 'B') ||
+            setweight(to_tsvector('hungarian_unaccent', coalesce(description, '')), 'C')
+        ) STORED
+    """)
+    
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_search_vector "
+            "ON jobs USING gin (search_vector)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_jobs_search_vector")
+    
+    op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS hungarian_unaccent")
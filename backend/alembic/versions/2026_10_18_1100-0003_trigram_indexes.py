@@ -0,0 +1,42 @@
+"""trigram indexes
+
+pg_trgm GIN indexek a részszöveges (ILIKE '%x%') és elgépelés-tűrő
+(word_similarity) szűrésekhez: jobs.title, jobs.location és
+salary_statistics.job_title.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (index neve, tábla, oszlop)
+INDEXES = [
+    ("idx_jobs_title_trgm", "jobs", "title"),
+    ("idx_jobs_location_trgm", "jobs", "location"),
+    ("idx_salary_stats_title_trgm", "salary_statistics", "job_title"),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,63 @@
+"""jobs source unique index
+
+Egyedi (source_portal, source_url) index a tömeges betöltés upsertjéhez
+(INSERT ... ON CONFLICT). A meglévő duplikátumok közül a legújabb marad
+érvényes; a többi nem törlődik, hanem inaktív lesz és a source_url-je
+NULL (a részleges index nem veszi figyelembe). Az eredeti értékeket a
+jobs_source_duplicates tábla őrzi, a downgrade ebből állítja vissza.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE jobs_source_duplicates AS
+        SELECT id, source_url, active
+        FROM (
+            SELECT
+                id, source_url, active,
+                row_number() OVER (
+                    PARTITION BY source_portal, source_url
+                    ORDER BY created_at DESC, id DESC
+                ) AS rn
+            FROM jobs
+            WHERE source_url IS NOT NULL
+        ) ranked
+        WHERE rn > 1
+    """)
+    op.execute("ALTER TABLE jobs_source_duplicates ADD PRIMARY KEY (id)")
+    op.execute("""
+        UPDATE jobs SET active = false, source_url = NULL
+        FROM jobs_source_duplicates d
+        WHERE jobs.id = d.id
+    """)
+    
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_jobs_source "
+            "ON jobs (source_portal, source_url) WHERE source_url IS NOT NULL"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_jobs_source")
+    
+    # A még meglévő duplikátumok eredeti állapota
+    op.execute("""
+        UPDATE jobs SET active = d.active, source_url = d.source_url
+        FROM jobs_source_duplicates d
+        WHERE jobs.id = d.id
+    """)
+    op.execute("DROP TABLE jobs_source_duplicates")
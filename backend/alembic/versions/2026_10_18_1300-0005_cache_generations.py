@@ -0,0 +1,32 @@
+"""cache generations
+
+Cache generáció számlálók: a több uvicorn worker egy olcsó lekérdezéssel
+észreveszi, ha egy másik worker módosította a cache-elt adatokat.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 13:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cache_generations",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("generation", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.execute("INSERT INTO cache_generations (name) VALUES ('categories')")
+
+
+def downgrade():
+    op.drop_table("cache_generations")
@@ -0,0 +1,98 @@
+"""category materialized path
+
+Materializált útvonal a kategória fához ('/<gyökér id>/<szülő id>/<id>/'):
+egy részfa egyetlen prefix (LIKE 'útvonal%') feltétellel lekérdezhető.
+Az útvonalat triggerek tartják karban beszúráskor és áthelyezéskor
+(a leszármazottaké is frissül), körkörös hivatkozás esetén hibát dobnak.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 14:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("categories", sa.Column("path", sa.Text))
+    
+    op.execute("""
+        WITH RECURSIVE tree AS (
+            SELECT id, '/' || id || '/' AS path
+            FROM categories
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT c.id, tree.path || c.id || '/'
+            FROM categories c
+            JOIN tree ON c.parent_id = tree.id
+        )
+        UPDATE categories SET path = tree.path
+        FROM tree
+        WHERE categories.id = tree.id
+    """)
+    op.alter_column("categories", "path", nullable=False)
+    
+    op.execute("""
+        CREATE OR REPLACE FUNCTION categories_set_path() RETURNS trigger AS $$
+        DECLARE
+            parent_path TEXT;
+        BEGIN
+            IF NEW.parent_id IS NULL THEN
+                NEW.path := '/' || NEW.id || '/';
+            ELSE
+                SELECT path INTO parent_path FROM categories WHERE id = NEW.parent_id;
+                IF parent_path IS NULL THEN
+                    RAISE EXCEPTION 'Parent category % does not exist', NEW.parent_id;
+                END IF;
+                IF parent_path LIKE '%/' || NEW.id || '/%' THEN
+                    RAISE EXCEPTION 'Category % cannot be moved under its own subtree', NEW.id;
+                END IF;
+                NEW.path := parent_path || NEW.id || '/';
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION categories_move_subtree() RETURNS trigger AS $$
+        BEGIN
+            UPDATE categories
+            SET path = NEW.path || substr(path, length(OLD.path) + 1)
+            WHERE path LIKE OLD.path || '%' AND id <> NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_categories_set_path
+        BEFORE INSERT OR UPDATE OF parent_id ON categories
+        FOR EACH ROW EXECUTE FUNCTION categories_set_path()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_categories_move_subtree
+        AFTER UPDATE OF parent_id ON categories
+        FOR EACH ROW
+        WHEN (OLD.path IS DISTINCT FROM NEW.path)
+        EXECUTE FUNCTION categories_move_subtree()
+    """)
+    
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_categories_path "
+        "ON categories (path text_pattern_ops)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_categories_path")
+    op.execute("DROP TRIGGER IF EXISTS trg_categories_move_subtree ON categories")
+    op.execute("DROP TRIGGER IF EXISTS trg_categories_set_path ON categories")
+    op.execute("DROP FUNCTION IF EXISTS categories_move_subtree()")
+    op.execute("DROP FUNCTION IF EXISTS categories_set_path()")
+    op.drop_column("categories", "path")
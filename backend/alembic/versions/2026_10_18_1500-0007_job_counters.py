@@ -0,0 +1,113 @@
+"""job counters
+
+Denormalizált állásszámlálók kategóriánként és portálonként
+(aktív / ellenőrzött / ellenőrzésre váró). Utasítás szintű triggerek
+tartják karban a jobs tábla változásai alapján (transition table-ökkel,
+így egy tömeges betöltés kategóriánként egyetlen számláló frissítés).
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 15:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Egy állás hozzájárulása a számlálókhoz: (scope, key) párok, NULL helyett ''
+COUNTER_DELTAS = """
+    SELECT k.scope, k.key,
+           sum(d.sign * (d.active IS TRUE)::int) AS active_count,
+           sum(d.sign * (d.active IS TRUE AND d.verified IS TRUE)::int) AS verified_count,
+           sum(d.sign * (d.active IS TRUE AND d.verified IS FALSE)::int) AS pending_count
+    FROM (%s) d
+    CROSS JOIN LATERAL (VALUES
+        ('category', coalesce(d.category_id::text, '')),
+        ('portal', coalesce(d.source_portal, ''))
+    ) AS k(scope, key)
+    GROUP BY k.scope, k.key
+"""
+
+
+def upgrade():
+    op.create_table(
+        "job_counters",
+        sa.Column("scope", sa.String(20), primary_key=True),
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("active_count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("verified_count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("pending_count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    
+    op.execute(
+        "INSERT INTO job_counters (scope, key, active_count, verified_count, pending_count) "
+        + COUNTER_DELTAS % "SELECT 1 AS sign, category_id, source_portal, active, verified FROM jobs"
+    )
+    
+    # A delták kulcs szerint rendezve kerülnek be: párhuzamos tranzakciók
+    # azonos sorrendben zárolják a számláló sorokat (nincs deadlock)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION job_counters_apply() RETURNS trigger AS $$
+        DECLARE
+            source TEXT;
+        BEGIN
+            source := CASE TG_OP
+                WHEN 'INSERT' THEN
+                    'SELECT 1 AS sign, category_id, source_portal, active, verified FROM new_jobs'
+                WHEN 'DELETE' THEN
+                    'SELECT -1 AS sign, category_id, source_portal, active, verified FROM old_jobs'
+                ELSE
+                    'SELECT 1 AS sign, category_id, source_portal, active, verified FROM new_jobs '
+                    || 'UNION ALL '
+                    || 'SELECT -1 AS sign, category_id, source_portal, active, verified FROM old_jobs'
+            END;
+            
+            EXECUTE format($q$
+                INSERT INTO job_counters AS c
+                    (scope, key, active_count, verified_count, pending_count, updated_at)
+                SELECT scope, key, active_count, verified_count, pending_count, now()
+                FROM (""" + COUNTER_DELTAS + """) deltas
+                WHERE active_count <> 0 OR verified_count <> 0 OR pending_count <> 0
+                ORDER BY scope, key
+                ON CONFLICT (scope, key) DO UPDATE SET
+                    active_count = c.active_count + EXCLUDED.active_count,
+                    verified_count = c.verified_count + EXCLUDED.verified_count,
+                    pending_count = c.pending_count + EXCLUDED.pending_count,
+                    updated_at = now()
+            $q$, source);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_job_counters_insert
+        AFTER INSERT ON jobs
+        REFERENCING NEW TABLE AS new_jobs
+        FOR EACH STATEMENT EXECUTE FUNCTION job_counters_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_job_counters_update
+        AFTER UPDATE ON jobs
+        REFERENCING OLD TABLE AS old_jobs NEW TABLE AS new_jobs
+        FOR EACH STATEMENT EXECUTE FUNCTION job_counters_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_job_counters_delete
+        AFTER DELETE ON jobs
+        REFERENCING OLD TABLE AS old_jobs
+        FOR EACH STATEMENT EXECUTE FUNCTION job_counters_apply()
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_job_counters_delete ON jobs")
+    op.execute("DROP TRIGGER IF EXISTS trg_job_counters_update ON jobs")
+    op.execute("DROP TRIGGER IF EXISTS trg_job_counters_insert ON jobs")
+    op.execute("DROP FUNCTION IF EXISTS job_counters_apply()")
+    op.drop_table("job_counters")
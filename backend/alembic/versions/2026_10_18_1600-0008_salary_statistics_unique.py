@@ -0,0 +1,51 @@
+"""salary statistics unique key
+
+Egyedi (job_title, location, experience_level) kulcs a statisztikák
+egy utasításos upsertjéhez (INSERT ... ON CONFLICT). A NULL értékek
+coalesce-szel szerepelnek, így a csak munkakör szerinti sor is egyedi.
+
+Az init.sql update_salary_statistics_updated_at triggere egy nem létező
+updated_at oszlopot állít, ezért minden UPDATE hibát dobott: eltávolítjuk
+(a last_updated értékét az upsert állítja).
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 16:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("DROP TRIGGER IF EXISTS update_salary_statistics_updated_at ON salary_statistics")
+    
+    op.execute("""
+        DELETE FROM salary_statistics
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT
+                    id,
+                    row_number() OVER (
+                        PARTITION BY job_title, coalesce(location, ''), coalesce(experience_level, '')
+                        ORDER BY last_updated DESC NULLS LAST, id DESC
+                    ) AS rn
+                FROM salary_statistics
+            ) ranked
+            WHERE rn > 1
+        )
+    """)
+    
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_salary_statistics_key ON salary_statistics "
+        "(job_title, (coalesce(location, '')), (coalesce(experience_level, '')))"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS uq_salary_statistics_key")
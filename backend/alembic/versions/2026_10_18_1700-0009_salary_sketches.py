@@ -0,0 +1,195 @@
+"""salary sketches
+
+Összevonható kvantilis vázlat (DDSketch jellegű logaritmikus vödrök) a
+fizetésekhez, csoportonként (munkakör, helyszín, tapasztalat, kategória).
+Egy vödör a [gamma^(i-1), gamma^i) tartomány darabszámát és összegét tárolja,
+így bármely kvantilis legfeljebb ~1% relatív hibával becsülhető, a vázlatok
+vödrönkénti összeadással összevonhatók, és törléskor csökkenthetők.
+
+A jobs táblán utasítás szintű triggerek tartják karban (transition
+table-ökkel, mint a job_counters-t), és ugyanabban az utasításban
+frissítik az érintett munkakörök salary_statistics sorait.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 17:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# Relatív pontosság 1%: gamma = (1 + 0.01) / (1 - 0.01)
+SKETCH_GAMMA = 1.0202020202020203
+
+# Egy állás hozzájárulása a vázlathoz (aktív, pozitív salary_min), NULL helyett ''
+SKETCH_DELTAS = """
+    SELECT d.title AS job_title,
+           coalesce(d.location, '') AS location,
+           coalesce(d.experience_level, '') AS experience_level,
+           coalesce(d.category_id::text, '') AS category_key,
+           salary_sketch_bucket(d.salary_min) AS bucket,
+           sum(d.sign) AS count,
+           sum(d.sign * d.salary_min::bigint) AS total
+    FROM (%s) d
+    WHERE d.active IS TRUE AND d.salary_min > 0
+    GROUP BY 1, 2, 3, 4, 5
+"""
+
+SKETCH_SOURCE_COLUMNS = "title, location, experience_level, category_id, salary_min, active"
+
+
+def upgrade():
+    op.create_table(
+        "salary_sketches",
+        sa.Column("job_title", sa.String(255), primary_key=True),
+        sa.Column("location", sa.String(255), primary_key=True),
+        sa.Column("experience_level", sa.String(50), primary_key=True),
+        sa.Column("category_key", sa.String(36), primary_key=True),
+        sa.Column("bucket", sa.Integer, primary_key=True),
+        sa.Column("count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("total", sa.BigInteger, nullable=False, server_default="0"),
+    )
+    
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION salary_sketch_bucket(salary INTEGER) RETURNS INTEGER AS $$
+            SELECT ceil(ln(salary) / ln({SKETCH_GAMMA}))::int
+        $$ LANGUAGE sql IMMUTABLE STRICT
+    """)
+    
+    # Munkakörönkénti statisztika a vázlatok összevonásával; a
+    # MIN_SAMPLE_SIZE (3) alatti munkakörök sora törlődik
+    op.execute("""
+        CREATE OR REPLACE FUNCTION salary_sketch_refresh(titles TEXT[]) RETURNS void AS $$
+            WITH merged AS (
+                SELECT job_title, bucket, sum(count) AS cnt, sum(total) AS total
+                FROM salary_sketches
+                WHERE job_title = ANY(titles) AND count > 0
+                GROUP BY job_title, bucket
+            ), ranked AS (
+                SELECT job_title, cnt, total,
+                       total::float8 / cnt AS value,
+                       sum(cnt) OVER (PARTITION BY job_title ORDER BY bucket) AS cum,
+                       sum(cnt) OVER (PARTITION BY job_title) AS n
+                FROM merged
+            )
+            INSERT INTO salary_statistics AS s (
+                job_title, avg_salary, median_salary, min_salary, max_salary,
+                percentile_25, percentile_75, sample_size, last_updated, created_at
+            )
+            SELECT job_title,
+                   sum(total)::float8 / sum(cnt),
+                   min(value) FILTER (WHERE cum > floor(0.5 * (n - 1))),
+                   min(value),
+                   max(value),
+                   min(value) FILTER (WHERE cum > floor(0.25 * (n - 1))),
+                   min(value) FILTER (WHERE cum > floor(0.75 * (n - 1))),
+                   sum(cnt),
+                   timezone('utc', now()),
+                   timezone('utc', now())
+            FROM ranked
+            GROUP BY job_title
+            HAVING sum(cnt) >= 3
+            ON CONFLICT (job_title, (coalesce(location, '')), (coalesce(experience_level, '')))
+            DO UPDATE SET
+                avg_salary = EXCLUDED.avg_salary,
+                median_salary = EXCLUDED.median_salary,
+                min_salary = EXCLUDED.min_salary,
+                max_salary = EXCLUDED.max_salary,
+                percentile_25 = EXCLUDED.percentile_25,
+                percentile_75 = EXCLUDED.percentile_75,
+                sample_size = EXCLUDED.sample_size,
+                last_updated = EXCLUDED.last_updated;
+            
+            DELETE FROM salary_statistics
+            WHERE job_title = ANY(titles)
+              AND location IS NULL
+              AND experience_level IS NULL
+              AND coalesce((
+                  SELECT sum(count) FROM salary_sketches k WHERE k.job_title = salary_statistics.job_title
+              ), 0) < 3;
+        $$ LANGUAGE sql
+    """)
+    
+    op.execute(
+        "INSERT INTO salary_sketches "
+        "(job_title, location, experience_level, category_key, bucket, count, total) "
+        + SKETCH_DELTAS % f"SELECT 1 AS sign, {SKETCH_SOURCE_COLUMNS} FROM jobs"
+    )
+    
+    # Delták kulcs szerint rendezve (azonos zárolási sorrend), majd az
+    # érintett munkakörök statisztikájának frissítése
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION salary_sketches_apply() RETURNS trigger AS $$
+        DECLARE
+            source TEXT;
+            titles TEXT[];
+        BEGIN
+            source := CASE TG_OP
+                WHEN 'INSERT' THEN
+                    'SELECT 1 AS sign, {SKETCH_SOURCE_COLUMNS} FROM new_jobs'
+                WHEN 'DELETE' THEN
+                    'SELECT -1 AS sign, {SKETCH_SOURCE_COLUMNS} FROM old_jobs'
+                ELSE
+                    'SELECT 1 AS sign, {SKETCH_SOURCE_COLUMNS} FROM new_jobs '
+                    || 'UNION ALL '
+                    || 'SELECT -1 AS sign, {SKETCH_SOURCE_COLUMNS} FROM old_jobs'
+            END;
+            
+            EXECUTE format($q$
+                WITH upserted AS (
+                    INSERT INTO salary_sketches AS s
+                        (job_title, location, experience_level, category_key, bucket, count, total)
+                    SELECT * FROM ({SKETCH_DELTAS}) deltas
+                    WHERE count <> 0 OR total <> 0
+                    ORDER BY 1, 2, 3, 4, 5
+                    ON CONFLICT (job_title, location, experience_level, category_key, bucket)
+                    DO UPDATE SET
+                        count = s.count + EXCLUDED.count,
+                        total = s.total + EXCLUDED.total
+                    RETURNING job_title
+                )
+                SELECT array_agg(DISTINCT job_title) FROM upserted
+            $q$, source) INTO titles;
+            
+            IF titles IS NOT NULL THEN
+                DELETE FROM salary_sketches WHERE job_title = ANY(titles) AND count = 0;
+                PERFORM salary_sketch_refresh(titles);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_salary_sketches_insert
+        AFTER INSERT ON jobs
+        REFERENCING NEW TABLE AS new_jobs
+        FOR EACH STATEMENT EXECUTE FUNCTION salary_sketches_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_salary_sketches_update
+        AFTER UPDATE ON jobs
+        REFERENCING OLD TABLE AS old_jobs NEW TABLE AS new_jobs
+        FOR EACH STATEMENT EXECUTE FUNCTION salary_sketches_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_salary_sketches_delete
+        AFTER DELETE ON jobs
+        REFERENCING OLD TABLE AS old_jobs
+        FOR EACH STATEMENT EXECUTE FUNCTION salary_sketches_apply()
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_salary_sketches_delete ON jobs")
+    op.execute("DROP TRIGGER IF EXISTS trg_salary_sketches_update ON jobs")
+    op.execute("DROP TRIGGER IF EXISTS trg_salary_sketches_insert ON jobs")
+    op.execute("DROP FUNCTION IF EXISTS salary_sketches_apply()")
+    op.execute("DROP FUNCTION IF EXISTS salary_sketch_refresh(TEXT[])")
+    op.drop_table("salary_sketches")
+    op.execute("DROP FUNCTION IF EXISTS salary_sketch_bucket(INTEGER)")
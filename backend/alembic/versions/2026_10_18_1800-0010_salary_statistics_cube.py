@@ -0,0 +1,173 @@
+"""salary statistics cube
+
+A salary_statistics munkakörönként a (helyszín, tapasztalat, kategória)
+dimenziók teljes kockáját tárolja (GROUP BY munkakör, CUBE(...)): NULL
+dimenzió az "összes" szintet jelenti (pl. munkakör minden helyszínen).
+Ismeretlen (NULL / '') értékű állások csak az összesített szintekben
+szerepelnek.
+
+- az egyedi kulcs a kategóriával bővül, így bármely szűrőkombináció
+  egyetlen indexelt sor
+- a vázlatokból frissítő salary_sketch_refresh() a teljes kockát
+  számolja az érintett munkakörökre, és törli a MIN_SAMPLE_SIZE (3) alá
+  került cellákat
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 18:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+STATISTICS_COLUMNS = """
+    job_title, location, experience_level, category_id, avg_salary, median_salary,
+    min_salary, max_salary, percentile_25, percentile_75, sample_size, last_updated, created_at
+"""
+
+STATISTICS_UPDATE = """
+    avg_salary = EXCLUDED.avg_salary,
+    median_salary = EXCLUDED.median_salary,
+    min_salary = EXCLUDED.min_salary,
+    max_salary = EXCLUDED.max_salary,
+    percentile_25 = EXCLUDED.percentile_25,
+    percentile_75 = EXCLUDED.percentile_75,
+    sample_size = EXCLUDED.sample_size,
+    last_updated = EXCLUDED.last_updated
+"""
+
+REFRESH_CUBE = f"""
+    CREATE OR REPLACE FUNCTION salary_sketch_refresh(titles TEXT[]) RETURNS void AS $$
+        WITH merged AS (
+            SELECT job_title, location, experience_level, category_key, bucket,
+                   sum(count) AS cnt, sum(total) AS total
+            FROM salary_sketches
+            WHERE job_title = ANY(titles) AND count > 0
+            GROUP BY job_title, bucket, CUBE(location, experience_level, category_key)
+            HAVING location IS DISTINCT FROM ''
+               AND experience_level IS DISTINCT FROM ''
+               AND category_key IS DISTINCT FROM ''
+        ), ranked AS (
+            SELECT job_title, location, experience_level, category_key, cnt, total,
+                   total::float8 / cnt AS value,
+                   sum(cnt) OVER (cell ORDER BY bucket) AS cum,
+                   sum(cnt) OVER cell AS n
+            FROM merged
+            WINDOW cell AS (PARTITION BY job_title, location, experience_level, category_key)
+        ), upserted AS (
+            INSERT INTO salary_statistics AS s ({STATISTICS_COLUMNS})
+            SELECT job_title, location, experience_level, category_key::uuid,
+                   sum(total)::float8 / sum(cnt),
+                   min(value) FILTER (WHERE cum > floor(0.5 * (n - 1))),
+                   min(value),
+                   max(value),
+                   min(value) FILTER (WHERE cum > floor(0.25 * (n - 1))),
+                   min(value) FILTER (WHERE cum > floor(0.75 * (n - 1))),
+                   sum(cnt),
+                   timezone('utc', now()),
+                   timezone('utc', now())
+            FROM ranked
+            GROUP BY job_title, location, experience_level, category_key
+            HAVING sum(cnt) >= 3
+            ON CONFLICT (
+                job_title, (coalesce(location, '')), (coalesce(experience_level, '')),
+                (coalesce(category_id::text, ''))
+            )
+            DO UPDATE SET {STATISTICS_UPDATE}
+            RETURNING s.id
+        )
+        DELETE FROM salary_statistics
+        WHERE job_title = ANY(titles)
+          AND id NOT IN (SELECT id FROM upserted);
+    $$ LANGUAGE sql
+"""
+
+# A 0009 szerinti, csak munkakörönkénti frissítés (downgrade)
+REFRESH_TITLES = f"""
+    CREATE OR REPLACE FUNCTION salary_sketch_refresh(titles TEXT[]) RETURNS void AS $$
+        WITH merged AS (
+            SELECT job_title, bucket, sum(count) AS cnt, sum(total) AS total
+            FROM salary_sketches
+            WHERE job_title = ANY(titles) AND count > 0
+            GROUP BY job_title, bucket
+        ), ranked AS (
+            SELECT job_title, cnt, total,
+                   total::float8 / cnt AS value,
+                   sum(cnt) OVER (PARTITION BY job_title ORDER BY bucket) AS cum,
+                   sum(cnt) OVER (PARTITION BY job_title) AS n
+            FROM merged
+        )
+        INSERT INTO salary_statistics AS s (
+            job_title, avg_salary, median_salary, min_salary, max_salary,
+            percentile_25, percentile_75, sample_size, last_updated, created_at
+        )
+        SELECT job_title,
+               sum(total)::float8 / sum(cnt),
+               min(value) FILTER (WHERE cum > floor(0.5 * (n - 1))),
+               min(value),
+               max(value),
+               min(value) FILTER (WHERE cum > floor(0.25 * (n - 1))),
+               min(value) FILTER (WHERE cum > floor(0.75 * (n - 1))),
+               sum(cnt),
+               timezone('utc', now()),
+               timezone('utc', now())
+        FROM ranked
+        GROUP BY job_title
+        HAVING sum(cnt) >= 3
+        ON CONFLICT (job_title, (coalesce(location, '')), (coalesce(experience_level, '')))
+        DO UPDATE SET {STATISTICS_UPDATE};
+        
+        DELETE FROM salary_statistics
+        WHERE job_title = ANY(titles)
+          AND location IS NULL
+          AND experience_level IS NULL
+          AND coalesce((
+              SELECT sum(count) FROM salary_sketches k WHERE k.job_title = salary_statistics.job_title
+          ), 0) < 3;
+    $$ LANGUAGE sql
+"""
+
+
+def upgrade():
+    op.execute("DROP INDEX IF EXISTS uq_salary_statistics_key")
+    op.execute("""
+        DELETE FROM salary_statistics
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT
+                    id,
+                    row_number() OVER (
+                        PARTITION BY job_title, coalesce(location, ''), coalesce(experience_level, ''),
+                                     coalesce(category_id::text, '')
+                        ORDER BY last_updated DESC NULLS LAST, id DESC
+                    ) AS rn
+                FROM salary_statistics
+            ) ranked
+            WHERE rn > 1
+        )
+    """)
+    op.execute(
+        "CREATE UNIQUE INDEX uq_salary_statistics_key ON salary_statistics "
+        "(job_title, (coalesce(location, '')), (coalesce(experience_level, '')), "
+        "(coalesce(category_id::text, '')))"
+    )
+    
+    op.execute(REFRESH_CUBE)
+    op.execute(
+        "SELECT salary_sketch_refresh(array_agg(DISTINCT job_title)) FROM salary_sketches"
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM salary_statistics WHERE category_id IS NOT NULL")
+    op.execute("DROP INDEX IF EXISTS uq_salary_statistics_key")
+    op.execute(
+        "CREATE UNIQUE INDEX uq_salary_statistics_key ON salary_statistics "
+        "(job_title, (coalesce(location, '')), (coalesce(experience_level, '')))"
+    )
+    op.execute(REFRESH_TITLES)
@@ -0,0 +1,69 @@
+"""summary views
+
+Materializált összesítők a legkeresettebb munkakörökhöz és a helyszín
+statisztikákhoz: a végpontok a teljes jobs tábla csoportosítása helyett
+indexelt top-N olvasást végeznek.
+
+- egyedi index a kulcson, így a frissítés REFRESH ... CONCURRENTLY
+  (az olvasók nem blokkolódnak)
+- (job_count DESC, kulcs) index a rendezett, limitált lekérdezésekhez
+- summary_refreshes: nézetenként az utolsó frissítés ideje (computed_at);
+  külön táblában, hogy a frissítés csak a ténylegesen változott sorokat írja
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 19:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "summary_refreshes",
+        sa.Column("name", sa.String(63), primary_key=True),
+        sa.Column("computed_at", sa.DateTime, nullable=False),
+    )
+    
+    op.execute("""
+        CREATE MATERIALIZED VIEW job_title_summary AS
+        SELECT title, count(*) AS job_count, avg(salary_min)::float8 AS avg_salary
+        FROM jobs
+        WHERE active IS TRUE AND salary_min IS NOT NULL
+        GROUP BY title
+    """)
+    op.execute("CREATE UNIQUE INDEX uq_job_title_summary_title ON job_title_summary (title)")
+    op.execute(
+        "CREATE INDEX idx_job_title_summary_count ON job_title_summary (job_count DESC, title)"
+    )
+    
+    op.execute("""
+        CREATE MATERIALIZED VIEW location_summary AS
+        SELECT location, count(*) AS job_count, avg(salary_min)::float8 AS avg_salary
+        FROM jobs
+        WHERE active IS TRUE AND location IS NOT NULL AND salary_min IS NOT NULL
+        GROUP BY location
+    """)
+    op.execute("CREATE UNIQUE INDEX uq_location_summary_location ON location_summary (location)")
+    op.execute(
+        "CREATE INDEX idx_location_summary_count ON location_summary (job_count DESC, location)"
+    )
+    
+    op.execute("""
+        INSERT INTO summary_refreshes (name, computed_at)
+        VALUES ('job_title_summary', timezone('utc', now())),
+               ('location_summary', timezone('utc', now()))
+    """)
+
+
+def downgrade():
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS location_summary")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS job_title_summary")
+    op.drop_table("summary_refreshes")
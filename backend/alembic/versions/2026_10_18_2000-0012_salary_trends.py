@@ -0,0 +1,64 @@
+"""salary trends
+
+Fizetési idősor összesítők a begyűjtés (scraped_at, UTC) napja szerint:
+periódusonként (nap / hét) és csoportonként (munkakör, helyszín,
+kategória) darabszám, összeg, min / max és a 0009 szerinti logaritmikus
+kvantilis vázlat (vödör indexek és darabszámok tömbként).
+
+- a napi sorok csak lezárt napokra készülnek, és utána nem változnak
+  (StatisticsService.append_trend_rollups, manage.py append-trends)
+- a heti sorok a napi vázlatok összevonásával készülnek
+- a lezárt napok inkrementális olvasása az init.sql idx_jobs_scraped_at
+  indexén át történik
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 20:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+# Azonos a 0009 salary_sketch_bucket() gamma értékével
+SKETCH_GAMMA = 1.0202020202020203
+
+
+def upgrade():
+    op.create_table(
+        "salary_trends",
+        sa.Column("period", sa.String(10), primary_key=True),
+        sa.Column("job_title", sa.String(255), primary_key=True),
+        sa.Column("location", sa.String(255), primary_key=True),
+        sa.Column("category_key", sa.String(36), primary_key=True),
+        sa.Column("period_start", sa.Date, primary_key=True),
+        sa.Column("count", sa.BigInteger, nullable=False),
+        sa.Column("total", sa.BigInteger, nullable=False),
+        sa.Column("min_salary", sa.Integer),
+        sa.Column("max_salary", sa.Integer),
+        sa.Column("sketch_buckets", postgresql.ARRAY(sa.Integer), nullable=False),
+        sa.Column("sketch_counts", postgresql.ARRAY(sa.BigInteger), nullable=False),
+    )
+    op.create_index(
+        "idx_salary_trends_category", "salary_trends", ["period", "category_key", "period_start"]
+    )
+    
+    # Vödör becsült értéke: a [gamma^(i-1), gamma^i) tartomány relatív
+    # hiba szerinti közepe (a salary_sketch_bucket() inverze)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION salary_sketch_value(bucket INTEGER) RETURNS float8 AS $$
+            SELECT 2 * power({SKETCH_GAMMA}::float8, bucket) / ({SKETCH_GAMMA} + 1)
+        $$ LANGUAGE sql IMMUTABLE STRICT
+    """)
+
+
+def downgrade():
+    op.execute("DROP FUNCTION IF EXISTS salary_sketch_value(INTEGER)")
+    op.drop_index("idx_salary_trends_category", table_name="salary_trends")
+    op.drop_table("salary_trends")
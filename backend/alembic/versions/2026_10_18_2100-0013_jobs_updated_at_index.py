@@ -0,0 +1,30 @@
+"""jobs updated_at index
+
+Az analitikai pillanatkép (SALARY_SNAPSHOT_ENABLED) inkrementális
+frissítése az utolsó betöltés óta módosult állásokat olvassa
+(updated_at >= vízjel); az init.sql trigger minden módosításkor beállítja.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 21:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_updated_at ON jobs (updated_at)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_jobs_updated_at")
@@ -0,0 +1,244 @@
+"""jobs monthly salary
+
+Havi összegre normalizált fizetés (salary_monthly_min / salary_monthly_max)
+a salary_period és salary_currency alapján, hogy a szűrők és az
+összesítők összehasonlítható értékekkel dolgozzanak (havi, órabér, éves).
+
+- salary_to_monthly(): órabérnél a havi általános munkaidő (174 óra);
+  ismeretlen időszak vagy nem HUF pénznem esetén NULL (nem összevethető)
+- soronkénti BEFORE trigger számolja beszúráskor és a fizetési mezők
+  módosításakor, így minden írási útra érvényes (ORM, bulk upsert, COPY)
+- részleges B-tree index az aktív állásokra (fizetés tartomány szűrés)
+- a meglévő sorok feltöltése id szerinti kötegekben, kötegenként külön
+  tranzakcióban (rövid sorzárak); addig a vázlatok és a kocka a régi
+  értékekkel szolgálnak ki
+- ezután a vázlatok, a kocka és a materializált összesítők a havi értékből
+  épülnek újra; az idősor összesítők (salary_trends) kiürülnek, a következő
+  append-trends a legrégebbi begyűjtési naptól havi értékekkel tölti fel
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18 22:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+# A salary_sketches_apply() (0009) a megadott fizetés oszloppal
+SKETCH_APPLY = """
+    CREATE OR REPLACE FUNCTION salary_sketches_apply() RETURNS trigger AS $$
+    DECLARE
+        source TEXT;
+        titles TEXT[];
+    BEGIN
+        source := CASE TG_OP
+            WHEN 'INSERT' THEN
+                'SELECT 1 AS sign, {columns} FROM new_jobs'
+            WHEN 'DELETE' THEN
+                'SELECT -1 AS sign, {columns} FROM old_jobs'
+            ELSE
+                'SELECT 1 AS sign, {columns} FROM new_jobs '
+                || 'UNION ALL '
+                || 'SELECT -1 AS sign, {columns} FROM old_jobs'
+        END;
+        
+        EXECUTE format($q$
+            WITH upserted AS (
+                INSERT INTO salary_sketches AS s
+                    (job_title, location, experience_level, category_key, bucket, count, total)
+                SELECT * FROM (
+                    SELECT d.title AS job_title,
+                           coalesce(d.location, '') AS location,
+                           coalesce(d.experience_level, '') AS experience_level,
+                           coalesce(d.category_id::text, '') AS category_key,
+                           salary_sketch_bucket(d.{salary}) AS bucket,
+                           sum(d.sign) AS count,
+                           sum(d.sign * d.{salary}::bigint) AS total
+                    FROM (%s) d
+                    WHERE d.active IS TRUE AND d.{salary} > 0
+                    GROUP BY 1, 2, 3, 4, 5
+                ) deltas
+                WHERE count <> 0 OR total <> 0
+                ORDER BY 1, 2, 3, 4, 5
+                ON CONFLICT (job_title, location, experience_level, category_key, bucket)
+                DO UPDATE SET
+                    count = s.count + EXCLUDED.count,
+                    total = s.total + EXCLUDED.total
+                RETURNING job_title
+            )
+            SELECT array_agg(DISTINCT job_title) FROM upserted
+        $q$, source) INTO titles;
+        
+        IF titles IS NOT NULL THEN
+            DELETE FROM salary_sketches WHERE job_title = ANY(titles) AND count = 0;
+            PERFORM salary_sketch_refresh(titles);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+# A feltöltés kötegmérete (SALARY_BACKFILL_BATCH_SIZE)
+BACKFILL_BATCH_SIZE = 5000
+
+SUMMARY_VIEWS = {
+    "job_title_summary": ("title", "TRUE"),
+    "location_summary": ("location", "location IS NOT NULL"),
+}
+
+
+def sketch_apply(salary: str) -> str:
+    columns = f"title, location, experience_level, category_id, {salary}, active"
+    return SKETCH_APPLY.format(columns=columns, salary=salary)
+
+
+def create_summary_views(salary: str):
+    """A 0011 materializált összesítői a megadott fizetés oszloppal"""
+    for name, (key, condition) in SUMMARY_VIEWS.items():
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {name}")
+        op.execute(f"""
+            CREATE MATERIALIZED VIEW {name} AS
+            SELECT {key}, count(*) AS job_count, avg({salary})::float8 AS avg_salary
+            FROM jobs
+            WHERE active IS TRUE AND {condition} AND {salary} IS NOT NULL
+            GROUP BY {key}
+        """)
+        op.execute(f"CREATE UNIQUE INDEX uq_{name}_{key} ON {name} ({key})")
+        op.execute(f"CREATE INDEX idx_{name}_count ON {name} (job_count DESC, {key})")
+    op.execute(
+        "UPDATE summary_refreshes SET computed_at = timezone('utc', now()) "
+        "WHERE name IN ('job_title_summary', 'location_summary')"
+    )
+
+
+def backfill_monthly_salaries(bind):
+    """A havi oszlopok feltöltése id szerinti kötegekben (JobService.backfill_monthly_salaries)"""
+    after = None
+    while True:
+        # Köteg felső határa: a BACKFILL_BATCH_SIZE-adik következő id (PK index)
+        bounds = ["id > :after"] if after is not None else []
+        last = bind.execute(
+            sa.text(
+                f"SELECT id FROM jobs WHERE {' AND '.join(bounds) or 'TRUE'} "
+                "ORDER BY id OFFSET :offset LIMIT 1"
+            ),
+            {"after": after, "offset": BACKFILL_BATCH_SIZE - 1}
+        ).scalar()
+        if last is not None:
+            bounds.append("id <= :last")
+        
+        bind.execute(
+            sa.text(f"""
+                UPDATE jobs SET
+                    salary_monthly_min = salary_to_monthly(salary_min, salary_period, salary_currency),
+                    salary_monthly_max = salary_to_monthly(salary_max, salary_period, salary_currency)
+                WHERE {' AND '.join(bounds) or 'TRUE'}
+                  AND (salary_min IS NOT NULL OR salary_max IS NOT NULL)
+            """),
+            {"after": after, "last": last}
+        )
+        if last is None:
+            break
+        after = last
+
+
+def upgrade():
+    op.add_column("jobs", sa.Column("salary_monthly_min", sa.Integer))
+    op.add_column("jobs", sa.Column("salary_monthly_max", sa.Integer))
+    
+    op.execute("""
+        CREATE OR REPLACE FUNCTION salary_to_monthly(amount INTEGER, period TEXT, currency TEXT)
+        RETURNS INTEGER AS $$
+            SELECT CASE WHEN monthly <= 2147483647 THEN monthly::int END
+            FROM (
+                SELECT round(amount * CASE coalesce(period, 'monthly')
+                    WHEN 'monthly' THEN 1
+                    WHEN 'hourly' THEN 174
+                    WHEN 'daily' THEN 21.75
+                    WHEN 'weekly' THEN 4.35
+                    WHEN 'yearly' THEN 1 / 12.0
+                END) AS monthly
+                WHERE amount > 0 AND upper(coalesce(currency, 'HUF')) = 'HUF'
+            ) m
+        $$ LANGUAGE sql IMMUTABLE
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION jobs_salary_monthly() RETURNS trigger AS $$
+        BEGIN
+            NEW.salary_monthly_min := salary_to_monthly(NEW.salary_min, NEW.salary_period, NEW.salary_currency);
+            NEW.salary_monthly_max := salary_to_monthly(NEW.salary_max, NEW.salary_period, NEW.salary_currency);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_jobs_salary_monthly
+        BEFORE INSERT OR UPDATE OF salary_min, salary_max, salary_period, salary_currency ON jobs
+        FOR EACH ROW EXECUTE FUNCTION jobs_salary_monthly()
+    """)
+    
+    # Kötegenként autocommit; a vázlat trigger még a salary_min értékkel
+    # számol, így a feltöltés nem módosítja a vázlatokat
+    with op.get_context().autocommit_block():
+        backfill_monthly_salaries(op.get_bind())
+    
+    # A vázlatok, a kocka és az összesítők újra a havi értékből
+    op.execute(sketch_apply("salary_monthly_min"))
+    op.execute("DELETE FROM salary_sketches")
+    op.execute("DELETE FROM salary_statistics")
+    op.execute("""
+        INSERT INTO salary_sketches
+            (job_title, location, experience_level, category_key, bucket, count, total)
+        SELECT title, coalesce(location, ''), coalesce(experience_level, ''),
+               coalesce(category_id::text, ''), salary_sketch_bucket(salary_monthly_min),
+               count(*), sum(salary_monthly_min::bigint)
+        FROM jobs
+        WHERE active IS TRUE AND salary_monthly_min > 0
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+    op.execute(
+        "SELECT salary_sketch_refresh(array_agg(DISTINCT job_title)) FROM salary_sketches"
+    )
+    op.execute("DELETE FROM salary_trends")
+    create_summary_views("salary_monthly_min")
+    
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_salary_monthly "
+            "ON jobs (salary_monthly_min, salary_monthly_max) WHERE active IS TRUE"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_jobs_salary_monthly")
+    
+    create_summary_views("salary_min")
+    op.execute(sketch_apply("salary_min"))
+    op.execute("DELETE FROM salary_sketches")
+    op.execute("""
+        INSERT INTO salary_sketches
+            (job_title, location, experience_level, category_key, bucket, count, total)
+        SELECT title, coalesce(location, ''), coalesce(experience_level, ''),
+               coalesce(category_id::text, ''), salary_sketch_bucket(salary_min),
+               count(*), sum(salary_min::bigint)
+        FROM jobs
+        WHERE active IS TRUE AND salary_min > 0
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+    op.execute(
+        "SELECT salary_sketch_refresh(array_agg(DISTINCT job_title)) FROM salary_sketches"
+    )
+    op.execute("DELETE FROM salary_trends")
+    
+    op.execute("DROP TRIGGER IF EXISTS trg_jobs_salary_monthly ON jobs")
+    op.execute("DROP FUNCTION IF EXISTS jobs_salary_monthly()")
+    op.execute("DROP FUNCTION IF EXISTS salary_to_monthly(INTEGER, TEXT, TEXT)")
+    op.drop_column("jobs", "salary_monthly_max")
+    op.drop_column("jobs", "salary_monthly_min")
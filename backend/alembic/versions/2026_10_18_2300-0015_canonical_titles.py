@@ -0,0 +1,173 @@
+"""canonical titles
+
+Kanonikus munkakörök: a címváltozatok ("Senior Java fejlesztő (remote)",
+"Java Developer - Senior") egy munkakörbe kerülnek, és a statisztikák
+(vázlatok, kocka, idősorok, munkakör összesítő) ez szerint csoportosítanak.
+
+- canonical_titles: kanonikus munkakörök (a név egyedi és nem változik)
+- title_aliases: normalizált címkulcs -> kanonikus munkakör; offline
+  csoportosítás építi (python manage.py build-canonical-titles), betöltéskor
+  az ismeretlen kulcsok új munkakörrel bővülnek
+- jobs.canonical_title_id: betöltéskor töltődik, indexelt
+- a vázlat trigger és a job_title_summary a kanonikus névvel csoportosít
+  (még be nem sorolt állásnál a címmel, így a meglévő vázlatok érvényesek
+  maradnak; a build-canonical-titles átsorolásakor a triggerek viszik át
+  őket a kanonikus munkakörhöz)
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-18 23:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+# A salary_sketches_apply() (0009, 0014) a megadott forrás oszlopokkal
+SKETCH_APPLY = """
+    CREATE OR REPLACE FUNCTION salary_sketches_apply() RETURNS trigger AS $$
+    DECLARE
+        source TEXT;
+        titles TEXT[];
+    BEGIN
+        source := CASE TG_OP
+            WHEN 'INSERT' THEN
+                'SELECT 1 AS sign, {columns} FROM new_jobs j {join}'
+            WHEN 'DELETE' THEN
+                'SELECT -1 AS sign, {columns} FROM old_jobs j {join}'
+            ELSE
+                'SELECT 1 AS sign, {columns} FROM new_jobs j {join} '
+                || 'UNION ALL '
+                || 'SELECT -1 AS sign, {columns} FROM old_jobs j {join}'
+        END;
+        
+        EXECUTE format($q$
+            WITH upserted AS (
+                INSERT INTO salary_sketches AS s
+                    (job_title, location, experience_level, category_key, bucket, count, total)
+                SELECT * FROM (
+                    SELECT d.title AS job_title,
+                           coalesce(d.location, '') AS location,
+                           coalesce(d.experience_level, '') AS experience_level,
+                           coalesce(d.category_id::text, '') AS category_key,
+                           salary_sketch_bucket(d.salary_monthly_min) AS bucket,
+                           sum(d.sign) AS count,
+                           sum(d.sign * d.salary_monthly_min::bigint) AS total
+                    FROM (%s) d
+                    WHERE d.active IS TRUE AND d.salary_monthly_min > 0
+                    GROUP BY 1, 2, 3, 4, 5
+                ) deltas
+                WHERE count <> 0 OR total <> 0
+                ORDER BY 1, 2, 3, 4, 5
+                ON CONFLICT (job_title, location, experience_level, category_key, bucket)
+                DO UPDATE SET
+                    count = s.count + EXCLUDED.count,
+                    total = s.total + EXCLUDED.total
+                RETURNING job_title
+            )
+            SELECT array_agg(DISTINCT job_title) FROM upserted
+        $q$, source) INTO titles;
+        
+        IF titles IS NOT NULL THEN
+            DELETE FROM salary_sketches WHERE job_title = ANY(titles) AND count = 0;
+            PERFORM salary_sketch_refresh(titles);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+SOURCE_COLUMNS = "j.location, j.experience_level, j.category_id, j.salary_monthly_min, j.active"
+CANONICAL_JOIN = "LEFT JOIN canonical_titles c ON c.id = j.canonical_title_id"
+
+
+def sketch_apply(title: str, join: str) -> str:
+    return SKETCH_APPLY.format(columns=f"{title} AS title, {SOURCE_COLUMNS}", join=join)
+
+
+def create_title_summary(title: str, join: str):
+    """A 0011 / 0014 job_title_summary a megadott munkakör kifejezéssel"""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS job_title_summary")
+    op.execute(f"""
+        CREATE MATERIALIZED VIEW job_title_summary AS
+        SELECT {title} AS title, count(*) AS job_count, avg(j.salary_monthly_min)::float8 AS avg_salary
+        FROM jobs j {join}
+        WHERE j.active IS TRUE AND j.salary_monthly_min IS NOT NULL
+        GROUP BY 1
+    """)
+    op.execute("CREATE UNIQUE INDEX uq_job_title_summary_title ON job_title_summary (title)")
+    op.execute(
+        "CREATE INDEX idx_job_title_summary_count ON job_title_summary (job_count DESC, title)"
+    )
+    op.execute(
+        "UPDATE summary_refreshes SET computed_at = timezone('utc', now()) "
+        "WHERE name = 'job_title_summary'"
+    )
+
+
+def upgrade():
+    op.create_table(
+        "canonical_titles",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False, unique=True),
+        sa.Column("created_at", sa.DateTime),
+    )
+    op.create_table(
+        "title_aliases",
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column(
+            "canonical_title_id", postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("canonical_titles.id"), nullable=False
+        ),
+    )
+    op.create_index("ix_title_aliases_canonical_title_id", "title_aliases", ["canonical_title_id"])
+    
+    op.add_column(
+        "jobs",
+        sa.Column("canonical_title_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("canonical_titles.id"))
+    )
+    
+    op.execute(sketch_apply("coalesce(c.name, j.title)", CANONICAL_JOIN))
+    create_title_summary("coalesce(c.name, j.title)", CANONICAL_JOIN)
+    
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jobs_canonical_title_id "
+            "ON jobs (canonical_title_id)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_jobs_canonical_title_id")
+    
+    create_title_summary("j.title", "")
+    op.execute(sketch_apply("j.title", ""))
+    
+    # A vázlatok és a kocka újra a nyers címek szerint
+    op.execute("DELETE FROM salary_sketches")
+    op.execute("DELETE FROM salary_statistics")
+    op.execute("""
+        INSERT INTO salary_sketches
+            (job_title, location, experience_level, category_key, bucket, count, total)
+        SELECT title, coalesce(location, ''), coalesce(experience_level, ''),
+               coalesce(category_id::text, ''), salary_sketch_bucket(salary_monthly_min),
+               count(*), sum(salary_monthly_min::bigint)
+        FROM jobs
+        WHERE active IS TRUE AND salary_monthly_min > 0
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+    op.execute(
+        "SELECT salary_sketch_refresh(array_agg(DISTINCT job_title)) FROM salary_sketches"
+    )
+    
+    op.drop_column("jobs", "canonical_title_id")
+    op.drop_index("ix_title_aliases_canonical_title_id", table_name="title_aliases")
+    op.drop_table("title_aliases")
+    op.drop_table("canonical_titles")
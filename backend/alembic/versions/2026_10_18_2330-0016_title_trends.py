@@ -0,0 +1,204 @@
+"""title trends
+
+Legkeresettebb munkakörök időablakokban (utolsó 7 / 30 nap): munkakörönkénti
+aktív állásszámok begyűjtési naponként (title_day_counts) és időablakonként
+(title_window_counts). Utasítás szintű triggerek tartják karban a jobs tábla
+változásai alapján (beszúrás, inaktiválás, törlés, átsorolás), a munkakör a
+statisztikák kanonikus neve. A top-N lekérdezés a (days, job_count DESC)
+indexből olvas, a darabszámok pontosak.
+
+- trending_windows: időablakonként a kezdőnap; a trending_windows_roll()
+  napváltáskor kivonja a kiesett napokat az ablakokból és törli a már
+  egyik ablakba sem tartozó napi sorokat (az első trending lekérdezés hívja)
+- a triggerek és a léptetés egy advisory lockon osztoznak (megosztott /
+  kizárólagos), így léptetés közben nem érkezik régi kezdőnapú delta
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-18 23:30:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0016"
+down_revision = "0015"
+branch_labels = None
+depends_on = None
+
+TRENDING_WINDOWS = (7, 30)
+
+SOURCE_COLUMNS = (
+    "coalesce(c.name, j.title) AS title, j.scraped_at, j.salary_monthly_min, j.active"
+)
+CANONICAL_JOIN = "LEFT JOIN canonical_titles c ON c.id = j.canonical_title_id"
+
+# Napi delták: (nap, munkakör) szerint, a legrégebbi ablak kezdete óta
+DAY_DELTAS = """
+    SELECT d.scraped_at::date AS day, d.title AS job_title,
+           sum(d.sign) AS job_count,
+           sum(d.sign * (coalesce(d.salary_monthly_min, 0) > 0)::int) AS salary_count,
+           sum(d.sign * CASE WHEN d.salary_monthly_min > 0 THEN d.salary_monthly_min::bigint ELSE 0 END) AS salary_total
+    FROM (%s) d
+    WHERE d.active IS TRUE
+      AND d.scraped_at >= (SELECT min(start_day) FROM trending_windows)
+    GROUP BY 1, 2
+"""
+
+
+def upgrade():
+    op.create_table(
+        "title_day_counts",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("job_title", sa.String(255), primary_key=True),
+        sa.Column("job_count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("salary_count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("salary_total", sa.BigInteger, nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "trending_windows",
+        sa.Column("days", sa.Integer, primary_key=True),
+        sa.Column("start_day", sa.Date, nullable=False),
+        sa.Column("rolled_at", sa.DateTime),
+    )
+    op.create_table(
+        "title_window_counts",
+        sa.Column("days", sa.Integer, primary_key=True),
+        sa.Column("job_title", sa.String(255), primary_key=True),
+        sa.Column("job_count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("salary_count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("salary_total", sa.BigInteger, nullable=False, server_default="0"),
+    )
+    op.execute(
+        "CREATE INDEX idx_title_window_counts_top "
+        "ON title_window_counts (days, job_count DESC, job_title)"
+    )
+    
+    op.execute(
+        "INSERT INTO trending_windows (days, start_day, rolled_at) "
+        "SELECT days, timezone('utc', now())::date - days + 1, timezone('utc', now()) "
+        f"FROM unnest(ARRAY{list(TRENDING_WINDOWS)}) AS days"
+    )
+    op.execute(
+        "INSERT INTO title_day_counts (day, job_title, job_count, salary_count, salary_total) "
+        + DAY_DELTAS % f"SELECT 1 AS sign, {SOURCE_COLUMNS} FROM jobs j {CANONICAL_JOIN}"
+    )
+    op.execute("""
+        INSERT INTO title_window_counts (days, job_title, job_count, salary_count, salary_total)
+        SELECT w.days, t.job_title, sum(t.job_count), sum(t.salary_count), sum(t.salary_total)
+        FROM trending_windows w
+        JOIN title_day_counts t ON t.day >= w.start_day
+        GROUP BY 1, 2
+    """)
+    
+    # A delták kulcs szerint rendezve kerülnek be (azonos zárolási sorrend)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION title_trends_apply() RETURNS trigger AS $$
+        DECLARE
+            source TEXT;
+        BEGIN
+            source := CASE TG_OP
+                WHEN 'INSERT' THEN
+                    'SELECT 1 AS sign, """ + SOURCE_COLUMNS + """ FROM new_jobs j """ + CANONICAL_JOIN + """'
+                WHEN 'DELETE' THEN
+                    'SELECT -1 AS sign, """ + SOURCE_COLUMNS + """ FROM old_jobs j """ + CANONICAL_JOIN + """'
+                ELSE
+                    'SELECT 1 AS sign, """ + SOURCE_COLUMNS + """ FROM new_jobs j """ + CANONICAL_JOIN + """ '
+                    || 'UNION ALL '
+                    || 'SELECT -1 AS sign, """ + SOURCE_COLUMNS + """ FROM old_jobs j """ + CANONICAL_JOIN + """'
+            END;
+            
+            -- Léptetés (trending_windows_roll) közben nincs delta
+            PERFORM pg_advisory_xact_lock_shared(hashtext('trending_windows'));
+            
+            EXECUTE format($q$
+                WITH deltas AS (
+                    SELECT * FROM (""" + DAY_DELTAS + """) d
+                    WHERE job_count <> 0 OR salary_count <> 0 OR salary_total <> 0
+                ),
+                day_rows AS (
+                    INSERT INTO title_day_counts AS t
+                        (day, job_title, job_count, salary_count, salary_total)
+                    SELECT * FROM deltas
+                    ORDER BY day, job_title
+                    ON CONFLICT (day, job_title) DO UPDATE SET
+                        job_count = t.job_count + EXCLUDED.job_count,
+                        salary_count = t.salary_count + EXCLUDED.salary_count,
+                        salary_total = t.salary_total + EXCLUDED.salary_total
+                )
+                INSERT INTO title_window_counts AS t
+                    (days, job_title, job_count, salary_count, salary_total)
+                SELECT w.days, d.job_title, sum(d.job_count), sum(d.salary_count), sum(d.salary_total)
+                FROM deltas d
+                JOIN trending_windows w ON d.day >= w.start_day
+                GROUP BY 1, 2
+                ORDER BY 1, 2
+                ON CONFLICT (days, job_title) DO UPDATE SET
+                    job_count = t.job_count + EXCLUDED.job_count,
+                    salary_count = t.salary_count + EXCLUDED.salary_count,
+                    salary_total = t.salary_total + EXCLUDED.salary_total
+            $q$, source);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for event, referencing in (
+        ("INSERT", "NEW TABLE AS new_jobs"),
+        ("UPDATE", "OLD TABLE AS old_jobs NEW TABLE AS new_jobs"),
+        ("DELETE", "OLD TABLE AS old_jobs"),
+    ):
+        op.execute(f"""
+            CREATE TRIGGER trg_title_trends_{event.lower()}
+            AFTER {event} ON jobs
+            REFERENCING {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION title_trends_apply()
+        """)
+    
+    # Napváltás: a kiesett napok kivonása; a léptetett ablakok száma
+    op.execute("""
+        CREATE OR REPLACE FUNCTION trending_windows_roll() RETURNS integer AS $$
+        DECLARE
+            today DATE := timezone('utc', now())::date;
+            rolled INTEGER;
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('trending_windows'));
+            
+            UPDATE title_window_counts c SET
+                job_count = c.job_count - e.job_count,
+                salary_count = c.salary_count - e.salary_count,
+                salary_total = c.salary_total - e.salary_total
+            FROM (
+                SELECT w.days, t.job_title, sum(t.job_count) AS job_count,
+                       sum(t.salary_count) AS salary_count, sum(t.salary_total) AS salary_total
+                FROM trending_windows w
+                JOIN title_day_counts t
+                  ON t.day >= w.start_day AND t.day < today - w.days + 1
+                GROUP BY 1, 2
+            ) e
+            WHERE c.days = e.days AND c.job_title = e.job_title;
+            
+            UPDATE trending_windows
+            SET start_day = today - days + 1, rolled_at = timezone('utc', now())
+            WHERE start_day < today - days + 1;
+            GET DIAGNOSTICS rolled = ROW_COUNT;
+            
+            IF rolled > 0 THEN
+                DELETE FROM title_window_counts WHERE job_count <= 0;
+                DELETE FROM title_day_counts
+                WHERE day < (SELECT min(start_day) FROM trending_windows) OR job_count <= 0;
+            END IF;
+            RETURN rolled;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade():
+    for event in ("delete", "update", "insert"):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_title_trends_{event} ON jobs")
+    op.execute("DROP FUNCTION IF EXISTS title_trends_apply()")
+    op.execute("DROP FUNCTION IF EXISTS trending_windows_roll()")
+    op.drop_table("title_window_counts")
+    op.drop_table("trending_windows")
+    op.drop_table("title_day_counts")
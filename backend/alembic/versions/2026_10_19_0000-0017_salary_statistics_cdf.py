@@ -0,0 +1,123 @@
+"""salary statistics cdf
+
+Tömör eloszlásfüggvény a kocka celláiban: salary_statistics.salary_cdf a
+0., 5., ..., 100. percentilis (21 érték). A percentilis rang végpont
+(/api/statistics/rank) egyetlen indexelt sorból, a pontok közti lineáris
+interpolációval számol, a jobs tábla olvasása nélkül.
+
+- a vázlatokból frissítő salary_sketch_refresh() (0010) a többi
+  kvantilissel együtt számolja (vödör átlagértékek, ~1% relatív hiba)
+- a pontos újraszámolás (manage.py compute-statistics) percentile_cont
+  értékekkel írja felül
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-19 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0017"
+down_revision = "0016"
+branch_labels = None
+depends_on = None
+
+# A CDF pontjai: 0, 5, ..., 100. percentilis
+CDF_POINTS = 21
+
+STATISTICS_COLUMNS = """
+    job_title, location, experience_level, category_id, avg_salary, median_salary,
+    min_salary, max_salary, percentile_25, percentile_75, sample_size, last_updated, created_at{extra}
+"""
+
+STATISTICS_UPDATE = """
+    avg_salary = EXCLUDED.avg_salary,
+    median_salary = EXCLUDED.median_salary,
+    min_salary = EXCLUDED.min_salary,
+    max_salary = EXCLUDED.max_salary,
+    percentile_25 = EXCLUDED.percentile_25,
+    percentile_75 = EXCLUDED.percentile_75,
+    sample_size = EXCLUDED.sample_size,
+    last_updated = EXCLUDED.last_updated{extra}
+"""
+
+# A 0010 salary_sketch_refresh() a megadott további oszlopokkal
+REFRESH_CUBE = """
+    CREATE OR REPLACE FUNCTION salary_sketch_refresh(titles TEXT[]) RETURNS void AS $$
+        WITH merged AS (
+            SELECT job_title, location, experience_level, category_key, bucket,
+                   sum(count) AS cnt, sum(total) AS total
+            FROM salary_sketches
+            WHERE job_title = ANY(titles) AND count > 0
+            GROUP BY job_title, bucket, CUBE(location, experience_level, category_key)
+            HAVING location IS DISTINCT FROM ''
+               AND experience_level IS DISTINCT FROM ''
+               AND category_key IS DISTINCT FROM ''
+        ), ranked AS (
+            SELECT job_title, location, experience_level, category_key, cnt, total,
+                   total::float8 / cnt AS value,
+                   sum(cnt) OVER (cell ORDER BY bucket) AS cum,
+                   sum(cnt) OVER cell AS n
+            FROM merged
+            WINDOW cell AS (PARTITION BY job_title, location, experience_level, category_key)
+        ), upserted AS (
+            INSERT INTO salary_statistics AS s ({columns})
+            SELECT job_title, location, experience_level, category_key::uuid,
+                   sum(total)::float8 / sum(cnt),
+                   min(value) FILTER (WHERE cum > floor(0.5 * (n - 1))),
+                   min(value),
+                   max(value),
+                   min(value) FILTER (WHERE cum > floor(0.25 * (n - 1))),
+                   min(value) FILTER (WHERE cum > floor(0.75 * (n - 1))),
+                   sum(cnt),
+                   timezone('utc', now()),
+                   timezone('utc', now()){values}
+            FROM ranked
+            GROUP BY job_title, location, experience_level, category_key
+            HAVING sum(cnt) >= 3
+            ON CONFLICT (
+                job_title, (coalesce(location, '')), (coalesce(experience_level, '')),
+                (coalesce(category_id::text, ''))
+            )
+            DO UPDATE SET {update}
+            RETURNING s.id
+        )
+        DELETE FROM salary_statistics
+        WHERE job_title = ANY(titles)
+          AND id NOT IN (SELECT id FROM upserted);
+    $$ LANGUAGE sql
+"""
+
+
+def refresh_cube(cdf: bool) -> str:
+    if not cdf:
+        return REFRESH_CUBE.format(
+            columns=STATISTICS_COLUMNS.format(extra=""),
+            values="",
+            update=STATISTICS_UPDATE.format(extra="")
+        )
+    points = ",\n".join(
+        f"min(value) FILTER (WHERE cum > floor({i / (CDF_POINTS - 1)} * (n - 1)))"
+        for i in range(CDF_POINTS)
+    )
+    return REFRESH_CUBE.format(
+        columns=STATISTICS_COLUMNS.format(extra=", salary_cdf"),
+        values=f",\n ARRAY[{points}]",
+        update=STATISTICS_UPDATE.format(extra=",\n salary_cdf = EXCLUDED.salary_cdf")
+    )
+
+
+def upgrade():
+    op.add_column("salary_statistics", sa.Column("salary_cdf", postgresql.ARRAY(sa.Float)))
+    op.execute(refresh_cube(cdf=True))
+    op.execute(
+        "SELECT salary_sketch_refresh(array_agg(DISTINCT job_title)) FROM salary_sketches"
+    )
+
+
+def downgrade():
+    op.execute(refresh_cube(cdf=False))
+    op.drop_column("salary_statistics", "salary_cdf")
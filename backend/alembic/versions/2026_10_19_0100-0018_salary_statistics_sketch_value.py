@@ -0,0 +1,113 @@
+"""salary statistics sketch value
+
+A vázlatokból frissített kocka cellák (salary_sketch_refresh) vödör értéke
+a salary_sketch_value() (a vödör tartományának relatív hiba szerinti
+közepe), mint a vázlat statisztikáknál és a fizetési idősoroknál, így
+ugyanarra a szűrőre minden végpont ugyanazt a becslést adja. Az átlag és a
+mintaméret továbbra is a pontos összegekből számol.
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-19 01:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0018"
+down_revision = "0017"
+branch_labels = None
+depends_on = None
+
+# A CDF pontjai: 0, 5, ..., 100. percentilis
+CDF_POINTS = 21
+
+STATISTICS_COLUMNS = """
+    job_title, location, experience_level, category_id, avg_salary, median_salary,
+    min_salary, max_salary, percentile_25, percentile_75, sample_size, last_updated, created_at{extra}
+"""
+
+STATISTICS_UPDATE = """
+    avg_salary = EXCLUDED.avg_salary,
+    median_salary = EXCLUDED.median_salary,
+    min_salary = EXCLUDED.min_salary,
+    max_salary = EXCLUDED.max_salary,
+    percentile_25 = EXCLUDED.percentile_25,
+    percentile_75 = EXCLUDED.percentile_75,
+    sample_size = EXCLUDED.sample_size,
+    last_updated = EXCLUDED.last_updated{extra}
+"""
+
+# A 0017 salary_sketch_refresh() a megadott vödör érték kifejezéssel
+REFRESH_CUBE = """
+    CREATE OR REPLACE FUNCTION salary_sketch_refresh(titles TEXT[]) RETURNS void AS $$
+        WITH merged AS (
+            SELECT job_title, location, experience_level, category_key, bucket,
+                   sum(count) AS cnt, sum(total) AS total
+            FROM salary_sketches
+            WHERE job_title = ANY(titles) AND count > 0
+            GROUP BY job_title, bucket, CUBE(location, experience_level, category_key)
+            HAVING location IS DISTINCT FROM ''
+               AND experience_level IS DISTINCT FROM ''
+               AND category_key IS DISTINCT FROM ''
+        ), ranked AS (
+            SELECT job_title, location, experience_level, category_key, cnt, total,
+                   {value} AS value,
+                   sum(cnt) OVER (cell ORDER BY bucket) AS cum,
+                   sum(cnt) OVER cell AS n
+            FROM merged
+            WINDOW cell AS (PARTITION BY job_title, location, experience_level, category_key)
+        ), upserted AS (
+            INSERT INTO salary_statistics AS s ({columns})
+            SELECT job_title, location, experience_level, category_key::uuid,
+                   sum(total)::float8 / sum(cnt),
+                   min(value) FILTER (WHERE cum > floor(0.5 * (n - 1))),
+                   min(value),
+                   max(value),
+                   min(value) FILTER (WHERE cum > floor(0.25 * (n - 1))),
+                   min(value) FILTER (WHERE cum > floor(0.75 * (n - 1))),
+                   sum(cnt),
+                   timezone('utc', now()),
+                   timezone('utc', now()){values}
+            FROM ranked
+            GROUP BY job_title, location, experience_level, category_key
+            HAVING sum(cnt) >= 3
+            ON CONFLICT (
+                job_title, (coalesce(location, '')), (coalesce(experience_level, '')),
+                (coalesce(category_id::text, ''))
+            )
+            DO UPDATE SET {update}
+            RETURNING s.id
+        )
+        DELETE FROM salary_statistics
+        WHERE job_title = ANY(titles)
+          AND id NOT IN (SELECT id FROM upserted);
+    $$ LANGUAGE sql
+"""
+
+
+def refresh_cube(value: str) -> str:
+    points = ",\n".join(
+        f"min(value) FILTER (WHERE cum > floor({i / (CDF_POINTS - 1)} * (n - 1)))"
+        for i in range(CDF_POINTS)
+    )
+    return REFRESH_CUBE.format(
+        value=value,
+        columns=STATISTICS_COLUMNS.format(extra=", salary_cdf"),
+        values=f",\n ARRAY[{points}]",
+        update=STATISTICS_UPDATE.format(extra=",\n salary_cdf = EXCLUDED.salary_cdf")
+    )
+
+
+def upgrade():
+    op.execute(refresh_cube("salary_sketch_value(bucket)"))
+    op.execute(
+        "SELECT salary_sketch_refresh(array_agg(DISTINCT job_title)) FROM salary_sketches"
+    )
+
+
+def downgrade():
+    op.execute(refresh_cube("total::float8 / cnt"))
+    op.execute(
+        "SELECT salary_sketch_refresh(array_agg(DISTINCT job_title)) FROM salary_sketches"
+    )
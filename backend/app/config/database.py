@@ -1,11 +1,11 @@
 """
 Database configuration
-SQLAlchemy setup és session kezelés
+SQLAlchemy async setup (asyncpg) és session kezelés
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from .settings import settings
 import sys
 import logging
@@ -23,10 +23,30 @@ if not settings.DATABASE_URL or settings.DATABASE_URL.strip() == "":
     logger.error(error_msg)
     raise ValueError(error_msg)
 
+
+def async_database_url(database_url: str) -> URL:
+    """
+    DATABASE_URL átalakítása az asyncpg driverhez
+    - postgresql:// / postgres:// -> postgresql+asyncpg://
+    - sslmode query paraméter -> ssl (asyncpg nem ismeri a sslmode-ot)
+    """
+    url = make_url(database_url)
+    
+    if url.drivername in ("postgresql", "postgres", "postgresql+psycopg2"):
+        url = url.set(drivername="postgresql+asyncpg")
+    
+    if "sslmode" in url.query:
+        query = dict(url.query)
+        query["ssl"] = query.pop("sslmode")
+        url = url.set(query=query)
+    
+    return url
+
+
 try:
-    # Database engine
-    engine = create_engine(
-        settings.DATABASE_URL,
+    # Database engine (async)
+    engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
         pool_pre_ping=True,
         pool_size=10,
         max_overflow=20,
@@ -44,17 +64,20 @@ except Exception as e:
     raise ValueError(error_msg) from e
 
 # Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: commit után ne kelljen (async környezetben tiltott) lazy load
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 # Base class for models
 Base = declarative_base()
 
 
 # Dependency for FastAPI
-def get_db():
+async def get_db():
     """Database session dependency"""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -4,5 +4,14 @@ Database models
 from .job import Job
 from .category import Category
 from .salary_statistics import SalaryStatistics
+from .cache_generation import CacheGeneration
+from .job_counter import JobCounter
+from .salary_sketch import SalarySketch
+from .salary_trend import SalaryTrend
+from .summary import JobTitleSummary, LocationSummary, SummaryRefresh
+from .canonical_title import CanonicalTitle, TitleAlias
+from .title_trend import TitleDayCount, TrendingWindow, TitleWindowCount
 
-__all__ = ["Job", "Category", "SalaryStatistics"]
+__all__ = ["Job", "Category", "SalaryStatistics", "CacheGeneration", "JobCounter", "SalarySketch", "SalaryTrend",
+           "JobTitleSummary", "LocationSummary", "SummaryRefresh", "CanonicalTitle", "TitleAlias",
+           "TitleDayCount", "TrendingWindow", "TitleWindowCount"]
@@ -0,0 +1,24 @@
+"""
+Cache generation model - Cache-ek közös verziószámlálója
+"""
+
+from sqlalchemy import Column, String, BigInteger, DateTime
+from datetime import datetime
+
+from ..config.database import Base
+
+
+class CacheGeneration(Base):
+    """
+    Cache generáció számláló (alembic 0005)
+    Minden módosítás növeli; a workerek ez alapján ürítik a saját cache-üket.
+    """
+    
+    __tablename__ = "cache_generations"
+    
+    name = Column(String(50), primary_key=True)
+    generation = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<CacheGeneration(name='{self.name}', generation={self.generation})>"
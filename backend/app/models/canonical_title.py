@@ -0,0 +1,43 @@
+"""
+Canonical title models - Kanonikus munkakörök és a címváltozatok leképezése
+"""
+
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from ..config.database import Base
+
+
+class CanonicalTitle(Base):
+    """
+    Kanonikus munkakör (alembic 0015): a statisztikák ez szerint csoportosítanak
+    A név nem változik; újracsoportosításkor új sor készül
+    """
+    
+    __tablename__ = "canonical_titles"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(255), unique=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<CanonicalTitle(name='{self.name}')>"
+
+
+class TitleAlias(Base):
+    """
+    Normalizált címkulcs -> kanonikus munkakör (alembic 0015)
+    Offline építi a TitleService.rebuild(), betöltéskor bővül az új kulcsokkal
+    """
+    
+    __tablename__ = "title_aliases"
+    
+    key = Column(String(255), primary_key=True)
+    canonical_title_id = Column(
+        UUID(as_uuid=True), ForeignKey("canonical_titles.id"), nullable=False, index=True
+    )
+    
+    def __repr__(self):
+        return f"<TitleAlias(key='{self.key}')>"
@@ -2,7 +2,7 @@
 Category model - Kategória adatmodellje
 """
 
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, FetchedValue, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -27,6 +27,10 @@ class Category(Base):
     # Hierarchia támogatás (szülő kategória)
     parent_id = Column(UUID(as_uuid=True), ForeignKey("categories.id"), nullable=True)
     
+    # Materializált útvonal: '/<gyökér id>/.../<id>/' (alembic 0006)
+    # Triggerek töltik beszúráskor és áthelyezéskor, a részfa prefix alapján kérdezhető le
+    path = Column(Text, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue())
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -35,6 +39,10 @@ class Category(Base):
     jobs = relationship("Job", back_populates="category")
     children = relationship("Category", backref="parent", remote_side=[id])
     
+    __table_args__ = (
+        Index("idx_categories_path", path, postgresql_ops={"path": "text_pattern_ops"}),
+    )
+    
     def __repr__(self):
         return f"<Category(name='{self.name}', slug='{self.slug}')>"
     
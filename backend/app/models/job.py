@@ -2,9 +2,9 @@
 Job model - Állások adatmodellje
 """
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, JSON
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, JSON, Index, Computed, FetchedValue
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import uuid
 
@@ -21,6 +21,8 @@ class Job(Base):
     
     # Alapadatok
     title = Column(String(255), nullable=False, index=True)
+    # Kanonikus munkakör (alembic 0015): a statisztikák csoportosítási kulcsa
+    canonical_title_id = Column(UUID(as_uuid=True), ForeignKey("canonical_titles.id"), index=True)
     company = Column(String(255))
     location = Column(String(255), index=True)
     
@@ -29,6 +31,10 @@ class Job(Base):
     salary_max = Column(Integer)
     salary_currency = Column(String(10), default="HUF")
     salary_period = Column(String(20), default="monthly")  # monthly, hourly, yearly
+    # Havi összegre normalizált fizetés (alembic 0014, trigger számolja;
+    # nem HUF pénznemnél vagy ismeretlen időszaknál NULL)
+    salary_monthly_min = Column(Integer, server_default=FetchedValue(), server_onupdate=FetchedValue())
+    salary_monthly_max = Column(Integer, server_default=FetchedValue(), server_onupdate=FetchedValue())
     
     # Munkakör részletei
     experience_level = Column(String(50))  # junior, medior, senior, lead
@@ -40,6 +46,17 @@ class Job(Base):
     source_url = Column(Text)
     source_portal = Column(String(100))  # profession.hu, jobs.hu, stb.
     
+    # Teljes szöveges keresés (alembic 0002) - alapból nem töltjük be
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('hungarian_unaccent', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('hungarian_unaccent', coalesce(company, '')), 'B') || "
+            "setweight(to_tsvector('hungarian_unaccent', coalesce(description, '')), 'C')",
+            persisted=True
+        )
+    ))
+    
     # Metaadatok
     scraped_at = Column(DateTime, default=datetime.utcnow)
     verified = Column(Boolean, default=False)
@@ -55,6 +72,30 @@ class Job(Base):
     # Relationships
     category = relationship("Category", back_populates="jobs")
     
+    # Keyset lapozás indexei (alembic 0001)
+    __table_args__ = (
+        Index("idx_jobs_active_created_id", created_at.desc(), id.desc(),
+              postgresql_where=active),
+        Index("idx_jobs_category_created_id", category_id, created_at.desc(), id.desc(),
+              postgresql_where=active),
+        Index("idx_jobs_pending_created_id", created_at.desc(), id.desc(),
+              postgresql_where=active & ~verified),
+        Index("idx_jobs_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram indexek részszöveges és fuzzy szűréshez (alembic 0003)
+        Index("idx_jobs_title_trgm", title, postgresql_using="gin",
+              postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("idx_jobs_location_trgm", location, postgresql_using="gin",
+              postgresql_ops={"location": "gin_trgm_ops"}),
+        # Tömeges betöltés upsert kulcsa (alembic 0004)
+        Index("uq_jobs_source", source_portal, source_url, unique=True,
+              postgresql_where=source_url.isnot(None)),
+        # Változások inkrementális olvasása (analitikai pillanatkép, alembic 0013)
+        Index("idx_jobs_updated_at", updated_at),
+        # Fizetés tartomány szűrés havi értékre (alembic 0014)
+        Index("idx_jobs_salary_monthly", salary_monthly_min, salary_monthly_max,
+              postgresql_where=active),
+    )
+    
     def __repr__(self):
         return f"<Job(title='{self.title}', company='{self.company}')>"
     
@@ -63,12 +104,15 @@ class Job(Base):
         return {
             "id": str(self.id),
             "title": self.title,
+            "canonical_title_id": str(self.canonical_title_id) if self.canonical_title_id else None,
             "company": self.company,
             "location": self.location,
             "salary_min": self.salary_min,
             "salary_max": self.salary_max,
             "salary_currency": self.salary_currency,
             "salary_period": self.salary_period,
+            "salary_monthly_min": self.salary_monthly_min,
+            "salary_monthly_max": self.salary_monthly_max,
             "experience_level": self.experience_level,
             "employment_type": self.employment_type,
             "skills": self.skills,
@@ -0,0 +1,32 @@
+"""
+Job counter model - Denormalizált állásszámlálók
+"""
+
+from sqlalchemy import Column, String, BigInteger, DateTime
+from datetime import datetime
+
+from ..config.database import Base
+
+# Számláló dimenziók
+SCOPE_CATEGORY = "category"
+SCOPE_PORTAL = "portal"
+
+
+class JobCounter(Base):
+    """
+    Állásszámláló egy kategóriához vagy portálhoz (alembic 0007)
+    A jobs táblán lévő triggerek tartják karban; a key a category_id vagy a
+    source_portal szövegként, hiányzó érték esetén ''.
+    """
+    
+    __tablename__ = "job_counters"
+    
+    scope = Column(String(20), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    active_count = Column(BigInteger, nullable=False, default=0)
+    verified_count = Column(BigInteger, nullable=False, default=0)
+    pending_count = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<JobCounter(scope='{self.scope}', key='{self.key}', active={self.active_count})>"
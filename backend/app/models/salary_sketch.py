@@ -0,0 +1,31 @@
+"""
+Salary sketch model - Összevonható fizetési kvantilis vázlatok
+"""
+
+from sqlalchemy import Column, String, Integer, BigInteger
+
+from ..config.database import Base
+
+
+class SalarySketch(Base):
+    """
+    Logaritmikus fizetési vödör egy csoportban (alembic 0009)
+    
+    Csoport: munkakör, helyszín, tapasztalat, kategória (hiányzó érték: '').
+    A vödör (bucket) a salary_sketch_bucket() SQL függvény szerinti index,
+    ~1% relatív szélességgel; tetszőleges csoportok vödrönkénti összeadással
+    összevonhatók. A jobs táblán lévő triggerek tartják karban.
+    """
+    
+    __tablename__ = "salary_sketches"
+    
+    job_title = Column(String(255), primary_key=True)
+    location = Column(String(255), primary_key=True)
+    experience_level = Column(String(50), primary_key=True)
+    category_key = Column(String(36), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    total = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<SalarySketch(job_title='{self.job_title}', bucket={self.bucket}, count={self.count})>"
@@ -2,14 +2,17 @@
 Salary Statistics model - Fizetési statisztikák adatmodellje
 """
 
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime, Index, Text, cast, func
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
 
 from ..config.database import Base
 
+# A salary_cdf pontjai: 0, 5, ..., 100. percentilis (alembic 0017)
+SALARY_CDF_POINTS = 21
+
 
 class SalaryStatistics(Base):
     """Fizetési statisztikák model"""
@@ -30,11 +33,12 @@ class SalaryStatistics(Base):
     max_salary = Column(Float)          # Maximum fizetés
     percentile_25 = Column(Float)       # 25. percentilis
     percentile_75 = Column(Float)       # 75. percentilis
+    salary_cdf = Column(ARRAY(Float))   # Percentilisek 5%-onként (SALARY_CDF_POINTS)
     
     # Minta mérete
     sample_size = Column(Integer)       # Hány álláshirdetés alapján
     
-    # Szűrők
+    # Szűrők (NULL: összesítve minden értékre)
     location = Column(String(255))      # Helyszín (opcionális)
     experience_level = Column(String(50))  # Tapasztalati szint (opcionális)
     
@@ -45,6 +49,17 @@ class SalaryStatistics(Base):
     # Relationships
     category = relationship("Category")
     
+    __table_args__ = (
+        # Trigram index részszöveges és fuzzy munkakör szűréshez (alembic 0003)
+        Index("idx_salary_stats_title_trgm", job_title, postgresql_using="gin",
+              postgresql_ops={"job_title": "gin_trgm_ops"}),
+        # Kocka cella kulcs, NULL ("összes" szint) helyett '' (alembic 0008, 0010)
+        Index("uq_salary_statistics_key", job_title,
+              func.coalesce(location, ""), func.coalesce(experience_level, ""),
+              func.coalesce(cast(category_id, Text), ""),
+              unique=True),
+    )
+    
     def __repr__(self):
         return f"<SalaryStatistics(job_title='{self.job_title}', avg={self.avg_salary})>"
     
@@ -0,0 +1,45 @@
+"""
+Salary trend model - Fizetési idősor összesítők
+"""
+
+from sqlalchemy import Column, String, Integer, BigInteger, Date, Index
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from ..config.database import Base
+
+# Összesítési periódusok
+PERIOD_DAY = "day"
+PERIOD_WEEK = "week"
+PERIOD_PATTERN = f"^({PERIOD_DAY}|{PERIOD_WEEK})$"
+
+
+class SalaryTrend(Base):
+    """
+    Egy csoport fizetési összesítője egy periódusban (alembic 0012)
+    
+    Csoport: munkakör, helyszín, kategória (hiányzó érték: ''); a periódus a
+    begyűjtés (scraped_at, UTC) napja vagy hete. A kvantilis vázlat a
+    salary_sketch_bucket() szerinti vödör indexek és darabszámok párhuzamos
+    tömbje, így a periódusok és csoportok összevonhatók.
+    """
+    
+    __tablename__ = "salary_trends"
+    
+    period = Column(String(10), primary_key=True)
+    job_title = Column(String(255), primary_key=True)
+    location = Column(String(255), primary_key=True)
+    category_key = Column(String(36), primary_key=True)
+    period_start = Column(Date, primary_key=True)
+    count = Column(BigInteger, nullable=False)
+    total = Column(BigInteger, nullable=False)
+    min_salary = Column(Integer)
+    max_salary = Column(Integer)
+    sketch_buckets = Column(ARRAY(Integer), nullable=False)
+    sketch_counts = Column(ARRAY(BigInteger), nullable=False)
+    
+    __table_args__ = (
+        Index("idx_salary_trends_category", period, category_key, period_start),
+    )
+    
+    def __repr__(self):
+        return f"<SalaryTrend(job_title='{self.job_title}', {self.period}={self.period_start}, count={self.count})>"
@@ -0,0 +1,56 @@
+"""
+Summary models - Materializált összesítők (munkakörök, helyszínek)
+"""
+
+from sqlalchemy import Column, String, BigInteger, Float, DateTime
+
+from ..config.database import Base
+
+# Materializált nézetek, nem táblák: az alembic autogenerate kihagyja őket
+VIEW_INFO = {"is_view": True}
+
+
+class JobTitleSummary(Base):
+    """
+    Munkakörönkénti állásszám és átlagfizetés (alembic 0011, materialized view)
+    Frissítés: StatisticsService.refresh_summaries()
+    """
+    
+    __tablename__ = "job_title_summary"
+    __table_args__ = {"info": VIEW_INFO}
+    
+    title = Column(String(255), primary_key=True)
+    job_count = Column(BigInteger, nullable=False)
+    avg_salary = Column(Float)
+    
+    def __repr__(self):
+        return f"<JobTitleSummary(title='{self.title}', job_count={self.job_count})>"
+
+
+class LocationSummary(Base):
+    """
+    Helyszínenkénti állásszám és átlagfizetés (alembic 0011, materialized view)
+    Frissítés: StatisticsService.refresh_summaries()
+    """
+    
+    __tablename__ = "location_summary"
+    __table_args__ = {"info": VIEW_INFO}
+    
+    location = Column(String(255), primary_key=True)
+    job_count = Column(BigInteger, nullable=False)
+    avg_salary = Column(Float)
+    
+    def __repr__(self):
+        return f"<LocationSummary(location='{self.location}', job_count={self.job_count})>"
+
+
+class SummaryRefresh(Base):
+    """Materializált nézet utolsó frissítésének ideje (alembic 0011)"""
+    
+    __tablename__ = "summary_refreshes"
+    
+    name = Column(String(63), primary_key=True)
+    computed_at = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<SummaryRefresh(name='{self.name}', computed_at={self.computed_at})>"
@@ -0,0 +1,69 @@
+"""
+Title trend models - Munkakörönkénti állásszámok időablakokban (trending)
+"""
+
+from sqlalchemy import Column, String, Integer, BigInteger, Date, DateTime, Index
+
+from ..config.database import Base
+
+# Támogatott időablakok (napokban), a trending_windows sorai
+TRENDING_WINDOWS = (7, 30)
+
+
+class TitleDayCount(Base):
+    """
+    Aktív állások száma munkakörönként és begyűjtési (UTC) naponként
+    (alembic 0016). A jobs táblán lévő triggerek tartják karban; csak a
+    legrégebbi időablak kezdete óta eltelt napok szerepelnek.
+    """
+    
+    __tablename__ = "title_day_counts"
+    
+    day = Column(Date, primary_key=True)
+    job_title = Column(String(255), primary_key=True)
+    job_count = Column(BigInteger, nullable=False, default=0)
+    salary_count = Column(BigInteger, nullable=False, default=0)
+    salary_total = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<TitleDayCount(day={self.day}, job_title='{self.job_title}', job_count={self.job_count})>"
+
+
+class TrendingWindow(Base):
+    """
+    Időablak (az utolsó days nap) kezdőnapja (alembic 0016)
+    Napváltáskor a trending_windows_roll() SQL függvény lépteti.
+    """
+    
+    __tablename__ = "trending_windows"
+    
+    days = Column(Integer, primary_key=True)
+    start_day = Column(Date, nullable=False)
+    rolled_at = Column(DateTime)
+    
+    def __repr__(self):
+        return f"<TrendingWindow(days={self.days}, start_day={self.start_day})>"
+
+
+class TitleWindowCount(Base):
+    """
+    Aktív állások száma munkakörönként egy időablakban (alembic 0016)
+    
+    A triggerek a napi számlálókkal együtt frissítik, így a legkeresettebb
+    munkakörök indexből olvashatók (pontos darabszámok, nem becslés).
+    """
+    
+    __tablename__ = "title_window_counts"
+    
+    days = Column(Integer, primary_key=True)
+    job_title = Column(String(255), primary_key=True)
+    job_count = Column(BigInteger, nullable=False, default=0)
+    salary_count = Column(BigInteger, nullable=False, default=0)
+    salary_total = Column(BigInteger, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("idx_title_window_counts_top", days, job_count.desc(), job_title),
+    )
+    
+    def __repr__(self):
+        return f"<TitleWindowCount(days={self.days}, job_title='{self.job_title}', job_count={self.job_count})>"
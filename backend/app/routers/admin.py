@@ -3,21 +3,51 @@ Admin API Router
 Admin funkciók - scraping kezelés, adatok moderálása
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+from datetime import datetime
 from uuid import UUID
 
 from ..config.database import get_db
 from ..services.admin_service import AdminService
+from ..services.statistics_service import salary_snapshot
+from ..utils.cache import cache_stats
+from ..utils.pagination import Cursor, cursor_param, next_cursor
 
 router = APIRouter()
 
 
+def batch_filters(
+    ids: Optional[List[UUID]] = Body(None),
+    source_portal: Optional[str] = Body(None),
+    scraped_from: Optional[datetime] = Body(None),
+    scraped_until: Optional[datetime] = Body(None)
+) -> Dict:
+    """
+    Kötegelt moderálás szűrői a kérés törzséből; legalább egy megadása
+    kötelező (véletlenül se érintse az összes állást)
+    """
+    if ids is None and not (source_portal or scraped_from or scraped_until):
+        raise HTTPException(
+            status_code=400,
+            detail="Adj meg azonosítókat (ids) vagy szűrőt (source_portal, scraped_from, scraped_until)"
+        )
+    if scraped_from and scraped_until and scraped_from >= scraped_until:
+        raise HTTPException(status_code=400, detail="A scraped_from korábbi kell legyen a scraped_until értékénél")
+    return dict(
+        ids=ids,
+        source_portal=source_portal,
+        scraped_from=scraped_from,
+        scraped_until=scraped_until
+    )
+
+
 @router.post("/scrape/trigger")
 async def trigger_scraping(
     background_tasks: BackgroundTasks,
     portal: str = "all",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Scraping feladat indítása
@@ -36,20 +66,22 @@ async def trigger_scraping(
 
 @router.get("/jobs/pending")
 async def get_pending_jobs(
-    skip: int = 0,
-    limit: int = 20,
-    db: Session = Depends(get_db)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[Cursor] = Depends(cursor_param),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Ellenőrzésre váró állások
     """
     admin_service = AdminService(db)
-    jobs = admin_service.get_pending_jobs(skip=skip, limit=limit)
-    total = admin_service.count_pending_jobs()
+    page = await admin_service.get_pending_jobs(skip=skip, limit=limit, cursor=cursor)
     
     return {
-        "total": total,
-        "jobs": [job.to_dict() for job in jobs]
+        "total": page.total,
+        "approximate": page.approximate,
+        "next_cursor": next_cursor(page.items, limit),
+        "jobs": [job.to_dict() for job in page.items]
     }
 
 
@@ -57,13 +89,13 @@ async def get_pending_jobs(
 async def verify_job(
     job_id: UUID,
     verified: bool = True,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Állás megerősítése/elutasítása
     """
     admin_service = AdminService(db)
-    job = admin_service.verify_job(job_id, verified)
+    job = await admin_service.verify_job(job_id, verified)
     
     if not job:
         raise HTTPException(status_code=404, detail="Állás nem található")
@@ -74,13 +106,52 @@ async def verify_job(
     }
 
 
+@router.post("/jobs/verify-batch")
+async def verify_jobs_batch(
+    verified: bool = Body(True),
+    filters: Dict = Depends(batch_filters),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Állások kötegelt megerősítése/elutasítása egyetlen UPDATE utasítással
+    - Body: {"ids": [...]} és / vagy {"source_portal": ..., "scraped_from": ...,
+      "scraped_until": ...}, valamint "verified" (default: true)
+    - a megadott feltételek ÉS kapcsolatban, csak aktív állásokra
+    """
+    admin_service = AdminService(db)
+    result = await admin_service.verify_jobs(verified, **filters)
+    
+    return {
+        "message": "Állások státusza frissítve",
+        **result
+    }
+
+
+@router.post("/jobs/delete-batch")
+async def delete_jobs_batch(
+    filters: Dict = Depends(batch_filters),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Állások kötegelt törlése (inaktiválás) egyetlen UPDATE utasítással
+    - Body: a verify-batch szűrői
+    """
+    admin_service = AdminService(db)
+    result = await admin_service.delete_jobs(**filters)
+    
+    return {
+        "message": "Állások törölve",
+        **result
+    }
+
+
 @router.delete("/jobs/{job_id}")
-async def delete_job(job_id: UUID, db: Session = Depends(get_db)):
+async def delete_job(job_id: UUID, db: AsyncSession = Depends(get_db)):
     """
     Állás törlése
     """
     admin_service = AdminService(db)
-    success = admin_service.delete_job(job_id)
+    success = await admin_service.delete_job(job_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="Állás nem található")
@@ -91,11 +162,38 @@ async def delete_job(job_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/dashboard/stats")
-async def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(db: AsyncSession = Depends(get_db)):
     """
     Admin dashboard statisztikák
     """
     admin_service = AdminService(db)
-    stats = admin_service.get_dashboard_stats()
+    stats = await admin_service.get_dashboard_stats()
     
     return stats
+
+
+@router.post("/counters/reconcile")
+async def reconcile_counters(db: AsyncSession = Depends(get_db)):
+    """
+    Állásszámlálók újraszámolása a jobs táblából és az eltérések javítása
+    (parancssorból: python manage.py reconcile-counters)
+    """
+    admin_service = AdminService(db)
+    result = await admin_service.reconcile_counters()
+    
+    return {
+        "message": "Számlálók újraszámolva",
+        **result
+    }
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Folyamaton belüli cache-ek találati statisztikája és az analitikai
+    pillanatkép állapota (workerenként külön, a kérést kiszolgáló worker értékei)
+    """
+    return {
+        "caches": cache_stats(),
+        "salary_snapshot": salary_snapshot.info()
+    }
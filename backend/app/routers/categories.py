@@ -3,23 +3,27 @@ Categories API Router
 Kategóriák kezelése
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Tuple
 from uuid import UUID
 
 from ..config.database import get_db
 from ..services.category_service import CategoryService
+from ..utils.pagination import Cursor, cursor_param, next_cursor
+from ..utils.projection import fields_param, serialize_job_rows
+from ..utils.serialization import json_response
 
 router = APIRouter()
 
 
 @router.get("/")
-async def get_categories(db: Session = Depends(get_db)):
+async def get_categories(db: AsyncSession = Depends(get_db)):
     """
     Összes kategória listázása
     """
     category_service = CategoryService(db)
-    categories = category_service.get_all_categories()
+    categories = await category_service.get_all_categories()
     
     return {
         "total": len(categories),
@@ -28,18 +32,24 @@ async def get_categories(db: Session = Depends(get_db)):
 
 
 @router.get("/{slug}")
-async def get_category(slug: str, db: Session = Depends(get_db)):
+async def get_category(
+    slug: str,
+    include_descendants: bool = Query(False, description="Az alkategóriák állásai is számítanak"),
+    db: AsyncSession = Depends(get_db)
+):
     """
     Egy kategória részletei slug alapján
     """
     category_service = CategoryService(db)
-    category = category_service.get_category_by_slug(slug)
+    category = await category_service.get_category_by_slug(slug)
     
     if not category:
         raise HTTPException(status_code=404, detail="Kategória nem található")
     
     # Kategória állásainak száma
-    job_count = category_service.get_job_count_for_category(category.id)
+    job_count = await category_service.get_job_count_for_category(
+        category.id, include_descendants=include_descendants
+    )
     
     result = category.to_dict()
     result["job_count"] = job_count
@@ -50,24 +60,34 @@ async def get_category(slug: str, db: Session = Depends(get_db)):
 @router.get("/{slug}/jobs")
 async def get_category_jobs(
     slug: str,
-    skip: int = 0,
-    limit: int = 10,
-    db: Session = Depends(get_db)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[Cursor] = Depends(cursor_param),
+    fields: Tuple[str, ...] = Depends(fields_param),
+    include_descendants: bool = Query(False, description="Az alkategóriák állásai is"),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Egy kategória állásai
+    - Paginálás: cursor (ajánlott) vagy skip és limit paraméterekkel
+    - fields: summary (alapértelmezett, leírás nélkül), full vagy mezőlista
+    - include_descendants=true: a teljes részfa (alkategóriák) állásai
     """
     category_service = CategoryService(db)
-    category = category_service.get_category_by_slug(slug)
+    category = await category_service.get_category_by_slug(slug)
     
     if not category:
         raise HTTPException(status_code=404, detail="Kategória nem található")
     
-    jobs = category_service.get_jobs_for_category(category.id, skip, limit)
-    total = category_service.get_job_count_for_category(category.id)
+    page = await category_service.get_jobs_for_category(
+        category.id, skip, limit, cursor=cursor, fields=fields,
+        include_descendants=include_descendants
+    )
     
-    return {
+    return json_response({
         "category": category.to_dict(),
-        "total": total,
-        "jobs": [job.to_dict() for job in jobs]
-    }
+        "total": page.total,
+        "approximate": page.approximate,
+        "next_cursor": next_cursor(page.items, limit),
+        "jobs": serialize_job_rows(page.items, fields)
+    })
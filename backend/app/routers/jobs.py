@@ -3,60 +3,133 @@ Jobs API Router
 Állások kezelése - CRUD műveletek, keresés, szűrés
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
-from ..config.database import get_db
+from ..config.database import SessionLocal, get_db
 from ..models.job import Job
 from ..services.job_service import JobService
+from ..services.statistics_service import StatisticsService
+from ..utils.export import (
+    EXPORT_CSV, EXPORT_FORMAT_PATTERN, EXPORT_NDJSON, MEDIA_TYPES,
+    encode_csv, encode_csv_header, encode_ndjson,
+)
+from ..utils.pagination import Cursor, cursor_param, next_cursor
+from ..utils.projection import FIELDS_FULL, fields_param, make_fields_param, serialize_job_rows
+from ..utils.serialization import json_response
+from ..utils.search import MATCH_CONTAINS, MATCH_MODE_PATTERN
 
 router = APIRouter()
 
 
+def job_filters(
+    location: Optional[str] = None,
+    location_match: str = Query(MATCH_CONTAINS, pattern=MATCH_MODE_PATTERN),
+    category_id: Optional[UUID] = None,
+    min_salary: Optional[int] = None,
+    verified_only: bool = False
+) -> Dict:
+    """Lista és export közös szűrő paraméterei (JobService filters dict)"""
+    return {
+        "location": location,
+        "location_match": location_match,
+        "category_id": category_id,
+        "min_salary": min_salary,
+        "verified_only": verified_only
+    }
+
+
 @router.get("/")
 async def get_jobs(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    location: Optional[str] = None,
-    category_id: Optional[UUID] = None,
-    min_salary: Optional[int] = None,
-    verified_only: bool = False,
-    db: Session = Depends(get_db)
+    filters: Dict = Depends(job_filters),
+    cursor: Optional[Cursor] = Depends(cursor_param),
+    fields: Tuple[str, ...] = Depends(fields_param),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Állások listázása
-    - Paginálás: skip és limit paraméterekkel
+    - Paginálás: cursor (ajánlott) vagy skip és limit paraméterekkel
     - Szűrés: helyszín, kategória, fizetés szerint
+    - location_match=fuzzy: elgépelés-tűrő helyszín szűrés
+    - fields: summary (alapértelmezett, leírás nélkül), full vagy mezőlista
     """
     job_service = JobService(db)
+    page = await job_service.get_jobs(
+        skip=skip, limit=limit, filters=filters, cursor=cursor, fields=fields
+    )
     
-    filters = {
-        "location": location,
-        "category_id": category_id,
-        "min_salary": min_salary,
-        "verified_only": verified_only
-    }
-    
-    jobs = job_service.get_jobs(skip=skip, limit=limit, filters=filters)
-    total = job_service.count_jobs(filters=filters)
-    
-    return {
-        "total": total,
+    return json_response({
+        "total": page.total,
+        "approximate": page.approximate,
         "skip": skip,
         "limit": limit,
-        "jobs": [job.to_dict() for job in jobs]
-    }
+        "next_cursor": next_cursor(page.items, limit),
+        "jobs": serialize_job_rows(page.items, fields)
+    })
+
+
+async def _export_stream(filters: Dict, fields: Tuple[str, ...], cursor: Optional[Cursor], format: str):
+    """
+    Export törzse kötegenként
+    Saját sessiont nyit, mert a stream a route visszatérése után is olvas.
+    """
+    if format == EXPORT_CSV:
+        yield encode_csv_header(fields)
+    
+    async with SessionLocal() as db:
+        async for rows in JobService(db).stream_jobs(filters=filters, fields=fields, cursor=cursor):
+            if format == EXPORT_CSV:
+                yield encode_csv(rows, fields)
+            else:
+                yield encode_ndjson(rows, fields)
+
+
+@router.get("/export")
+async def export_jobs(
+    format: str = Query(EXPORT_NDJSON, pattern=EXPORT_FORMAT_PATTERN),
+    filters: Dict = Depends(job_filters),
+    fields: Tuple[str, ...] = Depends(make_fields_param(FIELDS_FULL)),
+    cursor: Optional[Cursor] = Depends(cursor_param),
+    after_id: Optional[UUID] = Query(
+        None,
+        description="Megszakadt export folytatása az utolsó megkapott állás id-ja után"
+    ),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Állások tömeges exportja streamelve (NDJSON vagy CSV)
+    - ugyanazok a szűrők, mint a listánál; sorrend: legújabbak elöl
+    - szerver oldali cursor, a memóriahasználat nem függ a találatok számától
+    - folytatás: after_id (utolsó megkapott id) vagy a lista next_cursor értéke
+    - az id mező mindig szerepel a kimenetben
+    """
+    if "id" not in fields:
+        fields = ("id",) + fields
+    
+    if after_id:
+        cursor = await JobService(db).get_keyset(after_id)
+        if cursor is None:
+            raise HTTPException(status_code=400, detail="Az after_id nem létező állásra mutat")
+    
+    return StreamingResponse(
+        _export_stream(filters, fields, cursor, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="jobs.{format}"'}
+    )
 
 
 @router.get("/{job_id}")
-async def get_job(job_id: UUID, db: Session = Depends(get_db)):
+async def get_job(job_id: UUID, db: AsyncSession = Depends(get_db)):
     """
     Egy állás részletes adatai
     """
     job_service = JobService(db)
-    job = job_service.get_job_by_id(job_id)
+    job = await job_service.get_job_by_id(job_id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Állás nem található")
@@ -69,23 +142,26 @@ async def search_jobs(
     q: str = Query(..., min_length=2),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    fields: Tuple[str, ...] = Depends(fields_param),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Állások keresése kulcsszavak alapján
-    - Keres a cím, leírás és készségek között
+    - Keres a cím, cég és leírás között (ékezetfüggetlen, szótövezett)
+    - "idézőjeles kifejezés" és prefix* keresés, relevancia szerinti sorrend
+    - fields: summary (alapértelmezett, leírás nélkül), full vagy mezőlista
     """
     job_service = JobService(db)
-    jobs = job_service.search_jobs(query=q, skip=skip, limit=limit)
-    total = job_service.count_search_results(query=q)
+    page = await job_service.search_jobs(query=q, skip=skip, limit=limit, fields=fields)
     
-    return {
+    return json_response({
         "query": q,
-        "total": total,
+        "total": page.total,
+        "approximate": page.approximate,
         "skip": skip,
         "limit": limit,
-        "jobs": [job.to_dict() for job in jobs]
-    }
+        "jobs": serialize_job_rows(page.items, fields)
+    })
 
 
 @router.get("/by-title/{title}")
@@ -93,31 +169,64 @@ async def get_jobs_by_title(
     title: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    match: str = Query(MATCH_CONTAINS, pattern=MATCH_MODE_PATTERN),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Állások egy adott címmel
+    - match=fuzzy: elgépelés-tűrő, hasonlóság szerint rendezett találatok
     """
     job_service = JobService(db)
-    jobs = job_service.get_jobs_by_title(title=title, skip=skip, limit=limit)
+    jobs = await job_service.get_jobs_by_title(title=title, skip=skip, limit=limit, match=match)
     
     return {
         "title": title,
+        "match": match,
         "count": len(jobs),
         "jobs": [job.to_dict() for job in jobs]
     }
 
 
 @router.post("/")
-async def create_job(job_data: dict, db: Session = Depends(get_db)):
+async def create_job(job_data: dict, db: AsyncSession = Depends(get_db)):
     """
     Új állás létrehozása
     (Admin funkció)
     """
     job_service = JobService(db)
-    job = job_service.create_job(job_data)
+    job = await job_service.create_job(job_data)
     
     return {
         "message": "Állás sikeresen létrehozva",
         "job": job.to_dict()
     }
+
+
+async def refresh_summaries():
+    """Materializált összesítők frissítése a válasz után (saját sessionnel)"""
+    async with SessionLocal() as db:
+        await StatisticsService(db).refresh_summaries(wait=False)
+
+
+@router.post("/bulk")
+async def bulk_upsert_jobs(
+    background_tasks: BackgroundTasks,
+    jobs: List[dict] = Body(..., embed=True),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Állások tömeges betöltése (scraper / admin)
+    - Body: {"jobs": [...]}, akár több ezer állás egyszerre
+    - (source_portal, source_url) alapján új állás vagy meglévő frissítése
+    - változás esetén a materializált összesítők a háttérben frissülnek
+    """
+    job_service = JobService(db)
+    result = await job_service.bulk_upsert(jobs)
+    
+    if result["inserted"] or result["updated"]:
+        background_tasks.add_task(refresh_summaries)
+    
+    return {
+        "message": "Tömeges betöltés kész",
+        **result
+    }
@@ -3,12 +3,19 @@ Statistics API Router
 Fizetési statisztikák és elemzések
 """
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+from datetime import date
+from uuid import UUID
 
 from ..config.database import get_db
-from ..services.statistics_service import StatisticsService
+from ..models.salary_trend import PERIOD_PATTERN, PERIOD_WEEK
+from ..models.title_trend import TRENDING_WINDOWS
+from ..services.statistics_service import (
+    StatisticsService, DEFAULT_HISTOGRAM_BUCKETS, SCALE_LINEAR, SCALE_PATTERN
+)
+from ..utils.search import MATCH_CONTAINS, MATCH_EXACT, MATCH_MODE_PATTERN
 
 router = APIRouter()
 
@@ -18,56 +25,223 @@ async def get_salary_statistics(
     job_title: Optional[str] = None,
     location: Optional[str] = None,
     experience_level: Optional[str] = None,
-    db: Session = Depends(get_db)
+    category_id: Optional[UUID] = None,
+    match: str = Query(MATCH_CONTAINS, pattern=MATCH_MODE_PATTERN),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Fizetési statisztikák lekérése
-    - Szűrhető munkakör, helyszín és tapasztalat szerint
+    Fizetési statisztikák lekérése (előre számolt kockából)
+    - Szűrhető munkakör, helyszín, tapasztalat és kategória szerint;
+      a meg nem adott szűrő az összesített szintet jelenti
+    - match=fuzzy: elgépelés-tűrő munkakör keresés, hasonlóság szerint rendezve
+    - match=exact: pontos munkakör, egyetlen indexelt sor
     """
     stats_service = StatisticsService(db)
     
-    stats = stats_service.get_salary_stats(
+    stats = await stats_service.get_salary_stats(
         job_title=job_title,
         location=location,
-        experience_level=experience_level
+        experience_level=experience_level,
+        category_id=category_id,
+        match=match
     )
     
     return {
         "filters": {
             "job_title": job_title,
             "location": location,
-            "experience_level": experience_level
+            "experience_level": experience_level,
+            "category_id": category_id,
+            "match": match
         },
         "statistics": [stat.to_dict() for stat in stats]
     }
 
 
+@router.get("/salary-quantiles")
+async def get_salary_quantiles(
+    job_title: Optional[str] = None,
+    location: Optional[str] = None,
+    experience_level: Optional[str] = None,
+    category_id: Optional[UUID] = None,
+    match: str = Query(MATCH_CONTAINS, pattern=MATCH_MODE_PATTERN),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Fizetési kvantilisek tetszőleges szűrőkombinációra
+    - bekapcsolt analitikai pillanatképből pontos értékek havi fizetésre
+      váltva (source: snapshot), pontos munkakörnél csak a címkulcs
+      feloldása olvas az adatbázisból
+    - egyébként a csoportonkénti kvantilis vázlatok összevonásával
+      számolva (source: sketch, ~1% relatív hiba)
+    """
+    stats_service = StatisticsService(db)
+    filters = dict(
+        job_title=job_title,
+        location=location,
+        experience_level=experience_level,
+        category_id=category_id,
+        match=match
+    )
+    
+    source = "snapshot"
+    quantiles = await stats_service.get_snapshot_statistics(**filters)
+    if quantiles is None:
+        source = "sketch"
+        quantiles = await stats_service.get_sketch_statistics(**filters)
+    
+    return {
+        "source": source,
+        "filters": {
+            "job_title": job_title,
+            "location": location,
+            "experience_level": experience_level,
+            "category_id": category_id,
+            "match": match
+        },
+        "statistics": quantiles
+    }
+
+
+@router.get("/rank")
+async def get_salary_rank(
+    salary: int = Query(..., ge=1),
+    job_title: str = Query(..., min_length=1),
+    location: Optional[str] = None,
+    experience_level: Optional[str] = None,
+    category_id: Optional[UUID] = None,
+    match: str = Query(MATCH_EXACT, pattern=MATCH_MODE_PATTERN),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Havi fizetés percentilis helye ("hol áll az ajánlatom")
+    - bekapcsolt analitikai pillanatképből pontos rang (source: snapshot,
+      match=exact és legalább 3 fizetési adat esetén)
+    - egyébként a statisztika kocka cellájának tárolt eloszlásfüggvényéből
+      (5%-onkénti percentilisek, lineáris interpoláció), egy indexelt sor
+      (source: cdf)
+    - surrounding: a rang körüli percentilisek
+    """
+    stats_service = StatisticsService(db)
+    filters = dict(
+        job_title=job_title,
+        location=location,
+        experience_level=experience_level,
+        category_id=category_id,
+        match=match
+    )
+    
+    source = "snapshot"
+    rank = await stats_service.get_snapshot_rank(salary, **filters)
+    if rank is None:
+        source = "cdf"
+        rank = await stats_service.get_salary_rank(salary, **filters)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="Nincs elég fizetési adat ehhez a szűréshez")
+    
+    return {
+        "source": source,
+        "filters": filters,
+        **rank
+    }
+
+
+@router.get("/trend")
+async def get_salary_trend(
+    job_title: Optional[str] = None,
+    location: Optional[str] = None,
+    category_id: Optional[UUID] = None,
+    match: str = Query(MATCH_EXACT, pattern=MATCH_MODE_PATTERN),
+    period: str = Query(PERIOD_WEEK, pattern=PERIOD_PATTERN),
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Fizetési idősor a begyűjtés napja / hete szerint
+    - csak az előre összesített salary_trends sorokat olvassa
+      (egy 2 éves heti trend ~100 periódus)
+    - az utolsó lezárt napig frissül (manage.py append-trends)
+    """
+    if since and until and since > until:
+        raise HTTPException(status_code=400, detail="A since dátum nem lehet későbbi az until dátumnál")
+    
+    stats_service = StatisticsService(db)
+    trend = await stats_service.get_salary_trend(
+        job_title=job_title,
+        location=location,
+        category_id=category_id,
+        match=match,
+        period=period,
+        since=since,
+        until=until
+    )
+    
+    return {
+        "filters": {
+            "job_title": job_title,
+            "location": location,
+            "category_id": category_id,
+            "match": match,
+            "period": period,
+            "since": since,
+            "until": until
+        },
+        "count": len(trend),
+        "trend": trend
+    }
+
+
 @router.get("/trending")
 async def get_trending_jobs(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    days: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Legkeresettebb munkakörök
+    - materializált összesítőből; computed_at: az utolsó frissítés ideje
+    - days (7 vagy 30): az utolsó days napban begyűjtött aktív állások
+      alapján, triggerek által folyamatosan karbantartott számlálókból
     """
     stats_service = StatisticsService(db)
-    trending = stats_service.get_trending_jobs(limit=limit)
+    if days is None:
+        trending, computed_at = await stats_service.get_trending_jobs(limit=limit)
+        
+        return {
+            "count": len(trending),
+            "computed_at": computed_at,
+            "trending_jobs": trending
+        }
+    
+    if days not in TRENDING_WINDOWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A days értéke ezek egyike lehet: {', '.join(map(str, TRENDING_WINDOWS))}"
+        )
+    trending, start_day = await stats_service.get_trending_window(days, limit=limit)
     
     return {
         "count": len(trending),
+        "window": {"days": days, "start_day": start_day},
         "trending_jobs": trending
     }
 
 
 @router.get("/locations")
-async def get_location_statistics(db: Session = Depends(get_db)):
+async def get_location_statistics(
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Helyszín szerinti statisztikák
+    Helyszín szerinti statisztikák (legtöbb állás elöl)
+    - materializált összesítőből; computed_at: az utolsó frissítés ideje
     """
     stats_service = StatisticsService(db)
-    location_stats = stats_service.get_location_statistics()
+    location_stats, computed_at = await stats_service.get_location_statistics(limit=limit)
     
     return {
+        "computed_at": computed_at,
         "locations": location_stats
     }
 
@@ -75,15 +249,46 @@ async def get_location_statistics(db: Session = Depends(get_db)):
 @router.get("/salary-distribution")
 async def get_salary_distribution(
     job_title: Optional[str] = None,
-    db: Session = Depends(get_db)
+    location: Optional[str] = None,
+    experience_level: Optional[str] = None,
+    category_id: Optional[UUID] = None,
+    match: str = Query(MATCH_CONTAINS, pattern=MATCH_MODE_PATTERN),
+    buckets: int = Query(DEFAULT_HISTOGRAM_BUCKETS, ge=1, le=100),
+    scale: str = Query(SCALE_LINEAR, pattern=SCALE_PATTERN),
+    min_salary: Optional[int] = Query(None, ge=1),
+    max_salary: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Fizetési eloszlás
+    - összesítők, kvartilisek és hisztogram egyetlen lekérdezésben
+    - scale=log: logaritmikus vödrök (a fizetések jobbra elnyúló eloszlásához)
+    - min_salary / max_salary: a hisztogram tartománya (alapból az adatokból)
     """
+    if min_salary is not None and max_salary is not None and min_salary >= max_salary:
+        raise HTTPException(status_code=400, detail="A min_salary értéke kisebb kell legyen a max_salary értékénél")
+    
     stats_service = StatisticsService(db)
-    distribution = stats_service.get_salary_distribution(job_title=job_title)
+    distribution = await stats_service.get_salary_distribution(
+        job_title=job_title,
+        location=location,
+        experience_level=experience_level,
+        category_id=category_id,
+        match=match,
+        buckets=buckets,
+        scale=scale,
+        min_salary=min_salary,
+        max_salary=max_salary
+    )
     
     return {
         "job_title": job_title,
+        "filters": {
+            "job_title": job_title,
+            "location": location,
+            "experience_level": experience_level,
+            "category_id": category_id,
+            "match": match
+        },
         "distribution": distribution
     }
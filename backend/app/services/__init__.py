@@ -5,5 +5,7 @@ from .job_service import JobService
 from .category_service import CategoryService
 from .statistics_service import StatisticsService
 from .admin_service import AdminService
+from .counter_service import CounterService
+from .title_service import TitleService
 
-__all__ = ["JobService", "CategoryService", "StatisticsService", "AdminService"]
+__all__ = ["JobService", "CategoryService", "StatisticsService", "AdminService", "CounterService", "TitleService"]
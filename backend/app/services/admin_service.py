@@ -3,22 +3,38 @@ Admin Service
 Admin funkciók business logic
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional, Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import any_, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from typing import Optional, Dict, List
+from datetime import datetime
 from uuid import UUID
 import logging
 
+from ..config.settings import settings
 from ..models.job import Job
+from ..utils.cache import TTLCache
+from ..utils.pagination import Cursor, Page, fetch_page
+from .counter_service import CounterService
 
 logger = logging.getLogger(__name__)
 
+# Dashboard pillanatkép: több admin egyidejű frissítése egy számláló olvasás
+# TTL-enként és workerenként; a moderálás (verify / delete) üríti
+dashboard_cache = TTLCache(
+    "dashboard",
+    maxsize=1,
+    ttl=settings.DASHBOARD_CACHE_TTL,
+    check_interval=settings.CACHE_GENERATION_CHECK_INTERVAL
+)
+
 
 class AdminService:
     """Admin service osztály"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
+        self.counters = CounterService(db)
     
     def trigger_scraping(self, portal: str):
         """Scraping feladat indítása"""
@@ -27,56 +43,155 @@ class AdminService:
         # from scraper.tasks import scrape_portal
         # scrape_portal.delay(portal)
     
-    def get_pending_jobs(self, skip: int = 0, limit: int = 20) -> List[Job]:
-        """Ellenőrzésre váró állások"""
-        return self.db.query(Job).filter(
+    def _pending_query(self):
+        """Ellenőrzésre váró aktív állások"""
+        return select(Job).where(
             Job.verified == False,
             Job.active == True
-        ).offset(skip).limit(limit).all()
+        )
     
-    def count_pending_jobs(self) -> int:
-        """Ellenőrzésre váró állások száma"""
-        return self.db.query(Job).filter(
-            Job.verified == False,
-            Job.active == True
-        ).count()
+    async def get_pending_jobs(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: Optional[Cursor] = None
+    ) -> Page:
+        """Ellenőrzésre váró állások (legújabbak elöl), darabszámmal együtt"""
+        return await fetch_page(
+            self.db,
+            self._pending_query(),
+            order_by=(Job.created_at.desc(), Job.id.desc()),
+            limit=limit,
+            skip=skip,
+            cursor=cursor,
+            keyset=(Job.created_at, Job.id),
+            total=await self.count_pending_jobs()
+        )
+    
+    async def count_pending_jobs(self) -> int:
+        """Ellenőrzésre váró állások száma (számlálóból)"""
+        return (await self.counters.get_totals())["pending_count"]
+    
+    async def _invalidate_dashboard(self):
+        """
+        Dashboard cache ürítése a moderálás commitja után. A generáció külön,
+        rövid tranzakcióban nő, így az egyidejű moderálások nem várnak a
+        cache_generations sor zárjára a saját tranzakciójuk végéig; hiba
+        esetén a többi worker a TTL lejártával frissül.
+        """
+        try:
+            await dashboard_cache.invalidate(self.db)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            dashboard_cache.clear()
+            logger.error(f"Dashboard cache invalidation failed: {e}")
     
-    def verify_job(self, job_id: UUID, verified: bool) -> Optional[Job]:
+    async def verify_job(self, job_id: UUID, verified: bool) -> Optional[Job]:
         """Állás megerősítése"""
-        job = self.db.query(Job).filter(Job.id == job_id).first()
+        job = await self.db.get(Job, job_id)
         if job:
             job.verified = verified
-            self.db.commit()
-            self.db.refresh(job)
+            await self.db.commit()
+            await self.db.refresh(job)
+            await self._invalidate_dashboard()
         return job
     
-    def delete_job(self, job_id: UUID) -> bool:
+    async def delete_job(self, job_id: UUID) -> bool:
         """Állás törlése"""
-        job = self.db.query(Job).filter(Job.id == job_id).first()
+        job = await self.db.get(Job, job_id)
         if job:
             job.active = False
-            self.db.commit()
+            await self.db.commit()
+            await self._invalidate_dashboard()
             return True
         return False
     
-    def get_dashboard_stats(self) -> Dict:
-        """Dashboard statisztikák"""
-        total_jobs = self.db.query(Job).filter(Job.active == True).count()
-        verified_jobs = self.db.query(Job).filter(
-            Job.active == True,
-            Job.verified == True
-        ).count()
-        pending_jobs = self.count_pending_jobs()
-        
-        # Portálok szerinti bontás
-        portal_stats = self.db.query(
-            Job.source_portal,
-            func.count(Job.id).label('count')
-        ).filter(
-            Job.active == True
-        ).group_by(
+    def _batch_conditions(
+        self,
+        ids: Optional[List[UUID]] = None,
+        source_portal: Optional[str] = None,
+        scraped_from: Optional[datetime] = None,
+        scraped_until: Optional[datetime] = None
+    ) -> List:
+        """Kötegelt moderálás szűrői (aktív állások; a megadott feltételek ÉS kapcsolatban)"""
+        conditions = [Job.active == True]
+        if ids is not None:
+            # Egyetlen tömb paraméter: az IN listánként egy bind paraméter
+            # lenne (asyncpg: legfeljebb 32767)
+            conditions.append(Job.id == any_(literal(ids, ARRAY(PG_UUID(as_uuid=True)))))
+        if source_portal:
+            conditions.append(Job.source_portal == source_portal)
+        if scraped_from:
+            conditions.append(Job.scraped_at >= scraped_from)
+        if scraped_until:
+            conditions.append(Job.scraped_at < scraped_until)
+        return conditions
+    
+    async def _update_batch(self, conditions: List, values: Dict) -> Dict:
+        """
+        Egyetlen halmazalapú UPDATE; a RETURNING sorokból portálonkénti
+        összesítő. A számlálókat az utasítás szintű triggerek egyszer
+        frissítik, a dashboard cache egyszer ürül.
+        """
+        changed = update(Job).where(*conditions).values(**values).returning(
             Job.source_portal
-        ).all()
+        ).cte("changed")
+        rows = (await self.db.execute(
+            select(changed.c.source_portal, func.count().label("count")).group_by(
+                changed.c.source_portal
+            ).order_by(func.count().desc(), changed.c.source_portal)
+        )).all()
+        
+        updated = sum(row.count for row in rows)
+        await self.db.commit()
+        if updated:
+            await self._invalidate_dashboard()
+        
+        return {
+            "updated": updated,
+            "portals": [{"portal": row.source_portal, "count": row.count} for row in rows]
+        }
+    
+    async def verify_jobs(self, verified: bool = True, **filters) -> Dict:
+        """
+        Állások kötegelt megerősítése / elutasítása (azonosítók és / vagy
+        portál, begyűjtési időszak szerint); csak a változó sorok íródnak
+        
+        Returns:
+            {"updated": módosult állások, "portals": portálonkénti bontás}
+        """
+        conditions = self._batch_conditions(**filters)
+        conditions.append(Job.verified.is_distinct_from(verified))
+        return await self._update_batch(conditions, {"verified": verified})
+    
+    async def delete_jobs(self, **filters) -> Dict:
+        """
+        Állások kötegelt törlése (inaktiválás), a verify_jobs szűrőivel
+        
+        Returns:
+            {"updated": törölt állások, "portals": portálonkénti bontás}
+        """
+        return await self._update_batch(self._batch_conditions(**filters), {"active": False})
+    
+    async def get_dashboard_stats(self) -> Dict:
+        """
+        Dashboard statisztikák (cache-elt pillanatkép, computed_at: a
+        számítás ideje)
+        """
+        await dashboard_cache.validate(self.db)
+        stats = dashboard_cache.get("stats")
+        if stats is None:
+            stats = await self._compute_dashboard_stats()
+            dashboard_cache.set("stats", stats)
+        return stats
+    
+    async def _compute_dashboard_stats(self) -> Dict:
+        """Dashboard statisztikák a számláló táblából (egy lekérdezés, COUNT nélkül)"""
+        portals = await self.counters.get_portal_counts()
+        total_jobs = sum(row.active_count for row in portals)
+        verified_jobs = sum(row.verified_count for row in portals)
+        pending_jobs = sum(row.pending_count for row in portals)
         
         return {
             "total_jobs": total_jobs,
@@ -84,7 +199,13 @@ class AdminService:
             "pending_jobs": pending_jobs,
             "verification_rate": round((verified_jobs / total_jobs * 100) if total_jobs > 0 else 0, 2),
             "portals": [
-                {"portal": row.source_portal, "count": row.count}
-                for row in portal_stats
-            ]
+                {"portal": row.key or None, "count": row.active_count}
+                for row in portals
+                if row.active_count > 0
+            ],
+            "computed_at": datetime.utcnow()
         }
+    
+    async def reconcile_counters(self) -> Dict[str, int]:
+        """Számlálók újraszámolása (eltérések javítása)"""
+        return await self.counters.reconcile()
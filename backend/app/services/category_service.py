@@ -3,50 +3,143 @@ Category Service
 Kategóriákkal kapcsolatos business logic
 """
 
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from typing import List, Optional, Sequence
 from uuid import UUID
 
+from ..config.settings import settings
 from ..models.category import Category
 from ..models.job import Job
+from ..utils.cache import MISSING, TTLCache
+from ..utils.pagination import Cursor, Page, fetch_page
+from ..utils.projection import job_columns
+from .counter_service import CounterService
+
+# Kategóriák ritkán változnak: workerenkénti cache (lista és slug -> kategória)
+# A cache-elt objektumok session nélküliek, csak olvasásra használjuk őket.
+category_cache = TTLCache(
+    "categories",
+    maxsize=settings.CATEGORY_CACHE_MAXSIZE,
+    ttl=settings.CATEGORY_CACHE_TTL,
+    check_interval=settings.CACHE_GENERATION_CHECK_INTERVAL
+)
 
 
 class CategoryService:
     """Category service osztály"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_all_categories(self) -> List[Category]:
-        """Összes kategória"""
-        return self.db.query(Category).order_by(Category.name).all()
+    def _detach(self, category: Optional[Category]) -> Optional[Category]:
+        """Objektum leválasztása a sessionről (cache-be kerül, más kérések is olvassák)"""
+        if category is not None:
+            self.db.expunge(category)
+        return category
+    
+    async def get_all_categories(self) -> List[Category]:
+        """Összes kategória (cache-elve)"""
+        await category_cache.validate(self.db)
+        
+        categories = category_cache.get("all", MISSING)
+        if categories is MISSING:
+            result = await self.db.execute(select(Category).order_by(Category.name))
+            categories = [self._detach(category) for category in result.scalars()]
+            category_cache.set("all", categories)
+        return categories
     
-    def get_category_by_slug(self, slug: str) -> Optional[Category]:
-        """Kategória lekérése slug alapján"""
-        return self.db.query(Category).filter(Category.slug == slug).first()
+    async def get_category_by_slug(self, slug: str) -> Optional[Category]:
+        """Kategória lekérése slug alapján (cache-elve, a nem létező slug is)"""
+        await category_cache.validate(self.db)
+        
+        key = ("slug", slug)
+        category = category_cache.get(key, MISSING)
+        if category is MISSING:
+            result = await self.db.execute(select(Category).where(Category.slug == slug))
+            category = self._detach(result.scalars().first())
+            category_cache.set(key, category)
+        return category
     
-    def get_category_by_id(self, category_id: UUID) -> Optional[Category]:
+    async def get_category_by_id(self, category_id: UUID) -> Optional[Category]:
         """Kategória lekérése ID alapján"""
-        return self.db.query(Category).filter(Category.id == category_id).first()
+        return await self.db.get(Category, category_id)
     
-    def get_jobs_for_category(self, category_id: UUID, skip: int = 0, limit: int = 10) -> List[Job]:
-        """Kategóriához tartozó állások"""
-        return self.db.query(Job).filter(
-            Job.category_id == category_id,
-            Job.active == True
-        ).offset(skip).limit(limit).all()
+    def _category_condition(self, category_id: UUID, include_descendants: bool = False):
+        """
+        Job.category_id feltétel: pontos egyezés, vagy a teljes részfa
+        (a materializált útvonal prefixe alapján, egy allekérdezéssel)
+        """
+        if not include_descendants:
+            return Job.category_id == category_id
+        
+        root = aliased(Category)
+        root_path = select(root.path).where(root.id == category_id).scalar_subquery()
+        return Job.category_id.in_(
+            select(Category.id).where(Category.path.startswith(root_path))
+        )
     
-    def get_job_count_for_category(self, category_id: UUID) -> int:
-        """Kategóriához tartozó állások száma"""
-        return self.db.query(Job).filter(
-            Job.category_id == category_id,
+    def _category_jobs_query(
+        self,
+        category_id: UUID,
+        fields: Optional[Sequence[str]] = None,
+        include_descendants: bool = False
+    ):
+        """Kategória aktív állásai (fields megadása esetén csak a kért oszlopok)"""
+        query = select(*job_columns(fields)) if fields else select(Job)
+        return query.where(
+            self._category_condition(category_id, include_descendants),
             Job.active == True
-        ).count()
+        )
+    
+    async def get_jobs_for_category(
+        self,
+        category_id: UUID,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[Cursor] = None,
+        fields: Optional[Sequence[str]] = None,
+        include_descendants: bool = False
+    ) -> Page:
+        """
+        Kategóriához tartozó állások (legújabbak elöl), darabszámmal együtt
+        - include_descendants: az alkategóriák állásai is
+        - a darabszám a számláló táblából jön (nincs COUNT)
+        """
+        return await fetch_page(
+            self.db,
+            self._category_jobs_query(category_id, fields, include_descendants),
+            order_by=(Job.created_at.desc(), Job.id.desc()),
+            limit=limit,
+            skip=skip,
+            cursor=cursor,
+            keyset=(Job.created_at, Job.id),
+            total=await self.get_job_count_for_category(category_id, include_descendants)
+        )
+    
+    async def get_job_count_for_category(
+        self,
+        category_id: UUID,
+        include_descendants: bool = False
+    ) -> int:
+        """Kategóriához (és opcionálisan alkategóriáihoz) tartozó aktív állások száma (számlálóból)"""
+        return await CounterService(self.db).get_category_count(category_id, include_descendants)
     
-    def create_category(self, name: str, slug: str, description: str = None) -> Category:
-        """Új kategória létrehozása"""
-        category = Category(name=name, slug=slug, description=description)
+    async def create_category(
+        self,
+        name: str,
+        slug: str,
+        description: str = None,
+        parent_id: Optional[UUID] = None
+    ) -> Category:
+        """Új kategória létrehozása (az útvonalat trigger számolja)"""
+        category = Category(name=name, slug=slug, description=description, parent_id=parent_id)
         self.db.add(category)
-        self.db.commit()
-        self.db.refresh(category)
+        await category_cache.invalidate(self.db)
+        await self.db.commit()
+        await self.db.refresh(category)
+        
+        # A commit előtt más kérés még a régi listát tölthette a cache-be
+        category_cache.clear()
         return category
@@ -0,0 +1,138 @@
+"""
+Counter Service
+Denormalizált állásszámlálók olvasása és újraszámolása
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Text, and_, cast, delete, func, literal, select, text, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+from typing import Dict, List
+from uuid import UUID
+import logging
+
+from ..models.category import Category
+from ..models.job import Job
+from ..models.job_counter import JobCounter, SCOPE_CATEGORY, SCOPE_PORTAL
+
+logger = logging.getLogger(__name__)
+
+COUNTER_COLUMNS = ("active_count", "verified_count", "pending_count")
+
+
+def _recount_query():
+    """Számlálók pontos értéke a jobs táblából (kategóriánként és portálonként)"""
+    active = Job.active.is_(True)
+    counts = (
+        func.count().filter(active).label("active_count"),
+        func.count().filter(active & Job.verified.is_(True)).label("verified_count"),
+        func.count().filter(active & Job.verified.is_(False)).label("pending_count"),
+    )
+    
+    def grouped(scope: str, key):
+        key = func.coalesce(key, "")
+        return select(literal(scope).label("scope"), key.label("key"), *counts).group_by(key)
+    
+    return union_all(
+        grouped(SCOPE_CATEGORY, cast(Job.category_id, Text)),
+        grouped(SCOPE_PORTAL, Job.source_portal),
+    ).subquery("actual")
+
+
+class CounterService:
+    """Counter service osztály"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_category_count(
+        self,
+        category_id: UUID,
+        include_descendants: bool = False,
+        column: str = "active_count"
+    ) -> int:
+        """
+        Kategória számlálója (egy PK lekérdezés), include_descendants
+        esetén a részfa kategóriáinak összege
+        """
+        value = getattr(JobCounter, column)
+        query = select(func.coalesce(func.sum(value), 0)).where(JobCounter.scope == SCOPE_CATEGORY)
+        
+        if include_descendants:
+            root = aliased(Category)
+            root_path = select(root.path).where(root.id == category_id).scalar_subquery()
+            query = query.where(JobCounter.key.in_(
+                select(cast(Category.id, Text)).where(Category.path.startswith(root_path))
+            ))
+        else:
+            query = query.where(JobCounter.key == str(category_id))
+        
+        # sum(bigint) numeric típusú
+        return int((await self.db.execute(query)).scalar_one())
+    
+    async def get_portal_counts(self) -> List[JobCounter]:
+        """Portálonkénti számlálók (legtöbb aktív állás elöl)"""
+        result = await self.db.execute(
+            select(JobCounter).where(
+                JobCounter.scope == SCOPE_PORTAL
+            ).order_by(
+                JobCounter.active_count.desc(), JobCounter.key
+            )
+        )
+        return list(result.scalars())
+    
+    async def get_totals(self) -> Dict[str, int]:
+        """Összesített számlálók (a portál számlálók összege)"""
+        row = (await self.db.execute(
+            select(*(
+                func.coalesce(func.sum(getattr(JobCounter, name)), 0).label(name)
+                for name in COUNTER_COLUMNS
+            )).where(JobCounter.scope == SCOPE_PORTAL)
+        )).one()
+        return {name: int(value) for name, value in row._mapping.items()}
+    
+    async def reconcile(self) -> Dict[str, int]:
+        """
+        Számlálók újraszámolása és az eltérések javítása
+        
+        A számláló táblát a tranzakció végéig zároljuk: a párhuzamos írások
+        (a triggereik miatt) megvárják, így a javítás nem veszít el deltát.
+        
+        Returns:
+            {"updated": javított / új sorok, "removed": törölt elárvult sorok}
+        """
+        await self.db.execute(text("LOCK TABLE job_counters IN EXCLUSIVE MODE"))
+        actual = _recount_query()
+        
+        stmt = insert(JobCounter).from_select(
+            ["scope", "key", *COUNTER_COLUMNS],
+            select(actual)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JobCounter.scope, JobCounter.key],
+            set_={
+                **{name: stmt.excluded[name] for name in COUNTER_COLUMNS},
+                "updated_at": func.now(),
+            },
+            where=tuple_(*(getattr(JobCounter, name) for name in COUNTER_COLUMNS)).is_distinct_from(
+                tuple_(*(stmt.excluded[name] for name in COUNTER_COLUMNS))
+            )
+        ).returning(JobCounter.scope, JobCounter.key)
+        updated = (await self.db.execute(stmt)).all()
+        
+        # Olyan kulcsok, amelyekhez már nem tartozik állás
+        removed = (await self.db.execute(
+            delete(JobCounter).where(
+                ~select(actual.c.key).where(and_(
+                    actual.c.scope == JobCounter.scope,
+                    actual.c.key == JobCounter.key
+                )).exists()
+            ).returning(JobCounter.scope, JobCounter.key)
+        )).all()
+        
+        await self.db.commit()
+        
+        for scope, key in (*updated, *removed):
+            logger.warning(f"Job counter drift repaired: {scope}/{key}")
+        
+        return {"updated": len(updated), "removed": len(removed)}
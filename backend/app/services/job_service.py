@@ -3,124 +3,424 @@ Job Service
 Állásokkal kapcsolatos business logic
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import List, Optional, Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import column, func, literal_column, not_, or_, select, table, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Dict, Sequence
 from uuid import UUID
+import json
 
+from ..config.settings import settings
 from ..models.job import Job
+from ..utils.pagination import Cursor, Page, count_rows, fetch_page
+from ..utils.projection import job_columns
+from ..utils.search import build_tsquery, text_match, MATCH_CONTAINS
+from .title_service import TitleService
+
+
+# Tömeges betöltésnél átvett mezők (id, created_at, active: adatbázis alapértelmezés;
+# canonical_title_id: a címből, TitleService.resolve)
+BULK_COLUMNS = (
+    "title", "canonical_title_id", "company", "location",
+    "salary_min", "salary_max", "salary_currency", "salary_period",
+    "experience_level", "employment_type", "skills", "description",
+    "source_url", "source_portal", "scraped_at", "verified", "category_id",
+)
+
+# Upsert esetén frissülő mezők; a hiányzó (None) érték nem írja felül a meglévőt.
+# A verified és category_id moderációs döntés, újrabetöltéskor nem változik.
+BULK_UPDATE_COLUMNS = (
+    "title", "canonical_title_id", "company", "location",
+    "salary_min", "salary_max", "salary_currency", "salary_period",
+    "experience_level", "employment_type", "skills", "description",
+)
+
+_BULK_DEFAULTS = {"salary_currency": "HUF", "salary_period": "monthly", "verified": False}
+_BULK_INTEGERS = ("salary_min", "salary_max")
+
+
+def _normalize_bulk_job(data: Dict, scraped_at: datetime) -> Optional[Dict]:
+    """
+    Egy betöltendő állás ellenőrzése és típusainak egységesítése
+    None, ha a sor hibás (cím vagy forrás kulcs nélküli, rossz típusú mező)
+    """
+    if not isinstance(data, dict) or not data.get("title"):
+        return None
+    # Kulcs nélkül az ON CONFLICT sosem illeszkedne (NULL az egyedi indexben),
+    # az ismételt betöltés duplikátumokat szúrna be
+    if not data.get("source_portal") or not data.get("source_url"):
+        return None
+    
+    row = {name: data.get(name) for name in BULK_COLUMNS}
+    for name, value in _BULK_DEFAULTS.items():
+        if row[name] is None:
+            row[name] = value
+    
+    try:
+        for name in _BULK_INTEGERS:
+            if row[name] is not None:
+                row[name] = int(row[name])
+        if row["category_id"] is not None and not isinstance(row["category_id"], UUID):
+            row["category_id"] = UUID(str(row["category_id"]))
+        if row["scraped_at"] is None:
+            row["scraped_at"] = scraped_at
+        elif not isinstance(row["scraped_at"], datetime):
+            row["scraped_at"] = datetime.fromisoformat(str(row["scraped_at"]))
+    except (TypeError, ValueError):
+        return None
+    
+    row["verified"] = bool(row["verified"])
+    return row
+
+
+def _upsert_statement(stmt):
+    """
+    ON CONFLICT (source_portal, source_url) DO UPDATE, csak ha valami változott
+    Visszaad: (beszúrt, frissített) darabszám egy sorban
+    """
+    excluded = stmt.excluded
+    target = Job.__table__.c
+    
+    new_values = {
+        name: func.coalesce(excluded[name], target[name])
+        for name in BULK_UPDATE_COLUMNS
+    }
+    # Az active (moderátori törlés), a verified és a category_id nem változik
+    changed = tuple_(
+        *(target[name] for name in BULK_UPDATE_COLUMNS)
+    ).is_distinct_from(
+        tuple_(*new_values.values())
+    )
+    
+    upsert = stmt.on_conflict_do_update(
+        index_elements=[Job.source_portal, Job.source_url],
+        index_where=Job.source_url.isnot(None),
+        set_={
+            **new_values,
+            "scraped_at": excluded.scraped_at,
+            "updated_at": func.now(),
+        },
+        where=changed
+    ).returning(literal_column("(xmax = 0)").label("inserted"))
+    
+    upserted = upsert.cte("upserted")
+    return select(
+        func.count().filter(upserted.c.inserted),
+        func.count().filter(not_(upserted.c.inserted))
+    )
 
 
 class JobService:
     """Job service osztály"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_jobs(self, skip: int = 0, limit: int = 10, filters: Dict = None) -> List[Job]:
-        """Állások listázása szűrőkkel"""
-        query = self.db.query(Job).filter(Job.active == True)
+    def _select(self, fields: Optional[Sequence[str]] = None):
+        """Teljes Job entitás, vagy fields megadása esetén csak a kért oszlopok"""
+        if fields:
+            return select(*job_columns(fields))
+        return select(Job)
+    
+    def _filtered_query(self, filters: Dict = None, fields: Optional[Sequence[str]] = None):
+        """Aktív állások query a lista szűrőivel (lista, darabszám és export közös alapja)"""
+        query = self._select(fields).where(Job.active == True)
         
         if filters:
             if filters.get("location"):
-                query = query.filter(Job.location.ilike(f"%{filters['location']}%"))
+                # A lista időrendje marad fuzzy módban is (cursor lapozás miatt)
+                condition, _ = text_match(
+                    Job.location,
+                    filters["location"],
+                    filters.get("location_match") or MATCH_CONTAINS
+                )
+                query = query.where(condition)
             
             if filters.get("category_id"):
-                query = query.filter(Job.category_id == filters["category_id"])
+                query = query.where(Job.category_id == filters["category_id"])
             
             if filters.get("min_salary"):
-                query = query.filter(Job.salary_min >= filters["min_salary"])
+                # Havi összegre normalizált értékkel (órabér, éves fizetés is)
+                query = query.where(Job.salary_monthly_min >= filters["min_salary"])
             
             if filters.get("verified_only"):
-                query = query.filter(Job.verified == True)
+                query = query.where(Job.verified == True)
         
-        return query.order_by(Job.created_at.desc()).offset(skip).limit(limit).all()
+        return query
+    
+    async def get_jobs(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        filters: Dict = None,
+        cursor: Optional[Cursor] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """
+        Állások listázása szűrőkkel, darabszámmal együtt
+        - cursor megadása esetén keyset lapozás (created_at, id) szerint, skip nélkül
+        - fields megadása esetén Job objektumok helyett csak a kért oszlopok sorai
+        """
+        # Az id stabil másodlagos kulcs azonos created_at esetén
+        return await fetch_page(
+            self.db,
+            self._filtered_query(filters, fields),
+            order_by=(Job.created_at.desc(), Job.id.desc()),
+            limit=limit,
+            skip=skip,
+            cursor=cursor,
+            keyset=(Job.created_at, Job.id)
+        )
     
-    def count_jobs(self, filters: Dict = None) -> int:
+    async def count_jobs(self, filters: Dict = None) -> int:
         """Állások számának lekérdezése"""
-        query = self.db.query(Job).filter(Job.active == True)
+        return await count_rows(self.db, self._filtered_query(filters))
+    
+    async def stream_jobs(
+        self,
+        filters: Dict = None,
+        fields: Sequence[str] = (),
+        cursor: Optional[Cursor] = None,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[List]:
+        """
+        Szűrt állások kötegenként, szerver oldali cursorból (export)
+        - a get_jobs sorrendje: (created_at, id) csökkenő, így cursorral folytatható
+        - egyszerre legfeljebb batch_size sor van a memóriában
+        """
+        batch_size = batch_size or settings.EXPORT_BATCH_SIZE
         
-        if filters:
-            if filters.get("location"):
-                query = query.filter(Job.location.ilike(f"%{filters['location']}%"))
-            
-            if filters.get("category_id"):
-                query = query.filter(Job.category_id == filters["category_id"])
-            
-            if filters.get("min_salary"):
-                query = query.filter(Job.salary_min >= filters["min_salary"])
-            
-            if filters.get("verified_only"):
-                query = query.filter(Job.verified == True)
+        query = self._filtered_query(filters, fields).order_by(
+            Job.created_at.desc(), Job.id.desc()
+        )
+        if cursor:
+            query = query.where(tuple_(Job.created_at, Job.id) < cursor)
         
-        return query.count()
+        result = await self.db.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+    
+    async def get_keyset(self, job_id: UUID) -> Optional[Cursor]:
+        """Egy állás (created_at, id) lapozási pozíciója (export folytatásához)"""
+        result = await self.db.execute(
+            select(Job.created_at, Job.id).where(Job.id == job_id)
+        )
+        row = result.first()
+        return tuple(row) if row else None
     
-    def get_job_by_id(self, job_id: UUID) -> Optional[Job]:
+    async def get_job_by_id(self, job_id: UUID) -> Optional[Job]:
         """Állás lekérése ID alapján"""
-        return self.db.query(Job).filter(Job.id == job_id).first()
-    
-    def search_jobs(self, query: str, skip: int = 0, limit: int = 10) -> List[Job]:
-        """Állások keresése"""
-        search_pattern = f"%{query}%"
-        
-        return self.db.query(Job).filter(
-            and_(
-                Job.active == True,
-                or_(
-                    Job.title.ilike(search_pattern),
-                    Job.description.ilike(search_pattern),
-                    Job.company.ilike(search_pattern)
-                )
-            )
-        ).offset(skip).limit(limit).all()
+        return await self.db.get(Job, job_id)
+    
+    def _search_query(self, tsquery, fields: Optional[Sequence[str]] = None):
+        """Aktív állások, amelyek illeszkednek a tsquery-re"""
+        return self._select(fields).where(
+            Job.active == True,
+            Job.search_vector.op("@@")(tsquery)
+        )
     
-    def count_search_results(self, query: str) -> int:
+    async def search_jobs(
+        self,
+        query: str,
+        skip: int = 0,
+        limit: int = 10,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """
+        Állások keresése (teljes szöveges index, relevancia szerint rendezve)
+        - "idézőjeles kifejezés" és prefix* keresés támogatott
+        - fields: lásd get_jobs
+        """
+        tsquery = build_tsquery(query)
+        
+        return await fetch_page(
+            self.db,
+            self._search_query(tsquery, fields),
+            order_by=(
+                func.ts_rank(Job.search_vector, tsquery).desc(),
+                Job.created_at.desc(),
+                Job.id.desc()
+            ),
+            limit=limit,
+            skip=skip
+        )
+    
+    async def count_search_results(self, query: str) -> int:
         """Keresési találatok száma"""
-        search_pattern = f"%{query}%"
-        
-        return self.db.query(Job).filter(
-            and_(
-                Job.active == True,
-                or_(
-                    Job.title.ilike(search_pattern),
-                    Job.description.ilike(search_pattern),
-                    Job.company.ilike(search_pattern)
-                )
-            )
-        ).count()
-    
-    def get_jobs_by_title(self, title: str, skip: int = 0, limit: int = 10) -> List[Job]:
-        """Állások lekérése cím alapján"""
-        return self.db.query(Job).filter(
-            and_(
-                Job.active == True,
-                Job.title.ilike(f"%{title}%")
-            )
-        ).offset(skip).limit(limit).all()
+        return await count_rows(self.db, self._search_query(build_tsquery(query)))
+    
+    async def get_jobs_by_title(
+        self,
+        title: str,
+        skip: int = 0,
+        limit: int = 10,
+        match: str = MATCH_CONTAINS
+    ) -> List[Job]:
+        """
+        Állások lekérése cím alapján
+        - fuzzy módban hasonlóság szerint rendezve
+        """
+        condition, similarity = text_match(Job.title, title, match)
+        query = select(Job).where(Job.active == True, condition)
+        
+        if similarity is not None:
+            query = query.order_by(similarity.desc(), Job.id)
+        
+        result = await self.db.execute(query.offset(skip).limit(limit))
+        return list(result.scalars())
     
-    def create_job(self, job_data: Dict) -> Job:
-        """Új állás létrehozása"""
+    async def create_job(self, job_data: Dict) -> Job:
+        """Új állás létrehozása (kanonikus munkakörrel)"""
         job = Job(**job_data)
+        if job.title:
+            job.canonical_title_id = (await TitleService(self.db).resolve([job.title]))[job.title]
         self.db.add(job)
-        self.db.commit()
-        self.db.refresh(job)
+        await self.db.commit()
+        await self.db.refresh(job)
         return job
     
-    def update_job(self, job_id: UUID, job_data: Dict) -> Optional[Job]:
+    async def bulk_upsert(self, jobs: List[Dict]) -> Dict[str, int]:
+        """
+        Állások tömeges betöltése egy tranzakcióban
+        
+        - kulcs: (source_portal, source_url), mindkettő kötelező; meglévő
+          állásnál csak változás esetén frissít, a hiányzó mezők nem írják
+          felül a meglévőket
+        - kis kötegek: INSERT ... VALUES ... ON CONFLICT, BULK_INSERT_CHUNK_SIZE soronként
+        - BULK_COPY_THRESHOLD fölött: COPY egy ideiglenes staging táblába,
+          majd egyetlen INSERT ... SELECT ... ON CONFLICT
+        
+        Returns:
+            {"received", "inserted", "updated", "skipped"}; skipped: hibás,
+            kulcs nélküli, a kötegen belül ismétlődő vagy változatlan sorok
+        """
+        scraped_at = datetime.utcnow()
+        
+        # Kötegen belüli ismétlődés esetén az utolsó előfordulás számít
+        # (egy ON CONFLICT utasítás nem módosíthatja kétszer ugyanazt a sort)
+        keyed = {}
+        for data in jobs:
+            row = _normalize_bulk_job(data, scraped_at)
+            if row is not None:
+                keyed[(row["source_portal"], row["source_url"])] = row
+        rows = list(keyed.values())
+        
+        canonical = await TitleService(self.db).resolve(row["title"] for row in rows)
+        for row in rows:
+            row["canonical_title_id"] = canonical.get(row["title"])
+        
+        inserted = updated = 0
+        if len(rows) > settings.BULK_COPY_THRESHOLD:
+            inserted, updated = await self._upsert_via_copy(rows)
+        else:
+            chunk_size = settings.BULK_INSERT_CHUNK_SIZE
+            for start in range(0, len(rows), chunk_size):
+                stmt = _upsert_statement(insert(Job).values(rows[start:start + chunk_size]))
+                chunk_inserted, chunk_updated = (await self.db.execute(stmt)).one()
+                inserted += chunk_inserted
+                updated += chunk_updated
+        
+        await self.db.commit()
+        
+        return {
+            "received": len(jobs),
+            "inserted": inserted,
+            "updated": updated,
+            "skipped": len(jobs) - inserted - updated,
+        }
+    
+    async def _upsert_via_copy(self, rows: List[Dict]):
+        """Nagy köteg: COPY staging táblába, onnan egy upsert utasítás"""
+        await self.db.execute(text(
+            f"CREATE TEMP TABLE jobs_staging ON COMMIT DROP AS "
+            f"SELECT {', '.join(BULK_COLUMNS)} FROM jobs WITH NO DATA"
+        ))
+        
+        # A jsonb oszlopot az asyncpg COPY szövegként várja
+        records = [
+            tuple(
+                json.dumps(row[name]) if name == "skills" and row[name] is not None else row[name]
+                for name in BULK_COLUMNS
+            )
+            for row in rows
+        ]
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "jobs_staging", records=records, columns=list(BULK_COLUMNS)
+        )
+        
+        staging = table("jobs_staging", *(column(name) for name in BULK_COLUMNS))
+        stmt = insert(Job).from_select(list(BULK_COLUMNS), select(staging), include_defaults=False)
+        return (await self.db.execute(_upsert_statement(stmt))).one()
+    
+    async def backfill_monthly_salaries(self, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Havi fizetés oszlopok (alembic 0014) feltöltése a meglévő állásokra
+        
+        - id szerinti kötegekben, kötegenként külön tranzakcióban (rövid
+          sorzárak, a triggerek kötegenként frissítik a vázlatokat)
+        - csak az eltérő sorokat írja, így megszakítás után újra futtatható
+        
+        Returns:
+            {"batches": kötegek száma, "updated": módosított sorok}
+        """
+        batch_size = batch_size or settings.SALARY_BACKFILL_BATCH_SIZE
+        monthly_min = func.salary_to_monthly(Job.salary_min, Job.salary_period, Job.salary_currency)
+        monthly_max = func.salary_to_monthly(Job.salary_max, Job.salary_period, Job.salary_currency)
+        
+        batches = updated = 0
+        after = None
+        while True:
+            # Köteg felső határa: a batch_size-adik következő id (PK index);
+            # ha nincs ennyi, ez az utolsó köteg
+            bounds = [Job.id > after] if after is not None else []
+            last = (await self.db.execute(
+                select(Job.id).where(*bounds).order_by(Job.id).offset(batch_size - 1).limit(1)
+            )).scalar()
+            if last is not None:
+                bounds.append(Job.id <= last)
+            
+            result = await self.db.execute(
+                update(Job)
+                .where(
+                    *bounds,
+                    or_(
+                        Job.salary_monthly_min.is_distinct_from(monthly_min),
+                        Job.salary_monthly_max.is_distinct_from(monthly_max)
+                    )
+                )
+                .values(salary_monthly_min=monthly_min, salary_monthly_max=monthly_max)
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+            
+            batches += 1
+            updated += result.rowcount
+            if last is None:
+                break
+            after = last
+        
+        return {"batches": batches, "updated": updated}
+    
+    async def update_job(self, job_id: UUID, job_data: Dict) -> Optional[Job]:
         """Állás frissítése"""
-        job = self.get_job_by_id(job_id)
+        job = await self.get_job_by_id(job_id)
         if job:
             for key, value in job_data.items():
                 setattr(job, key, value)
-            self.db.commit()
-            self.db.refresh(job)
+            if "title" in job_data and job.title:
+                job.canonical_title_id = (await TitleService(self.db).resolve([job.title]))[job.title]
+            await self.db.commit()
+            await self.db.refresh(job)
         return job
     
-    def delete_job(self, job_id: UUID) -> bool:
+    async def delete_job(self, job_id: UUID) -> bool:
         """Állás törlése (soft delete)"""
-        job = self.get_job_by_id(job_id)
+        job = await self.get_job_by_id(job_id)
         if job:
             job.active = False
-            self.db.commit()
+            await self.db.commit()
             return True
         return False
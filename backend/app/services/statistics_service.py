@@ -3,165 +3,928 @@ Statistics Service
 Statisztikai számításokkal kapcsolatos business logic
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import List, Optional, Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import BigInteger, Date, Float, Text, and_, case, cast, delete, func, literal, literal_column, or_, outerjoin, select, text, true
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Dict, Tuple
+from bisect import bisect_left, bisect_right
+from uuid import UUID
 
 from ..models.job import Job
-from ..models.salary_statistics import SalaryStatistics
+from ..models.canonical_title import CanonicalTitle
+from ..models.salary_sketch import SalarySketch
+from ..models.salary_statistics import SalaryStatistics, SALARY_CDF_POINTS
+from ..models.salary_trend import SalaryTrend, PERIOD_DAY, PERIOD_WEEK
+from ..models.summary import JobTitleSummary, LocationSummary, SummaryRefresh
+from ..models.title_trend import TitleWindowCount, TrendingWindow
+from ..config.settings import settings
+from ..utils.search import text_match, MATCH_CONTAINS, MATCH_EXACT
+from ..utils.snapshot import SalarySnapshot
+from .title_service import TitleService
+
+# Workerenkénti analitikai pillanatkép (SALARY_SNAPSHOT_ENABLED esetén a
+# main.py startup indítja a frissítő ciklusát)
+salary_snapshot = SalarySnapshot(
+    refresh_interval=settings.SALARY_SNAPSHOT_REFRESH_INTERVAL,
+    full_reload_interval=settings.SALARY_SNAPSHOT_FULL_RELOAD_INTERVAL
+)
+
+# Statisztikai munkakör: a kanonikus név (még be nem sorolt állásnál a cím),
+# a salary_sketches_apply() triggerrel és a job_title_summary nézettel egyezően
+STATISTICS_TITLE = func.coalesce(CanonicalTitle.name, Job.title)
+JOBS_WITH_TITLES = outerjoin(Job, CanonicalTitle, CanonicalTitle.id == Job.canonical_title_id)
+
+# Munkakörönként legalább ennyi fizetési adat kell egy statisztikához
+MIN_SAMPLE_SIZE = 3
+
+# Materializált összesítők (refresh_summaries) és a frissítés advisory lock kulcsa
+SUMMARY_VIEWS = (JobTitleSummary, LocationSummary)
+SUMMARY_REFRESH_LOCK = "summary_refresh"
+
+# salary_trends oszlopok (a _trend_rows select sorrendjében), ebből a kulcs
+TREND_KEY_COLUMNS = ("period", "period_start", "job_title", "location", "category_key")
+TREND_COLUMNS = TREND_KEY_COLUMNS + (
+    "count", "total", "min_salary", "max_salary", "sketch_buckets", "sketch_counts",
+)
+
+# Fizetési hisztogram skálák és az alapértelmezett vödörszám
+SCALE_LINEAR = "linear"
+SCALE_LOG = "log"
+SCALE_PATTERN = f"^({SCALE_LINEAR}|{SCALE_LOG})$"
+DEFAULT_HISTOGRAM_BUCKETS = 20
+
+# Kocka cella kulcs: munkakör és a dimenziók (NULL: összes)
+CUBE_KEY_COLUMNS = ("job_title", "location", "experience_level", "category_id")
+
+# A calculate_and_store_statistics által írt oszlopok (a select sorrendjében)
+STATISTICS_COLUMNS = CUBE_KEY_COLUMNS + (
+    "avg_salary", "median_salary", "min_salary", "max_salary",
+    "percentile_25", "percentile_75", "sample_size", "last_updated", "created_at", "salary_cdf",
+)
+
+# A salary_cdf pontjainak percentilisei (0, 5, ..., 100)
+CDF_PERCENTILES = [100 * i / (SALARY_CDF_POINTS - 1) for i in range(SALARY_CDF_POINTS)]
+
+
+def _bucket_edges(low, high, buckets: int, scale: str) -> List[tuple]:
+    """Hisztogram vödrök [alsó, felső) határai (üres adathalmaznál nincs vödör)"""
+    if low is None or high is None or low > high:
+        return []
+    if scale == SCALE_LOG:
+        edges = [low * (high / low) ** (i / buckets) for i in range(buckets + 1)]
+    else:
+        edges = [low + (high - low) * i / buckets for i in range(buckets + 1)]
+    return list(zip(edges, edges[1:]))
+
+
+def _cdf_position(cdf: List[float], index: int, salary: float) -> float:
+    """Percentilis a CDF index-1. és index. pontja között, lineárisan interpolálva"""
+    if index == 0:
+        return CDF_PERCENTILES[0]
+    if index == len(cdf):
+        return CDF_PERCENTILES[-1]
+    low, high = cdf[index - 1], cdf[index]
+    fraction = (salary - low) / (high - low) if high > low else 0.0
+    return CDF_PERCENTILES[index - 1] + fraction * (CDF_PERCENTILES[index] - CDF_PERCENTILES[index - 1])
+
+
+def _cdf_rank(cdf: List[float], salary: float) -> float:
+    """
+    Fizetés percentilis helye a tárolt CDF-ben; azonos értékű pontok
+    (lapos szakasz) esetén a szakasz közepe
+    """
+    lower = _cdf_position(cdf, bisect_left(cdf, salary), salary)
+    upper = _cdf_position(cdf, bisect_right(cdf, salary), salary)
+    return (lower + upper) / 2
+
+
+def _surrounding(percentile: float) -> range:
+    """A rang alatti és feletti két-két CDF pont (CDF_PERCENTILES indexek)"""
+    index = bisect_right(CDF_PERCENTILES, percentile)
+    return range(max(index - 2, 0), min(index + 2, SALARY_CDF_POINTS))
+
+
+def _trend_rows(per_bucket, period, period_start):
+    """
+    salary_trends sorok (TREND_COLUMNS sorrendben) egy (periódus, csoport,
+    vödör) szerint csoportosított subquery-ből: csoportonként egy sor,
+    vödör szerint rendezett vázlat tömbökkel
+    """
+    groups = (period_start, per_bucket.c.job_title, per_bucket.c.location, per_bucket.c.category_key)
+    return select(
+        period,
+        *groups,
+        func.sum(per_bucket.c.cnt),
+        func.sum(per_bucket.c.total),
+        func.min(per_bucket.c.min_salary),
+        func.max(per_bucket.c.max_salary),
+        func.array_agg(aggregate_order_by(per_bucket.c.bucket, per_bucket.c.bucket)),
+        func.array_agg(aggregate_order_by(per_bucket.c.cnt, per_bucket.c.bucket))
+    ).group_by(*groups)
+
+
+def _title_condition(job_title: str, match: str, canonical: Optional[CanonicalTitle] = None):
+    """
+    Állás szűrés statisztikai munkakörre: a címkulcs szerint feloldott
+    (canonical) vagy az illeszkedő nevű kanonikus munkakörök állásai
+    (jobs.canonical_title_id index), a még be nem soroltak közül a cím szerint
+    """
+    fallback, _ = text_match(Job.title, job_title, match)
+    if canonical is not None:
+        titled = Job.canonical_title_id == canonical.id
+    else:
+        condition, _ = text_match(CanonicalTitle.name, job_title, match)
+        titled = Job.canonical_title_id.in_(select(CanonicalTitle.id).where(condition))
+    return or_(titled, and_(Job.canonical_title_id.is_(None), fallback))
+
+
+def _cube_key(column):
+    """Kocka kulcs kifejezés, egyezően az uq_salary_statistics_key index kifejezéseivel"""
+    return func.coalesce(column, literal_column("''"))
 
 
 class StatisticsService:
     """Statistics service osztály"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_salary_stats(
+    async def _canonical_title(self, job_title: Optional[str], match: str) -> Optional[CanonicalTitle]:
+        """
+        Pontos munkakör szűrő (match=exact) kanonikus munkaköre a címkulcson
+        át, ahogy betöltéskor ("Java Developer - Senior" -> "Java Developer");
+        egyéb illesztésnél None, ilyenkor a kanonikus nevekre keresünk
+        """
+        if not job_title or match != MATCH_EXACT:
+            return None
+        return await TitleService(self.db).lookup(job_title)
+    
+    async def _statistics_title(self, job_title: Optional[str], match: str) -> Optional[str]:
+        """Munkakör szűrő a statisztikai táblákhoz: a feloldott kanonikus név, ennek híján a paraméter"""
+        canonical = await self._canonical_title(job_title, match)
+        return canonical.name if canonical else job_title
+    
+    async def get_salary_stats(
         self,
         job_title: Optional[str] = None,
         location: Optional[str] = None,
-        experience_level: Optional[str] = None
+        experience_level: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        match: str = MATCH_CONTAINS
     ) -> List[SalaryStatistics]:
-        """Fizetési statisztikák lekérése"""
-        query = self.db.query(SalaryStatistics)
+        """
+        Fizetési statisztikák lekérése az előre számolt kockából
+        - a meg nem adott dimenzió az "összes" szint (NULL) sora, így
+          munkakörönként egy sor jön vissza; pontos munkakörrel
+          (match=exact) egyetlen indexelt sor
+        - fuzzy módban a munkakör hasonlósága szerint rendezve
+        """
+        query = select(SalaryStatistics).where(*(
+            _cube_key(column) == (value or "")
+            for column, value in (
+                (SalaryStatistics.location, location),
+                (SalaryStatistics.experience_level, experience_level),
+                (cast(SalaryStatistics.category_id, Text), str(category_id) if category_id else None),
+            )
+        ))
         
         if job_title:
-            query = query.filter(SalaryStatistics.job_title.ilike(f"%{job_title}%"))
-        
-        if location:
-            query = query.filter(SalaryStatistics.location == location)
+            job_title = await self._statistics_title(job_title, match)
+            condition, similarity = text_match(SalaryStatistics.job_title, job_title, match)
+            query = query.where(condition)
+            if similarity is not None:
+                query = query.order_by(similarity.desc())
         
-        if experience_level:
-            query = query.filter(SalaryStatistics.experience_level == experience_level)
+        result = await self.db.execute(query)
+        return list(result.scalars())
+    
+    async def _read_summary(self, model, key, limit: Optional[int]) -> Tuple[List, Optional[datetime]]:
+        """
+        Materializált összesítő legnagyobb job_count értékű sorai és a nézet
+        frissítésének ideje egy lekérdezésben (index szerinti top-N olvasás)
+        """
+        top = select(model).order_by(model.job_count.desc(), key).limit(limit).subquery()
+        rows = (await self.db.execute(
+            select(SummaryRefresh.computed_at, top).select_from(
+                SummaryRefresh.__table__.outerjoin(top, true())
+            ).where(
+                SummaryRefresh.name == model.__tablename__
+            ).order_by(top.c.job_count.desc(), top.c[key.key])
+        )).all()
         
-        return query.all()
+        computed_at = rows[0].computed_at if rows else None
+        return [row for row in rows if row.job_count is not None], computed_at
     
-    def get_trending_jobs(self, limit: int = 10) -> List[Dict]:
-        """Legkeresettebb munkakörök"""
-        results = self.db.query(
-            Job.title,
-            func.count(Job.id).label('count'),
-            func.avg(Job.salary_min).label('avg_salary')
-        ).filter(
-            Job.active == True,
-            Job.salary_min.isnot(None)
-        ).group_by(
-            Job.title
-        ).order_by(
-            desc('count')
-        ).limit(limit).all()
+    async def get_trending_jobs(self, limit: int = 10) -> Tuple[List[Dict], Optional[datetime]]:
+        """
+        Legkeresettebb munkakörök (job_title_summary nézetből)
+        
+        Returns:
+            (munkakörök, a nézet utolsó frissítésének ideje)
+        """
+        rows, computed_at = await self._read_summary(JobTitleSummary, JobTitleSummary.title, limit)
         
         return [
             {
                 "title": row.title,
-                "count": row.count,
+                "count": row.job_count,
                 "avg_salary": round(row.avg_salary) if row.avg_salary else None
             }
-            for row in results
-        ]
+            for row in rows
+        ], computed_at
     
-    def get_location_statistics(self) -> List[Dict]:
-        """Helyszín szerinti statisztikák"""
-        results = self.db.query(
-            Job.location,
-            func.count(Job.id).label('count'),
-            func.avg(Job.salary_min).label('avg_salary')
-        ).filter(
-            Job.active == True,
-            Job.location.isnot(None),
-            Job.salary_min.isnot(None)
-        ).group_by(
-            Job.location
-        ).order_by(
-            desc('count')
-        ).all()
+    async def get_trending_window(self, days: int, limit: int = 10) -> Tuple[List[Dict], date]:
+        """
+        Legkeresettebb munkakörök az utolsó days napban begyűjtött aktív
+        állások alapján (title_window_counts, triggerek által karbantartva)
+        
+        Napváltás után az első lekérdezés lépteti az időablakokat
+        (trending_windows_roll); utána a top-N egy indexolvasás.
+        
+        Returns:
+            (munkakörök, az időablak kezdőnapja)
+        """
+        today = datetime.utcnow().date()
+        start_day = (await self.db.execute(
+            select(TrendingWindow.start_day).where(TrendingWindow.days == days)
+        )).scalar()
+        if start_day < today - timedelta(days=days - 1):
+            await self.db.execute(select(func.trending_windows_roll()))
+            await self.db.commit()
+            start_day = today - timedelta(days=days - 1)
+        
+        rows = (await self.db.execute(
+            select(TitleWindowCount).where(
+                TitleWindowCount.days == days,
+                TitleWindowCount.job_count > 0
+            ).order_by(
+                TitleWindowCount.job_count.desc(), TitleWindowCount.job_title
+            ).limit(limit)
+        )).scalars()
+        
+        return [
+            {
+                "title": row.job_title,
+                "count": row.job_count,
+                "avg_salary": round(row.salary_total / row.salary_count) if row.salary_count else None
+            }
+            for row in rows
+        ], start_day
+    
+    async def get_location_statistics(self, limit: Optional[int] = None) -> Tuple[List[Dict], Optional[datetime]]:
+        """
+        Helyszín szerinti statisztikák (location_summary nézetből)
+        
+        Returns:
+            (helyszínek, a nézet utolsó frissítésének ideje)
+        """
+        rows, computed_at = await self._read_summary(LocationSummary, LocationSummary.location, limit)
         
         return [
             {
                 "location": row.location,
-                "job_count": row.count,
+                "job_count": row.job_count,
                 "avg_salary": round(row.avg_salary) if row.avg_salary else None
             }
-            for row in results
-        ]
+            for row in rows
+        ], computed_at
     
-    def get_salary_distribution(self, job_title: Optional[str] = None) -> Dict:
-        """Fizetési eloszlás"""
-        query = self.db.query(Job).filter(
+    async def refresh_summaries(self, wait: bool = True) -> bool:
+        """
+        Materializált összesítők frissítése (REFRESH ... CONCURRENTLY, az
+        olvasók közben a korábbi tartalmat látják) és a computed_at rögzítése
+        
+        Egyszerre egy frissítés fut (advisory lock); wait=False esetén
+        (tömeges betöltés után) egy már futó frissítésnél kihagyjuk, a
+        következő ütemezett frissítés hozza be a lemaradást.
+        
+        Returns:
+            True, ha a frissítés lefutott
+        """
+        lock_key = func.hashtext(SUMMARY_REFRESH_LOCK)
+        if wait:
+            await self.db.execute(select(func.pg_advisory_xact_lock(lock_key)))
+        elif not (await self.db.execute(select(func.pg_try_advisory_xact_lock(lock_key)))).scalar():
+            return False
+        
+        for model in SUMMARY_VIEWS:
+            await self.db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {model.__tablename__}"))
+            stmt = insert(SummaryRefresh).values(name=model.__tablename__, computed_at=datetime.utcnow())
+            await self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[SummaryRefresh.name],
+                set_={"computed_at": stmt.excluded.computed_at}
+            ))
+        
+        await self.db.commit()
+        return True
+    
+    async def get_salary_distribution(
+        self,
+        job_title: Optional[str] = None,
+        location: Optional[str] = None,
+        experience_level: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        match: str = MATCH_CONTAINS,
+        buckets: int = DEFAULT_HISTOGRAM_BUCKETS,
+        scale: str = SCALE_LINEAR,
+        min_salary: Optional[int] = None,
+        max_salary: Optional[int] = None
+    ) -> Dict:
+        """
+        Fizetési eloszlás: összesítők, kvartilisek és hisztogram egyetlen
+        lekérdezésben (a szűrt állások egyszer olvasva, CTE-ként)
+        - a hisztogram buckets darab egyenlő szélességű (linear) vagy
+          logaritmikus (log) vödörből áll (width_bucket)
+        - a tartomány alapból az adatok min / max értéke; megadott határok
+          esetén a kívül eső fizetések az underflow / overflow számlálókba kerülnek
+        """
+        salary = Job.salary_monthly_min
+        query = select(salary.label("salary")).where(
             Job.active == True,
-            Job.salary_min.isnot(None)
+            salary > 0
         )
         
         if job_title:
-            query = query.filter(Job.title.ilike(f"%{job_title}%"))
+            canonical = await self._canonical_title(job_title, match)
+            query = query.where(_title_condition(job_title, match, canonical))
+        if location:
+            query = query.where(Job.location == location)
+        if experience_level:
+            query = query.where(Job.experience_level == experience_level)
+        if category_id:
+            query = query.where(Job.category_id == category_id)
+        
+        filtered = query.cte("filtered")
+        value = filtered.c.salary
+        
+        summary = select(
+            func.count().label("sample_size"),
+            func.avg(value).label("avg"),
+            func.min(value).label("min"),
+            func.max(value).label("max"),
+            func.percentile_cont(0.25).within_group(value).label("percentile_25"),
+            func.percentile_cont(0.5).within_group(value).label("median"),
+            func.percentile_cont(0.75).within_group(value).label("percentile_75"),
+            (literal(min_salary) if min_salary is not None else func.min(value)).label("low"),
+            (literal(max_salary) if max_salary is not None else func.max(value)).label("high")
+        ).cte("summary")
+        low, high = summary.c.low, summary.c.high
         
-        # Számítások
-        avg_salary = query.with_entities(func.avg(Job.salary_min)).scalar()
-        min_salary = query.with_entities(func.min(Job.salary_min)).scalar()
-        max_salary = query.with_entities(func.max(Job.salary_min)).scalar()
+        def scaled(expression):
+            expression = cast(expression, Float)
+            return func.ln(expression) if scale == SCALE_LOG else expression
+        
+        # 0: underflow, buckets + 1: overflow; a felső határ az utolsó
+        # vödörbe esik, és width_bucket csak low < high esetén fut
+        bucket = case(
+            (value < low, 0),
+            (value > high, buckets + 1),
+            (value == high, buckets),
+            else_=func.width_bucket(scaled(value), scaled(low), scaled(high), buckets)
+        )
+        histogram = select(
+            bucket.label("bucket"),
+            func.count().label("count")
+        ).select_from(filtered).join(summary, true()).group_by(bucket).subquery("histogram")
+        
+        rows = (await self.db.execute(
+            select(summary, histogram.c.bucket, histogram.c.count).select_from(
+                summary.outerjoin(histogram, true())
+            ).order_by(histogram.c.bucket)
+        )).all()
+        
+        stats = rows[0]
+        counts = {row.bucket: row.count for row in rows if row.bucket is not None}
         
         return {
-            "avg": round(avg_salary) if avg_salary else None,
-            "min": min_salary,
-            "max": max_salary,
-            "sample_size": query.count()
+            "avg": round(stats.avg) if stats.avg else None,
+            "min": stats.min,
+            "max": stats.max,
+            "median": round(stats.median) if stats.median else None,
+            "percentile_25": round(stats.percentile_25) if stats.percentile_25 else None,
+            "percentile_75": round(stats.percentile_75) if stats.percentile_75 else None,
+            "sample_size": stats.sample_size,
+            "histogram": {
+                "scale": scale,
+                "buckets": [
+                    {"from": round(lower), "to": round(upper), "count": counts.get(index, 0)}
+                    for index, (lower, upper) in enumerate(
+                        _bucket_edges(stats.low, stats.high, buckets, scale), start=1
+                    )
+                ],
+                "underflow": counts.get(0, 0),
+                "overflow": counts.get(buckets + 1, 0)
+            }
         }
     
-    def calculate_and_store_statistics(self):
-        """Statisztikák számítása és tárolása"""
-        # Job title szerinti csoportosítás
-        job_titles = self.db.query(Job.title).distinct().all()
-        
-        for (title,) in job_titles:
-            jobs = self.db.query(Job).filter(
-                Job.title == title,
-                Job.active == True,
-                Job.salary_min.isnot(None)
-            ).all()
-            
-            if not jobs:
-                continue
-            
-            salaries = [job.salary_min for job in jobs if job.salary_min]
-            
-            if len(salaries) < 3:  # Minimum 3 adat szükséges
-                continue
-            
-            salaries.sort()
-            
-            # Statisztikák számítása
-            avg_salary = sum(salaries) / len(salaries)
-            median_salary = salaries[len(salaries) // 2]
-            min_salary = min(salaries)
-            max_salary = max(salaries)
-            percentile_25 = salaries[len(salaries) // 4]
-            percentile_75 = salaries[(3 * len(salaries)) // 4]
-            
-            # Meglévő statisztika frissítése vagy új létrehozása
-            existing = self.db.query(SalaryStatistics).filter(
-                SalaryStatistics.job_title == title
-            ).first()
-            
-            if existing:
-                existing.avg_salary = avg_salary
-                existing.median_salary = median_salary
-                existing.min_salary = min_salary
-                existing.max_salary = max_salary
-                existing.percentile_25 = percentile_25
-                existing.percentile_75 = percentile_75
-                existing.sample_size = len(salaries)
-            else:
-                stat = SalaryStatistics(
-                    job_title=title,
-                    avg_salary=avg_salary,
-                    median_salary=median_salary,
-                    min_salary=min_salary,
-                    max_salary=max_salary,
-                    percentile_25=percentile_25,
-                    percentile_75=percentile_75,
-                    sample_size=len(salaries)
-                )
-                self.db.add(stat)
-        
-        self.db.commit()
+    async def get_snapshot_statistics(
+        self,
+        job_title: Optional[str] = None,
+        location: Optional[str] = None,
+        experience_level: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        match: str = MATCH_CONTAINS
+    ) -> Optional[Dict]:
+        """
+        Pontos fizetési statisztika (havi fizetés) a memóriabeli
+        pillanatképből; None, ha ki van kapcsolva, még nem töltött be, vagy
+        a szűrő nem értékelhető ott (fuzzy)
+        """
+        if not settings.SALARY_SNAPSHOT_ENABLED:
+            return None
+        return salary_snapshot.statistics(
+            job_title=await self._statistics_title(job_title, match),
+            location=location,
+            experience_level=experience_level,
+            category_id=category_id,
+            match=match
+        )
+    
+    async def get_snapshot_rank(
+        self,
+        salary: int,
+        job_title: str,
+        location: Optional[str] = None,
+        experience_level: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        match: str = MATCH_EXACT
+    ) -> Optional[Dict]:
+        """
+        Havi fizetés pontos percentilis helye a pillanatképből, a
+        get_salary_rank válaszával egyező mezőkkel (a surrounding pontos
+        percentilis értékek)
+        
+        None, ha nem elérhető, nem pontos munkakör illesztés (a kocka
+        leghasonlóbb cellája a mérvadó), vagy MIN_SAMPLE_SIZE-nál kevesebb
+        a fizetési adat
+        """
+        if not settings.SALARY_SNAPSHOT_ENABLED or match != MATCH_EXACT:
+            return None
+        filters = dict(
+            job_title=await self._statistics_title(job_title, match),
+            location=location,
+            experience_level=experience_level,
+            category_id=category_id,
+            match=match
+        )
+        rank = salary_snapshot.rank(salary, **filters)
+        if rank is None or rank["sample_size"] < MIN_SAMPLE_SIZE:
+            return None
+        
+        surrounding = _surrounding(rank["percentile"])
+        values = salary_snapshot.quantiles(
+            [0.5, *(CDF_PERCENTILES[i] / 100 for i in surrounding)], **filters
+        )
+        if values is None:
+            return None
+        median, *points = values
+        
+        return {
+            "job_title": filters["job_title"],
+            "salary": salary,
+            "percentile": rank["percentile"],
+            "sample_size": rank["sample_size"],
+            "median": round(median),
+            "surrounding": [
+                {"percentile": round(CDF_PERCENTILES[i]), "salary": round(value)}
+                for i, value in zip(surrounding, points)
+            ],
+            "last_updated": salary_snapshot.refreshed_at
+        }
+    
+    async def get_salary_rank(
+        self,
+        salary: int,
+        job_title: str,
+        location: Optional[str] = None,
+        experience_level: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        match: str = MATCH_EXACT
+    ) -> Optional[Dict]:
+        """
+        Havi fizetés percentilis helye egy munkakör (és szűrők) eloszlásában
+        a kocka cella tárolt CDF-jéből (salary_cdf), a jobs tábla olvasása
+        nélkül; pontos munkakör névnél egy egyedi index szerinti sor
+        
+        - a meg nem adott szűrők az "összes" szintet jelentik
+        - nem pontos egyezésnél a leghasonlóbb (majd legnagyobb mintájú)
+          munkakör cellája
+        
+        Returns:
+            a rang és a környező percentilisek, vagy None, ha nincs ilyen
+            cella (kevés adat)
+        """
+        job_title = await self._statistics_title(job_title, match)
+        condition, similarity = text_match(SalaryStatistics.job_title, job_title, match)
+        query = select(SalaryStatistics).where(
+            condition,
+            _cube_key(SalaryStatistics.location) == (location or ""),
+            _cube_key(SalaryStatistics.experience_level) == (experience_level or ""),
+            _cube_key(cast(SalaryStatistics.category_id, Text)) == (str(category_id) if category_id else ""),
+            SalaryStatistics.salary_cdf.isnot(None)
+        )
+        if similarity is not None:
+            query = query.order_by(similarity.desc())
+        cell = (await self.db.execute(
+            query.order_by(SalaryStatistics.sample_size.desc()).limit(1)
+        )).scalar()
+        if cell is None:
+            return None
+        
+        cdf = cell.salary_cdf
+        percentile = _cdf_rank(cdf, salary)
+        surrounding = _surrounding(percentile)
+        
+        return {
+            "job_title": cell.job_title,
+            "salary": salary,
+            "percentile": round(percentile, 1),
+            "sample_size": cell.sample_size,
+            "median": round(cell.median_salary) if cell.median_salary else None,
+            "surrounding": [
+                {"percentile": round(CDF_PERCENTILES[i]), "salary": round(cdf[i])}
+                for i in surrounding
+            ],
+            "last_updated": cell.last_updated
+        }
+    
+    async def get_sketch_statistics(
+        self,
+        job_title: Optional[str] = None,
+        location: Optional[str] = None,
+        experience_level: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        match: str = MATCH_CONTAINS
+    ) -> Dict:
+        """
+        Fizetési statisztika tetszőleges szűrőkombinációra a kvantilis
+        vázlatok összevonásával (a jobs tábla olvasása nélkül)
+        - a kvantilisek és a min / max legfeljebb ~1% relatív hibájúak,
+          az átlag és a mintaméret pontos
+        """
+        query = select(
+            SalarySketch.bucket,
+            func.sum(SalarySketch.count).label("cnt"),
+            func.sum(SalarySketch.total).label("total")
+        ).where(SalarySketch.count > 0)
+        
+        if job_title:
+            job_title = await self._statistics_title(job_title, match)
+            condition, _ = text_match(SalarySketch.job_title, job_title, match)
+            query = query.where(condition)
+        if location:
+            query = query.where(SalarySketch.location == location)
+        if experience_level:
+            query = query.where(SalarySketch.experience_level == experience_level)
+        if category_id:
+            query = query.where(SalarySketch.category_key == str(category_id))
+        
+        merged = query.group_by(SalarySketch.bucket).subquery()
+        
+        # Vödör becsült értéke: salary_sketch_value(), mint az idősoroknál
+        # és a kocka celláiban
+        ranked = select(
+            merged.c.cnt,
+            merged.c.total,
+            func.salary_sketch_value(merged.c.bucket).label("value"),
+            func.sum(merged.c.cnt).over(order_by=merged.c.bucket).label("cum"),
+            func.sum(merged.c.cnt).over().label("n")
+        ).subquery()
+        
+        def quantile(q: float):
+            return func.min(ranked.c.value).filter(ranked.c.cum > func.floor(q * (ranked.c.n - 1)))
+        
+        row = (await self.db.execute(select(
+            func.sum(ranked.c.cnt).label("sample_size"),
+            (cast(func.sum(ranked.c.total), Float) / func.sum(ranked.c.cnt)).label("avg"),
+            func.min(ranked.c.value).label("min"),
+            func.max(ranked.c.value).label("max"),
+            quantile(0.25).label("percentile_25"),
+            quantile(0.5).label("median"),
+            quantile(0.75).label("percentile_75")
+        ))).one()
+        
+        return {
+            "avg": round(row.avg) if row.avg else None,
+            "min": round(row.min) if row.min else None,
+            "max": round(row.max) if row.max else None,
+            "median": round(row.median) if row.median else None,
+            "percentile_25": round(row.percentile_25) if row.percentile_25 else None,
+            "percentile_75": round(row.percentile_75) if row.percentile_75 else None,
+            "sample_size": int(row.sample_size or 0)
+        }
+    
+    async def rebuild_sketches(self) -> int:
+        """
+        Kvantilis vázlatok újraépítése a jobs táblából és a munkakörönkénti
+        statisztikák frissítése (eltérés javítására; a triggerek normál
+        esetben folyamatosan karbantartják őket)
+        
+        Returns:
+            A vázlat sorok (vödrök) száma
+        """
+        await self.db.execute(text("LOCK TABLE salary_sketches IN EXCLUSIVE MODE"))
+        await self.db.execute(text("DELETE FROM salary_sketches"))
+        
+        bucket = func.salary_sketch_bucket(Job.salary_monthly_min)
+        groups = (
+            STATISTICS_TITLE,
+            func.coalesce(Job.location, ""),
+            func.coalesce(Job.experience_level, ""),
+            func.coalesce(cast(Job.category_id, Text), ""),
+            bucket,
+        )
+        result = await self.db.execute(
+            insert(SalarySketch).from_select(
+                ["job_title", "location", "experience_level", "category_key", "bucket", "count", "total"],
+                select(
+                    *groups,
+                    func.count(),
+                    func.sum(cast(Job.salary_monthly_min, BigInteger))
+                ).select_from(JOBS_WITH_TITLES).where(
+                    Job.active == True,
+                    Job.salary_monthly_min > 0
+                ).group_by(*groups)
+            )
+        )
+        
+        await self.db.execute(select(func.salary_sketch_refresh(
+            select(func.array_agg(SalarySketch.job_title.distinct())).scalar_subquery()
+        )))
+        await self.db.commit()
+        return result.rowcount
+    
+    async def get_salary_trend(
+        self,
+        job_title: Optional[str] = None,
+        location: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        match: str = MATCH_EXACT,
+        period: str = PERIOD_WEEK,
+        since: Optional[date] = None,
+        until: Optional[date] = None
+    ) -> List[Dict]:
+        """
+        Fizetési idősor a salary_trends összesítőkből (a jobs tábla olvasása
+        nélkül): periódusonként a szűrőknek megfelelő csoportok összevonva
+        - a kvantilisek a vázlatokból (~1% relatív hiba), az átlag, a
+          darabszám és a min / max pontos
+        """
+        conditions = [SalaryTrend.period == period]
+        if job_title:
+            job_title = await self._statistics_title(job_title, match)
+            condition, _ = text_match(SalaryTrend.job_title, job_title, match)
+            conditions.append(condition)
+        if location:
+            conditions.append(SalaryTrend.location == location)
+        if category_id:
+            conditions.append(SalaryTrend.category_key == str(category_id))
+        if since:
+            conditions.append(SalaryTrend.period_start >= since)
+        if until:
+            conditions.append(SalaryTrend.period_start <= until)
+        
+        totals = select(
+            SalaryTrend.period_start,
+            func.sum(SalaryTrend.count).label("sample_size"),
+            (cast(func.sum(SalaryTrend.total), Float) / func.sum(SalaryTrend.count)).label("avg"),
+            func.min(SalaryTrend.min_salary).label("min"),
+            func.max(SalaryTrend.max_salary).label("max")
+        ).where(*conditions).group_by(SalaryTrend.period_start).subquery("totals")
+        
+        # Vázlatok összevonása periódusonként: vödrönkénti összeg
+        sketch = func.unnest(SalaryTrend.sketch_buckets, SalaryTrend.sketch_counts).table_valued(
+            "bucket", "cnt"
+        ).render_derived()
+        merged = select(
+            SalaryTrend.period_start,
+            sketch.c.bucket,
+            func.sum(sketch.c.cnt).label("cnt")
+        ).select_from(SalaryTrend).join(sketch, true()).where(*conditions).group_by(
+            SalaryTrend.period_start, sketch.c.bucket
+        ).subquery("merged")
+        
+        window = {"partition_by": merged.c.period_start}
+        ranked = select(
+            merged.c.period_start,
+            func.salary_sketch_value(merged.c.bucket).label("value"),
+            func.sum(merged.c.cnt).over(order_by=merged.c.bucket, **window).label("cum"),
+            func.sum(merged.c.cnt).over(**window).label("n")
+        ).subquery("ranked")
+        
+        def quantile(q: float):
+            return func.min(ranked.c.value).filter(ranked.c.cum > func.floor(q * (ranked.c.n - 1)))
+        
+        quantiles = select(
+            ranked.c.period_start,
+            quantile(0.25).label("percentile_25"),
+            quantile(0.5).label("median"),
+            quantile(0.75).label("percentile_75")
+        ).group_by(ranked.c.period_start).subquery("quantiles")
+        
+        rows = (await self.db.execute(
+            select(totals, quantiles.c.percentile_25, quantiles.c.median, quantiles.c.percentile_75).join(
+                quantiles, quantiles.c.period_start == totals.c.period_start
+            ).order_by(totals.c.period_start)
+        )).all()
+        
+        return [
+            {
+                "period_start": row.period_start.isoformat(),
+                "avg": round(row.avg) if row.avg else None,
+                "min": row.min,
+                "max": row.max,
+                "median": round(row.median) if row.median else None,
+                "percentile_25": round(row.percentile_25) if row.percentile_25 else None,
+                "percentile_75": round(row.percentile_75) if row.percentile_75 else None,
+                "sample_size": int(row.sample_size)
+            }
+            for row in rows
+        ]
+    
+    async def append_trend_rollups(self) -> Dict[str, int]:
+        """
+        Idősor összesítők bővítése a még nem összesített, lezárt (a mai UTC
+        nap előtti) begyűjtési napokkal
+        
+        A napi sorok egy csoportosító INSERT ... SELECT utasítással készülnek
+        (scraped_at indexen át csak az új napok állásai), a napjaikat
+        tartalmazó hetek sorai a napi vázlatok összevonásával frissülnek.
+        
+        Returns:
+            {"days": új napi sorok, "weeks": beszúrt vagy frissített heti sorok}
+        """
+        today = datetime.utcnow().date()
+        last_day = (await self.db.execute(
+            select(func.max(SalaryTrend.period_start)).where(SalaryTrend.period == PERIOD_DAY)
+        )).scalar()
+        if last_day:
+            start = last_day + timedelta(days=1)
+        else:
+            first_scraped = (await self.db.execute(select(func.min(Job.scraped_at)))).scalar()
+            start = first_scraped.date() if first_scraped else today
+        
+        if start >= today:
+            return {"days": 0, "weeks": 0}
+        
+        # Napi sorok: (nap, csoport, vödör) szerinti darabszám, majd vödör tömbök
+        day = cast(Job.scraped_at, Date)
+        bucket = func.salary_sketch_bucket(Job.salary_monthly_min)
+        groups = (
+            day.label("period_start"),
+            STATISTICS_TITLE.label("job_title"),
+            func.coalesce(Job.location, "").label("location"),
+            func.coalesce(cast(Job.category_id, Text), "").label("category_key"),
+        )
+        per_bucket = select(
+            *groups,
+            bucket.label("bucket"),
+            func.count().label("cnt"),
+            func.sum(cast(Job.salary_monthly_min, BigInteger)).label("total"),
+            func.min(Job.salary_monthly_min).label("min_salary"),
+            func.max(Job.salary_monthly_min).label("max_salary")
+        ).select_from(JOBS_WITH_TITLES).where(
+            Job.active == True,
+            Job.salary_monthly_min > 0,
+            Job.scraped_at >= datetime.combine(start, time.min),
+            Job.scraped_at < datetime.combine(today, time.min)
+        ).group_by(*groups, bucket).subquery("per_bucket")
+        
+        days = await self.db.execute(
+            insert(SalaryTrend).from_select(
+                list(TREND_COLUMNS),
+                _trend_rows(per_bucket, literal(PERIOD_DAY), per_bucket.c.period_start)
+            ).on_conflict_do_nothing()
+        )
+        
+        # Heti sorok a napi vázlatokból (a mai napot tartalmazó hét részleges,
+        # a következő futás frissíti)
+        week_start = cast(func.date_trunc("week", SalaryTrend.period_start), Date)
+        sketch = func.unnest(SalaryTrend.sketch_buckets, SalaryTrend.sketch_counts).table_valued(
+            "bucket", "cnt", with_ordinality="ordinality"
+        ).render_derived()
+        daily = select(
+            SalaryTrend.job_title,
+            SalaryTrend.location,
+            SalaryTrend.category_key,
+            week_start.label("period_start"),
+            sketch.c.bucket,
+            sketch.c.cnt,
+            # A napi összeg egyszer számít (az első vödör sorában)
+            case((sketch.c.ordinality == 1, SalaryTrend.total), else_=0).label("total"),
+            SalaryTrend.min_salary,
+            SalaryTrend.max_salary
+        ).select_from(SalaryTrend).join(sketch, true()).where(
+            SalaryTrend.period == PERIOD_DAY,
+            SalaryTrend.period_start >= cast(func.date_trunc("week", literal(start, Date)), Date)
+        ).subquery("daily")
+        per_bucket = select(
+            daily.c.period_start,
+            daily.c.job_title,
+            daily.c.location,
+            daily.c.category_key,
+            daily.c.bucket,
+            func.sum(daily.c.cnt).label("cnt"),
+            func.sum(daily.c.total).label("total"),
+            func.min(daily.c.min_salary).label("min_salary"),
+            func.max(daily.c.max_salary).label("max_salary")
+        ).group_by(
+            daily.c.period_start, daily.c.job_title, daily.c.location, daily.c.category_key, daily.c.bucket
+        ).subquery("weekly")
+        
+        stmt = insert(SalaryTrend).from_select(
+            list(TREND_COLUMNS),
+            _trend_rows(per_bucket, literal(PERIOD_WEEK), per_bucket.c.period_start)
+        )
+        weeks = await self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[
+                SalaryTrend.period, SalaryTrend.job_title, SalaryTrend.location,
+                SalaryTrend.category_key, SalaryTrend.period_start
+            ],
+            set_={
+                name: stmt.excluded[name]
+                for name in TREND_COLUMNS
+                if name not in TREND_KEY_COLUMNS
+            }
+        ))
+        
+        await self.db.commit()
+        return {"days": days.rowcount, "weeks": weeks.rowcount}
+    
+    async def calculate_and_store_statistics(self) -> Dict[str, int]:
+        """
+        Statisztika kocka pontos újraszámolása és tárolása
+        
+        Egyetlen csoportosító lekérdezés: GROUP BY munkakör,
+        CUBE(helyszín, tapasztalat, kategória), cellánként percentile_cont,
+        átlag, min, max és darabszám (legalább MIN_SAMPLE_SIZE adattal).
+        Ismeretlen dimenzió értékű állások csak az összesített szintekben
+        szerepelnek. Az eredmény egy INSERT ... ON CONFLICT utasítással kerül
+        a salary_statistics táblába, a ki nem számolt (elavult) cellák
+        ugyanabban az utasításban törlődnek.
+        
+        Returns:
+            {"stored": beszúrt vagy frissített cellák, "removed": törölt cellák}
+        """
+        salary = Job.salary_monthly_min
+        now = datetime.utcnow()
+        dimensions = (
+            func.nullif(Job.location, ""),
+            func.nullif(Job.experience_level, ""),
+            Job.category_id,
+        )
+        
+        computed = select(
+            STATISTICS_TITLE,
+            *dimensions,
+            func.avg(salary),
+            func.percentile_cont(0.5).within_group(salary),
+            func.min(salary),
+            func.max(salary),
+            func.percentile_cont(0.25).within_group(salary),
+            func.percentile_cont(0.75).within_group(salary),
+            func.count(salary),
+            literal(now),
+            literal(now),
+            func.percentile_cont(
+                literal([p / 100 for p in CDF_PERCENTILES], ARRAY(Float))
+            ).within_group(salary),
+        ).select_from(JOBS_WITH_TITLES).where(
+            Job.active == True,
+            salary > 0
+        ).group_by(
+            STATISTICS_TITLE, func.cube(*dimensions)
+        ).having(and_(
+            func.count(salary) >= MIN_SAMPLE_SIZE,
+            # NULL csak az összesített szintet jelentheti
+            *(or_(func.grouping(dimension) == 1, dimension.isnot(None)) for dimension in dimensions)
+        ))
+        
+        stmt = insert(SalaryStatistics).from_select(
+            list(STATISTICS_COLUMNS), computed, include_defaults=False
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                SalaryStatistics.job_title,
+                _cube_key(SalaryStatistics.location),
+                _cube_key(SalaryStatistics.experience_level),
+                _cube_key(cast(SalaryStatistics.category_id, Text)),
+            ],
+            set_={
+                name: stmt.excluded[name]
+                for name in STATISTICS_COLUMNS
+                if name not in CUBE_KEY_COLUMNS + ("created_at",)
+            }
+        )
+        stored = stmt.returning(SalaryStatistics.id).cte("stored")
+        removed = delete(SalaryStatistics).where(
+            SalaryStatistics.id.not_in(select(stored.c.id))
+        ).returning(SalaryStatistics.id).cte("removed")
+        
+        counts = (await self.db.execute(select(
+            select(func.count()).select_from(stored).scalar_subquery().label("stored"),
+            select(func.count()).select_from(removed).scalar_subquery().label("removed")
+        ))).one()
+        await self.db.commit()
+        return {"stored": counts.stored, "removed": counts.removed}
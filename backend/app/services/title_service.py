@@ -0,0 +1,188 @@
+"""
+Title Service
+Kanonikus munkakörök: címek leképezése betöltéskor és az offline újracsoportosítás
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import String, column, delete, exists, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set
+from uuid import UUID, uuid4
+
+from ..models.canonical_title import CanonicalTitle, TitleAlias
+from ..models.job import Job
+from ..utils.titles import cluster_titles, display_name, title_key, title_keys
+
+# Az állások átsorolása ennyi címenként egy utasítás (és tranzakció)
+REASSIGN_BATCH_SIZE = 500
+
+
+class TitleService:
+    """Kanonikus munkakör service"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _aliases(self, keys: Set[str]) -> Dict[str, UUID]:
+        if not keys:
+            return {}
+        result = await self.db.execute(
+            select(TitleAlias.key, TitleAlias.canonical_title_id).where(TitleAlias.key.in_(keys))
+        )
+        return dict(result.all())
+    
+    async def _ensure_names(self, names: Set[str]) -> Dict[str, UUID]:
+        """Kanonikus munkakörök név szerint (a hiányzók létrehozásával)"""
+        if not names:
+            return {}
+        # Név szerint rendezve: párhuzamos betöltéseknél azonos zárolási sorrend
+        await self.db.execute(
+            insert(CanonicalTitle)
+            .values([{"id": uuid4(), "name": name} for name in sorted(names)])
+            .on_conflict_do_nothing(index_elements=[CanonicalTitle.name])
+        )
+        result = await self.db.execute(
+            select(CanonicalTitle.name, CanonicalTitle.id).where(CanonicalTitle.name.in_(names))
+        )
+        return dict(result.all())
+    
+    async def lookup(self, title: str) -> Optional[CanonicalTitle]:
+        """
+        Cím kanonikus munkaköre a normalizált kulcs szerint (csak olvas,
+        lekérdezések szűrőjéhez); None, ha a kulcs nincs leképezve
+        """
+        result = await self.db.execute(
+            select(CanonicalTitle)
+            .join(TitleAlias, TitleAlias.canonical_title_id == CanonicalTitle.id)
+            .where(TitleAlias.key == title_key(title))
+        )
+        return result.scalar()
+    
+    async def resolve(self, titles: Iterable[str]) -> Dict[str, UUID]:
+        """
+        Címek kanonikus munkakör azonosítója (betöltéskor, a hívó tranzakciójában)
+        
+        - a cím normalizált kulcsa a title_aliases táblában
+        - ismeretlen kulcsnál új kanonikus munkakör (a cím megjelenítendő
+          nevével) és leképezés készül; az offline újracsoportosítás később
+          összevonhatja a hasonlókkal
+        
+        Returns:
+            cím -> canonical_title_id
+        """
+        keys = title_keys(titles)
+        aliases = await self._aliases(set(keys.values()))
+        
+        missing = {key: display_name(title) for title, key in keys.items() if key not in aliases}
+        if missing:
+            ids = await self._ensure_names(set(missing.values()))
+            await self.db.execute(
+                insert(TitleAlias)
+                .values([
+                    {"key": key, "canonical_title_id": ids[name]}
+                    for key, name in sorted(missing.items())
+                ])
+                .on_conflict_do_nothing(index_elements=[TitleAlias.key])
+            )
+            # Párhuzamos betöltésnél a másik tranzakció leképezése nyer
+            aliases.update(await self._aliases(set(missing)))
+        
+        return {title: aliases[key] for title, key in keys.items()}
+    
+    async def rebuild(self) -> Dict[str, int]:
+        """
+        Offline újracsoportosítás (manage.py build-canonical-titles)
+        
+        1. a jobs tábla összes címének csoportosítása (normalizálási
+           szabályok, szinonimák, hasonló kulcsok összevonása)
+        2. csoportonként egy kanonikus munkakör: a meglévő azonosító marad,
+           ha a csoport kulcsai már leképezettek (a leggyakoribb nyer)
+        3. title_aliases frissítése, majd az állások átsorolása
+           REASSIGN_BATCH_SIZE címenként, külön tranzakciókban (a vázlat
+           triggerek kötegenként viszik át a statisztikát)
+        4. a már nem hivatkozott kanonikus munkakörök törlése
+        
+        Returns:
+            {"titles", "canonical_titles", "updated": átsorolt állások}
+        """
+        counts = dict((await self.db.execute(
+            select(Job.title, func.count()).group_by(Job.title)
+        )).all())
+        clusters = cluster_titles(counts)
+        aliases = dict((await self.db.execute(
+            select(TitleAlias.key, TitleAlias.canonical_title_id)
+        )).all())
+        
+        # Csoportonként a tagkulcsok meglévő azonosítói, állásszámmal súlyozva
+        key_counts: Counter = Counter()
+        for title, count in counts.items():
+            key_counts[title_key(title)] += count
+        votes: Dict[str, Counter] = {}
+        for key, (representative, _) in clusters.items():
+            if key in aliases:
+                votes.setdefault(representative, Counter())[aliases[key]] += key_counts[key]
+        
+        # Nagyobb csoport választ előbb; egy azonosító csak egy csoporté
+        # lehet (szétvált csoport új kanonikus munkakört kap)
+        cluster_ids: Dict[str, UUID] = {}
+        taken = set()
+        for representative, ids in sorted(votes.items(), key=lambda item: -sum(item[1].values())):
+            for canonical_id, _ in ids.most_common():
+                if canonical_id not in taken:
+                    cluster_ids[representative] = canonical_id
+                    taken.add(canonical_id)
+                    break
+        new_names = {
+            representative: name for representative, name in clusters.values()
+            if representative not in cluster_ids
+        }
+        ids = await self._ensure_names(set(new_names.values()))
+        cluster_ids.update({representative: ids[name] for representative, name in new_names.items()})
+        
+        mapping = sorted(
+            (key, cluster_ids[representative]) for key, (representative, _) in clusters.items()
+            if aliases.get(key) != cluster_ids[representative]
+        )
+        if mapping:
+            stmt = insert(TitleAlias).values([
+                {"key": key, "canonical_title_id": canonical_id} for key, canonical_id in mapping
+            ])
+            await self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[TitleAlias.key],
+                set_={"canonical_title_id": stmt.excluded.canonical_title_id}
+            ))
+        await self.db.commit()
+        
+        assignments = sorted(
+            (title, cluster_ids[clusters[title_key(title)][0]]) for title in counts
+        )
+        updated = 0
+        for start in range(0, len(assignments), REASSIGN_BATCH_SIZE):
+            batch = values(
+                column("title", String), column("canonical_title_id", PG_UUID(as_uuid=True)),
+                name="assignments"
+            ).data(assignments[start:start + REASSIGN_BATCH_SIZE])
+            result = await self.db.execute(
+                update(Job)
+                .where(
+                    Job.title == batch.c.title,
+                    Job.canonical_title_id.is_distinct_from(batch.c.canonical_title_id)
+                )
+                .values(canonical_title_id=batch.c.canonical_title_id)
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+            updated += result.rowcount
+        
+        await self.db.execute(delete(CanonicalTitle).where(
+            ~exists().where(TitleAlias.canonical_title_id == CanonicalTitle.id),
+            ~exists().where(Job.canonical_title_id == CanonicalTitle.id)
+        ))
+        await self.db.commit()
+        
+        return {
+            "titles": len(counts),
+            "canonical_titles": len(set(cluster_ids.values())),
+            "updated": updated
+        }
@@ -2,5 +2,37 @@
 Utility functions
 """
 from .ai_processor import AIProcessor, ai_processor
+from .pagination import encode_cursor, decode_cursor, next_cursor, cursor_param
+from .search import build_tsquery, text_match, MATCH_CONTAINS, MATCH_FUZZY, MATCH_EXACT
+from .serialization import row_serializer, serialize_rows, json_response, FastJSONResponse
+from .export import encode_ndjson, encode_csv, encode_csv_header
+from .cache import TTLCache, cache_stats
+from .projection import parse_job_fields, fields_param, serialize_job_rows, FIELDS_SUMMARY, FIELDS_FULL
 
-__all__ = ["AIProcessor", "ai_processor"]
+__all__ = [
+    "AIProcessor",
+    "ai_processor",
+    "encode_cursor",
+    "decode_cursor",
+    "next_cursor",
+    "cursor_param",
+    "build_tsquery",
+    "text_match",
+    "MATCH_CONTAINS",
+    "MATCH_FUZZY",
+    "MATCH_EXACT",
+    "row_serializer",
+    "serialize_rows",
+    "json_response",
+    "FastJSONResponse",
+    "parse_job_fields",
+    "fields_param",
+    "serialize_job_rows",
+    "FIELDS_SUMMARY",
+    "FIELDS_FULL",
+    "TTLCache",
+    "cache_stats",
+    "encode_ndjson",
+    "encode_csv",
+    "encode_csv_header",
+]
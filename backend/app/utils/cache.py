@@ -0,0 +1,131 @@
+"""
+Cache
+Folyamaton belüli, korlátos méretű TTL cache generáció alapú invalidálással
+"""
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+import time
+
+from ..models.cache_generation import CacheGeneration
+
+# Név -> cache, a statisztika endpointhoz
+CACHES: Dict[str, "TTLCache"] = {}
+
+# get() alapértéke: megkülönbözteti a hiányzó kulcsot a cache-elt None-tól
+MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU + TTL cache egy adatkörhöz (pl. kategóriák)
+    
+    Több worker esetén a cache_generations táblában tárolt generáció
+    a közös verzió: a módosító worker növeli (invalidate), a többi legfeljebb
+    check_interval másodpercenként egy PK lekérdezéssel ellenőrzi (validate),
+    és eltérés esetén üríti a saját cache-ét. A TTL ezen felüli védőháló.
+    """
+    
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 300.0, check_interval: float = 5.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._checked_at = 0.0
+        CACHES[name] = self
+    
+    def get(self, key: Hashable, default=None):
+        """Érték a cache-ből, lejárt vagy hiányzó kulcs esetén default"""
+        entry = self._data.get(key, MISSING)
+        if entry is not MISSING:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        
+        self.misses += 1
+        return default
+    
+    def set(self, key: Hashable, value: Any):
+        """Érték mentése; a legrégebben használt kulcs kiesik, ha megtelt"""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self):
+        """Helyi tartalom ürítése"""
+        self._data.clear()
+    
+    async def validate(self, db: AsyncSession):
+        """
+        Generáció ellenőrzése (legfeljebb check_interval másodpercenként)
+        Ha egy másik worker módosított, a helyi tartalom törlődik.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        
+        result = await db.execute(
+            select(CacheGeneration.generation).where(CacheGeneration.name == self.name)
+        )
+        generation = result.scalar() or 0
+        self._checked_at = now
+        
+        if generation != self.generation:
+            self.clear()
+            self.generation = generation
+    
+    async def invalidate(self, db: AsyncSession):
+        """
+        Generáció növelése a hívó tranzakciójában és helyi ürítés
+        (a hívó commitja után a többi worker is észleli). A commit után
+        érdemes újra clear()-t hívni: a köztes időben más kérés még a régi
+        adatokat tölthette be.
+        """
+        stmt = insert(CacheGeneration).values(name=self.name, generation=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheGeneration.name],
+            set_={
+                "generation": CacheGeneration.generation + 1,
+                "updated_at": func.now(),
+            }
+        ).returning(CacheGeneration.generation)
+        
+        self.generation = (await db.execute(stmt)).scalar_one()
+        self._checked_at = time.monotonic()
+        self.invalidations += 1
+        self.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Találati statisztika"""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Összes regisztrált cache statisztikája (az aktuális workerben)"""
+    return {name: cache.stats() for name, cache in CACHES.items()}
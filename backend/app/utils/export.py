@@ -0,0 +1,63 @@
+"""
+Export
+Sorok kódolása streamelt NDJSON / CSV exporthoz
+"""
+
+from datetime import datetime
+from typing import Sequence
+from uuid import UUID
+import csv
+import io
+import orjson
+
+from .serialization import row_serializer, orjson_default
+
+EXPORT_NDJSON = "ndjson"
+EXPORT_CSV = "csv"
+EXPORT_FORMAT_PATTERN = f"^({EXPORT_NDJSON}|{EXPORT_CSV})$"
+
+MEDIA_TYPES = {
+    EXPORT_NDJSON: "application/x-ndjson",
+    EXPORT_CSV: "text/csv",
+}
+
+
+def encode_ndjson(rows: Sequence, keys: Sequence[str]) -> bytes:
+    """Egy köteg sor NDJSON-ként (soronként egy JSON objektum)"""
+    serialize = row_serializer(tuple(keys))
+    return b"".join(
+        orjson.dumps(serialize(row), default=orjson_default, option=orjson.OPT_APPEND_NEWLINE)
+        for row in rows
+    )
+
+
+def _csv_value(value):
+    """CSV cella: None -> üres, listák / dict-ek JSON-ként"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (list, dict)):
+        return orjson.dumps(value).decode()
+    return value
+
+
+def encode_csv_header(keys: Sequence[str]) -> bytes:
+    """CSV fejléc sor"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(keys)
+    return buffer.getvalue().encode()
+
+
+def encode_csv(rows: Sequence, keys: Sequence[str]) -> bytes:
+    """Egy köteg sor CSV-ként (a sor első len(keys) oszlopa)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    width = len(keys)
+    
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row[:width]])
+    
+    return buffer.getvalue().encode()
@@ -0,0 +1,166 @@
+"""
+Pagination
+Keyset (cursor) alapú lapozás és egy lekérdezéses lap + darabszám
+"""
+
+from fastapi import HTTPException, Query
+from sqlalchemy import func, literal_column, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+import base64
+import json
+
+from ..config.settings import settings
+
+Cursor = Tuple[datetime, UUID]
+
+
+class Page(NamedTuple):
+    """Egy lapnyi találat és a teljes (vagy becsült) darabszám"""
+    items: List
+    total: int
+    approximate: bool
+
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    """(created_at, id) pár kódolása átlátszatlan cursor stringgé"""
+    payload = json.dumps([created_at.isoformat(), str(item_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Cursor string visszafejtése (created_at, id) párrá"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def next_cursor(items: List, limit: int) -> Optional[str]:
+    """
+    Következő oldal cursora az utolsó elem alapján.
+    None, ha nincs több oldal (üres vagy nem teli oldal).
+    """
+    if not items or len(items) < limit:
+        return None
+    
+    last = items[-1]
+    if last.created_at is None:
+        return None
+    return encode_cursor(last.created_at, last.id)
+
+
+def cursor_param(
+    cursor: Optional[str] = Query(
+        None,
+        description="Az előző válasz next_cursor értéke; megadása esetén a skip figyelmen kívül marad"
+    )
+) -> Optional[Cursor]:
+    """FastAPI dependency: cursor query paraméter validálása"""
+    if cursor is None:
+        return None
+    
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Érvénytelen cursor")
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <statement>"""
+    
+    inherit_cache = False
+    
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_count(db: AsyncSession, stmt) -> int:
+    """Sorszám becslése a query planner alapján (a lekérdezés futtatása nélkül)"""
+    plan = (await db.execute(_Explain(stmt))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(db: AsyncSession, stmt) -> int:
+    """Pontos sorszám egy szűrt select-hez"""
+    count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    return (await db.execute(count_stmt)).scalar_one()
+
+
+def _paginate(stmt, limit: int, skip: int, cursor: Optional[Cursor], keyset: Optional[Sequence]):
+    """Lapozás: keyset feltétel (cursor esetén) vagy offset"""
+    if cursor and keyset is not None:
+        stmt = stmt.where(tuple_(*keyset) < cursor)
+    else:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+
+async def fetch_page(
+    db: AsyncSession,
+    stmt,
+    order_by: Sequence,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[Cursor] = None,
+    keyset: Optional[Sequence] = None,
+    total: Optional[int] = None
+) -> Page:
+    """
+    Lap és darabszám lekérése egyetlen utasításban
+    
+    A darabszám egy legfeljebb COUNT_ESTIMATE_THRESHOLD + 1 sort számoló
+    allekérdezés, ami egyszer fut le (InitPlan). Ha a halmaz ennél nagyobb,
+    a planner becslését adjuk vissza approximate=True jelzéssel.
+    
+    Args:
+        stmt: Szűrt select, rendezés és lapozás nélkül. ORM entitás select esetén
+            az elemek objektumok, oszlop select esetén a sorok (Row)
+        order_by: Rendezési kifejezések
+        keyset: (created_at, id) oszlopok cursor lapozáshoz
+        total: Előre ismert darabszám (pl. számlálóból); ilyenkor nincs számolás
+    """
+    if total is not None:
+        page = _paginate(stmt.order_by(*order_by), limit, skip, cursor, keyset)
+        result = await db.execute(page)
+        items = result.scalars().all() if len(stmt.column_descriptions) == 1 else result.all()
+        return Page(items, total, False)
+    
+    threshold = settings.COUNT_ESTIMATE_THRESHOLD
+    
+    capped = stmt.with_only_columns(
+        literal_column("1"), maintain_column_froms=True
+    ).limit(threshold + 1).subquery()
+    total_expr = select(func.count()).select_from(capped).scalar_subquery()
+    
+    page = stmt.add_columns(total_expr.label("total")).order_by(*order_by)
+    rows = (await db.execute(_paginate(page, limit, skip, cursor, keyset))).all()
+    if len(stmt.column_descriptions) == 1:
+        items = [row[0] for row in rows]
+    else:
+        items = rows
+    
+    if rows:
+        total = rows[0].total
+    elif not cursor and skip == 0:
+        total = 0
+    else:
+        # Üres lap az eredményhalmaz vége után: külön számolás szükséges
+        total = (await db.execute(select(total_expr))).scalar_one()
+    
+    if total > threshold:
+        return Page(items, max(await estimate_count(db, stmt), total), True)
+    return Page(items, total, False)
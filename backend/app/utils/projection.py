@@ -0,0 +1,102 @@
+"""
+Projection
+Lista nézetek mezőválasztása (fields=) - csak a szükséges oszlopok lekérdezése
+"""
+
+from fastapi import HTTPException, Query
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..models.job import Job
+from .serialization import serialize_rows
+
+FIELDS_SUMMARY = "summary"
+FIELDS_FULL = "full"
+
+# Lekérdezhető mezők (a Job.to_dict kulcsai, ugyanabban a sorrendben)
+JOB_FIELDS = (
+    "id", "title", "canonical_title_id", "company", "location",
+    "salary_min", "salary_max", "salary_currency", "salary_period",
+    "salary_monthly_min", "salary_monthly_max",
+    "experience_level", "employment_type", "skills", "description",
+    "source_url", "source_portal", "scraped_at", "verified", "active",
+    "category_id", "created_at", "updated_at",
+)
+
+# Lista nézet alapértelmezése: leírás és skills nélkül
+JOB_SUMMARY_FIELDS = (
+    "id", "title", "company", "location",
+    "salary_min", "salary_max", "salary_currency", "salary_period",
+    "salary_monthly_min", "salary_monthly_max",
+    "experience_level", "employment_type", "category_id", "created_at",
+)
+
+# Cursor lapozáshoz mindig lekérdezzük (a válaszba csak kérésre kerülnek)
+_KEYSET_FIELDS = ("id", "created_at")
+
+
+def parse_job_fields(value: Optional[str]) -> Tuple[str, ...]:
+    """
+    fields paraméter feldolgozása
+    
+    - summary (alapértelmezett): lista nézet mezői
+    - full: minden mező (mint a Job.to_dict)
+    - vesszővel elválasztott mezőnevek, pl. title,company,salary_min
+    """
+    if not value or value == FIELDS_SUMMARY:
+        return JOB_SUMMARY_FIELDS
+    if value == FIELDS_FULL:
+        return JOB_FIELDS
+    
+    fields = []
+    for name in (part.strip() for part in value.split(",")):
+        if not name:
+            continue
+        if name not in JOB_FIELDS:
+            raise ValueError(f"Unknown field: {name}")
+        if name not in fields:
+            fields.append(name)
+    
+    if not fields:
+        raise ValueError("No fields given")
+    return tuple(fields)
+
+
+def make_fields_param(default: str = FIELDS_SUMMARY) -> Callable[..., Tuple[str, ...]]:
+    """fields query paraméter dependency adott alapértelmezéssel"""
+    
+    def dependency(
+        fields: Optional[str] = Query(
+            default,
+            description="summary, full vagy vesszővel elválasztott mezőnevek (pl. title,company,salary_min)"
+        )
+    ) -> Tuple[str, ...]:
+        try:
+            return parse_job_fields(fields)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Érvénytelen fields paraméter. Elérhető mezők: {', '.join(JOB_FIELDS)}"
+            )
+    
+    return dependency
+
+
+# FastAPI dependency: fields query paraméter validálása (lista nézetek)
+fields_param = make_fields_param(FIELDS_SUMMARY)
+
+
+def job_columns(fields: Sequence[str]) -> List:
+    """
+    Lekérdezendő Job oszlopok: a kért mezők, majd a lapozáshoz szükségesek
+    (a sorrend megegyezik a serialize_job_rows által várt pozíciókkal)
+    """
+    names = list(fields) + [name for name in _KEYSET_FIELDS if name not in fields]
+    return [getattr(Job, name) for name in names]
+
+
+def serialize_job_rows(rows: Sequence, fields: Sequence[str]) -> List[Dict]:
+    """
+    Oszlop select sorainak átalakítása a Job.to_dict kulcsaira
+    (UUID / datetime értékek az orjson válaszban lesznek szöveggé)
+    """
+    return serialize_rows(rows, fields)
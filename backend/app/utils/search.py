@@ -0,0 +1,78 @@
+"""
+Search
+Teljes szöveges keresés (PostgreSQL tsvector / tsquery) segédfüggvényei
+"""
+
+from sqlalchemy import cast, func, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
+import re
+
+# A hungarian konfiguráció másolata unaccent szűrővel (alembic 0002)
+SEARCH_CONFIG = "hungarian_unaccent"
+
+# "idézőjeles kifejezés" vagy szóközzel elválasztott szó
+_TOKEN_RE = re.compile(r'"([^"]+)"|(\S+)')
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def _config():
+    return cast(SEARCH_CONFIG, REGCONFIG)
+
+
+def build_tsquery(query: str):
+    """
+    Keresőkifejezés átalakítása tsquery-vé
+    
+    - "senior python": kifejezés (phrase) keresés
+    - fejleszt*: prefix keresés
+    - minden más szó ÉS kapcsolatban
+    """
+    parts = []
+    
+    for phrase, word in _TOKEN_RE.findall(query):
+        if phrase:
+            parts.append(func.phraseto_tsquery(_config(), phrase))
+        elif word.endswith("*"):
+            # A to_tsquery szintaxisa miatt csak betűk/számok maradhatnak
+            stem = _NON_WORD_RE.sub("", word)
+            if stem:
+                parts.append(func.to_tsquery(_config(), f"{stem}:*"))
+        else:
+            parts.append(func.plainto_tsquery(_config(), word))
+    
+    if not parts:
+        return func.plainto_tsquery(_config(), query)
+    
+    tsquery = parts[0]
+    for part in parts[1:]:
+        tsquery = tsquery.op("&&")(part)
+    return tsquery
+
+
+
+# Szöveges szűrők illesztési módjai
+MATCH_CONTAINS = "contains"
+MATCH_FUZZY = "fuzzy"
+MATCH_EXACT = "exact"
+MATCH_MODE_PATTERN = f"^({MATCH_CONTAINS}|{MATCH_FUZZY}|{MATCH_EXACT})$"
+
+
+def text_match(column, value: str, mode: str = MATCH_CONTAINS):
+    """
+    Szöveges szűrőfeltétel trigram indexhez (pg_trgm, alembic 0003)
+    
+    - contains: ILIKE '%x%' részszöveg egyezés
+    - fuzzy: trigram szó-hasonlóság, elgépelést is tűr ("Budapst")
+    - exact: pontos egyezés (B-tree index)
+    
+    Returns:
+        (feltétel, hasonlósági pontszám kifejezés vagy None)
+    """
+    if mode == MATCH_FUZZY:
+        return (
+            literal(value).op("<%")(column),
+            func.word_similarity(value, column),
+        )
+    if mode == MATCH_EXACT:
+        return column == value, None
+    return column.ilike(f"%{value}%"), None
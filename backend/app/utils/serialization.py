@@ -0,0 +1,58 @@
+"""
+Serialization
+Előre generált sor -> dict átalakítók és orjson válasz
+"""
+
+from fastapi.responses import ORJSONResponse
+from functools import lru_cache
+from typing import Any, Callable, Dict, Sequence, Tuple
+from uuid import UUID
+import orjson
+
+
+def orjson_default(value):
+    """orjson által nem ismert típusok (pl. az asyncpg saját UUID alosztálya)"""
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError
+
+
+@lru_cache(maxsize=256)
+def row_serializer(keys: Tuple[str, ...]) -> Callable[[Sequence], Dict]:
+    """
+    Sor (Row / tuple) -> dict függvény adott kulcsokhoz, mezőnként egyszer generálva
+    
+    A függvény törzse egy dict literál ({"id": row[0], "title": row[1], ...}),
+    így soronként nincs ciklus, getattr vagy formázás. A UUID és datetime
+    értékeket az orjson alakítja szöveggé (a to_dict-tel azonos formában).
+    A sor végén lévő további oszlopok (pl. total, cursor mezők) kimaradnak.
+    """
+    items = ", ".join(f"{key!r}: row[{index}]" for index, key in enumerate(keys))
+    namespace = {}
+    exec(f"def serialize(row):\n    return {{{items}}}", namespace)
+    return namespace["serialize"]
+
+
+def serialize_rows(rows: Sequence, keys: Sequence[str]):
+    """Sorok listájának átalakítása a kulcsokhoz tartozó serializerrel"""
+    serialize = row_serializer(tuple(keys))
+    return [serialize(row) for row in rows]
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Alapértelmezett válasz osztály: orjson, UUID alosztályok támogatásával"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+def json_response(content, status_code: int = 200) -> FastJSONResponse:
+    """
+    orjson válasz közvetlenül (a FastAPI jsonable_encoder lépése nélkül)
+    Nagy listáknál ez a válaszépítés költségének nagy része.
+    """
+    return FastJSONResponse(content, status_code=status_code)
@@ -0,0 +1,507 @@
+"""
+Snapshot
+Aktív állások fizetéseinek oszlopos, memóriabeli pillanatképe (NumPy)
+"""
+
+from sqlalchemy import func, outerjoin, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from ..models.job import Job
+from ..models.canonical_title import CanonicalTitle
+from .search import MATCH_CONTAINS, MATCH_EXACT
+
+logger = logging.getLogger(__name__)
+
+# Beolvasott sorok száma kötegenként (szerver oldali cursor)
+LOAD_BATCH_SIZE = 10000
+
+# Inkrementális frissítésnél ennyivel a vízjel előttről is olvasunk: a
+# később commitolt, korábbi updated_at értékű módosítások se maradjanak ki
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+# Maszk blokkméret a kvantilisek kereséséhez (blokkonkénti darabszám)
+BLOCK_SIZE = 1024
+
+# Részszöveges munkakör szűrésnél eddig a találatszámig egyenlőség
+# vizsgálatok VAGY kapcsolata, fölötte kódtáblás (lookup) maszk
+MAX_OR_CODES = 8
+
+# Oszlopok és típusaik (a kódolt oszlopokban 0: hiányzó érték)
+COLUMNS = {
+    "salary_min": np.int32,
+    "salary_max": np.int32,
+    "title": np.int32,
+    "location": np.int32,
+    "experience_level": np.int16,
+    "category": np.int32,
+}
+
+SNAPSHOT_COLUMNS = (
+    Job.id, Job.salary_monthly_min, Job.salary_monthly_max,
+    func.coalesce(CanonicalTitle.name, Job.title).label("title"),
+    Job.location, Job.experience_level, Job.category_id, Job.active, Job.updated_at,
+)
+# A title dimenzió a statisztikák munkaköre: kanonikus név, ennek híján a cím
+SNAPSHOT_SOURCE = outerjoin(Job, CanonicalTitle, CanonicalTitle.id == Job.canonical_title_id)
+
+# Hiányzó salary_monthly_max
+NO_SALARY = -1
+
+
+def eligible(row) -> bool:
+    """A pillanatképbe kerül-e az állás (aktív, pozitív havi fizetés)"""
+    return bool(row.active) and bool(row.salary_monthly_min) and row.salary_monthly_min > 0
+
+
+class Dictionary:
+    """Szótár kódolás: érték -> egész kód (0: hiányzó érték)"""
+    
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.folded: List[str] = [""]
+        self.codes: Dict[str, int] = {}
+    
+    def encode(self, value) -> int:
+        if value is None or value == "":
+            return 0
+        value = str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self.folded.append(value.lower())
+        return code
+    
+    def lookup(self, value) -> int:
+        """Érték kódja, ismeretlen értéknél -1 (egy sorra sem illeszkedik)"""
+        return self.codes.get(str(value), -1)
+    
+    def containing(self, needle: str) -> List[int]:
+        """A needle-t (kis- és nagybetű függetlenül) tartalmazó értékek kódjai"""
+        needle = needle.lower()
+        return [code for code, value in enumerate(self.folded) if code and needle in value]
+
+
+class Dictionaries:
+    """Egy pillanatkép generáció szótárai (teljes újratöltéskor újak)"""
+    
+    def __init__(self):
+        self.title = Dictionary()
+        self.location = Dictionary()
+        self.experience_level = Dictionary()
+        self.category = Dictionary()
+    
+    def encode(self, rows: Sequence) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Sorok id tömbje és kódolt oszlopai"""
+        count = len(rows)
+        ids = np.array([r.id.bytes for r in rows], dtype="S16")
+        return ids, {
+            "salary_min": np.fromiter((r.salary_monthly_min for r in rows), np.int32, count),
+            "salary_max": np.fromiter((r.salary_monthly_max or NO_SALARY for r in rows), np.int32, count),
+            "title": np.fromiter((self.title.encode(r.title) for r in rows), np.int32, count),
+            "location": np.fromiter((self.location.encode(r.location) for r in rows), np.int32, count),
+            "experience_level": np.fromiter(
+                (self.experience_level.encode(r.experience_level) for r in rows), np.int16, count
+            ),
+            "category": np.fromiter((self.category.encode(r.category_id) for r in rows), np.int32, count),
+        }
+
+
+class SnapshotData:
+    """
+    Egy pillanatkép (nem módosul; frissítéskor új példány készül)
+    
+    A sorok salary_min szerint rendezettek: egy szűrő maszk első / utolsó
+    találata a min / max, a k-adik találat (kvantilis) blokkonkénti
+    darabszámokkal kereshető, a szűrt értékek kigyűjtése és rendezése
+    nélkül. Az id index (rendezett id-k és soraik) az inkrementális
+    frissítéshez kell.
+    """
+    
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        ids_sorted: np.ndarray,
+        id_rows: np.ndarray,
+        dictionaries: Dictionaries,
+        watermark: Optional[datetime]
+    ):
+        self.columns = columns
+        self.ids_sorted = ids_sorted
+        self.id_rows = id_rows
+        self.dictionaries = dictionaries
+        self.watermark = watermark
+        self.size = len(ids_sorted)
+        self._totals = None
+    
+    @classmethod
+    def from_id_ordered(cls, ids: np.ndarray, columns: Dict[str, np.ndarray], dictionaries, watermark):
+        """Id szerint rendezett sorokból (teljes betöltés): fizetés szerinti rendezés"""
+        order = np.argsort(columns["salary_min"], kind="stable")
+        id_rows = np.empty(len(order), dtype=np.int32)
+        id_rows[order] = np.arange(len(order), dtype=np.int32)
+        return cls(
+            {name: column[order] for name, column in columns.items()},
+            ids, id_rows, dictionaries, watermark
+        )
+    
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.ids_sorted.nbytes + self.id_rows.nbytes
+            + sum(column.nbytes for column in self.columns.values())
+        )
+    
+    def merged(self, keys: np.ndarray, ids: np.ndarray, columns: Dict[str, np.ndarray], watermark):
+        """
+        Új pillanatkép a módosult állásokkal: a keys id-jű sorok kikerülnek,
+        az (ids, columns) sorok a fizetés szerinti helyükre kerülnek
+        (minden lépés O(n) tömbművelet, teljes rendezés nélkül)
+        """
+        # Meglévő sorok törlése (az id indexből és az oszlopokból)
+        positions = np.searchsorted(self.ids_sorted, keys)
+        found = positions < self.size
+        found[found] = self.ids_sorted[positions[found]] == keys[found]
+        positions = positions[found]
+        
+        keep_index = np.ones(self.size, dtype=bool)
+        keep_index[positions] = False
+        keep_rows = np.ones(self.size, dtype=bool)
+        keep_rows[self.id_rows[positions]] = False
+        
+        ids_sorted = self.ids_sorted[keep_index]
+        # Régi sorindex -> új sorindex (kumulált darabszám tábla)
+        id_rows = (np.cumsum(keep_rows, dtype=np.int32) - 1)[self.id_rows[keep_index]]
+        kept = {name: column[keep_rows] for name, column in self.columns.items()}
+        
+        # Új sorok beszúrása fizetés szerint
+        order = np.argsort(columns["salary_min"], kind="stable")
+        ids, columns = ids[order], {name: column[order] for name, column in columns.items()}
+        inserts = np.searchsorted(kept["salary_min"], columns["salary_min"], side="right")
+        merged = {name: np.insert(kept[name], inserts, columns[name]) for name in kept}
+        
+        shifts = np.cumsum(np.bincount(inserts, minlength=len(id_rows) + 1), dtype=np.int32)
+        id_rows += shifts[id_rows]
+        new_rows = (inserts + np.arange(len(inserts))).astype(np.int32)
+        by_id = np.argsort(ids)
+        slots = np.searchsorted(ids_sorted, ids[by_id])
+        ids_sorted = np.insert(ids_sorted, slots, ids[by_id])
+        id_rows = np.insert(id_rows, slots, new_rows[by_id])
+        
+        return SnapshotData(
+            merged, ids_sorted, id_rows, self.dictionaries,
+            max(filter(None, (self.watermark, watermark)), default=None)
+        )
+    
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name]
+    
+    def nth(self, mask: np.ndarray, ranks: Sequence[int]) -> np.ndarray:
+        """A maszk szerinti ranks-adik (0-tól) találatok sorindexei"""
+        full = (self.size // BLOCK_SIZE) * BLOCK_SIZE
+        counts = mask[:full].view(np.uint8).reshape(-1, BLOCK_SIZE).sum(axis=1, dtype=np.int64)
+        cumulative = np.cumsum(np.append(counts, np.count_nonzero(mask[full:])))
+        
+        rows = []
+        for rank in ranks:
+            block = int(np.searchsorted(cumulative, rank, side="right"))
+            before = int(cumulative[block - 1]) if block else 0
+            start = block * BLOCK_SIZE
+            rows.append(start + np.flatnonzero(mask[start:start + BLOCK_SIZE])[rank - before])
+        return np.array(rows)
+    
+    def totals(self) -> Tuple[int, int]:
+        """(darabszám, összeg) szűrő nélkül (példányonként egyszer számolva)"""
+        if self._totals is None:
+            self._totals = (self.size, int(self.column("salary_min").sum(dtype=np.int64)))
+        return self._totals
+
+
+def _quantile_ranks(count: int, quantiles: Sequence[float]) -> List[Tuple[int, int, float]]:
+    """Lineáris interpoláció (np.percentile alapértelmezése): (alsó, felső rang, súly)"""
+    ranks = []
+    for q in quantiles:
+        position = (count - 1) * q
+        lower = int(np.floor(position))
+        ranks.append((lower, min(lower + 1, count - 1), position - lower))
+    return ranks
+
+
+def _quantile_values(data: SnapshotData, mask: Optional[np.ndarray], count: int, quantiles: Sequence[float]) -> List[float]:
+    """A szűrt (count elemű) eloszlás kvantilisei a rendezett oszlopból (lineáris interpoláció)"""
+    ranks = _quantile_ranks(count, quantiles)
+    wanted = sorted({rank for lower, upper, _ in ranks for rank in (lower, upper)})
+    rows = np.array(wanted) if mask is None else data.nth(mask, wanted)
+    value = dict(zip(wanted, data.column("salary_min")[rows].tolist()))
+    return [value[lower] + (value[upper] - value[lower]) * weight for lower, upper, weight in ranks]
+
+
+class SalarySnapshot:
+    """
+    Opcionális analitikai motor (SALARY_SNAPSHOT_ENABLED)
+    
+    Az aktív, fizetéssel rendelkező állások havi fizetése (salary_monthly_min /
+    salary_monthly_max) és szótár kódolt dimenziói (munkakör, helyszín, tapasztalat,
+    kategória) NumPy tömbökben; a lekérdezések vektorizált maszkokkal
+    futnak, adatbázis nélkül. Workerenként egy példány: a háttér ciklus
+    (run) inkrementálisan frissít (updated_at vízjel), és a törölt állások
+    miatt időnként teljesen újratölt. A rendezés és az összefésülés külön
+    szálban fut, a kész pillanatkép egy lépésben cserélődik.
+    """
+    
+    def __init__(self, refresh_interval: float = 10.0, full_reload_interval: float = 900.0):
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.data: Optional[SnapshotData] = None
+        self.loaded_at = 0.0
+        self.refreshed_at: Optional[datetime] = None
+    
+    @property
+    def ready(self) -> bool:
+        return self.data is not None
+    
+    async def _rows(self, db: AsyncSession, query) -> AsyncIterator[Sequence]:
+        result = await db.stream(query.execution_options(yield_per=LOAD_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield rows
+    
+    async def load(self, db: AsyncSession):
+        """Teljes betöltés (id szerint rendezve olvasva) új szótárakkal"""
+        start = time.perf_counter()
+        dictionaries = Dictionaries()
+        chunks, watermark = [], None
+        
+        async for rows in self._rows(db, select(*SNAPSHOT_COLUMNS).select_from(SNAPSHOT_SOURCE).where(
+            Job.active == True,
+            Job.salary_monthly_min > 0
+        ).order_by(Job.id)):
+            chunks.append(dictionaries.encode(rows))
+            watermark = max(filter(None, (watermark, *(r.updated_at for r in rows))), default=None)
+        
+        ids = np.concatenate([chunk_ids for chunk_ids, _ in chunks]) if chunks else np.empty(0, "S16")
+        columns = {
+            name: np.concatenate([chunk[name] for _, chunk in chunks]) if chunks else np.empty(0, dtype)
+            for name, dtype in COLUMNS.items()
+        }
+        self.data = await asyncio.to_thread(
+            SnapshotData.from_id_ordered, ids, columns, dictionaries, watermark
+        )
+        self.loaded_at = time.monotonic()
+        self.refreshed_at = datetime.utcnow()
+        logger.info(
+            f"Salary snapshot loaded: {self.data.size} jobs, {self.data.nbytes / 2**20:.1f} MB "
+            f"in {time.perf_counter() - start:.2f} s"
+        )
+    
+    async def refresh(self, db: AsyncSession):
+        """A vízjel óta módosult állások összefésülése (a megszűntek kikerülnek)"""
+        data = self.data
+        if data.watermark is None:
+            await self.load(db)
+            return
+        
+        changed = []
+        async for rows in self._rows(db, select(*SNAPSHOT_COLUMNS).select_from(SNAPSHOT_SOURCE).where(
+            Job.updated_at >= data.watermark - REFRESH_OVERLAP
+        )):
+            changed.extend(rows)
+        
+        if changed:
+            keys = np.array([r.id.bytes for r in changed], dtype="S16")
+            ids, columns = data.dictionaries.encode([r for r in changed if eligible(r)])
+            watermark = max(filter(None, (r.updated_at for r in changed)), default=None)
+            self.data = await asyncio.to_thread(data.merged, keys, ids, columns, watermark)
+        self.refreshed_at = datetime.utcnow()
+    
+    async def run(self, sessions: async_sessionmaker):
+        """Háttér ciklus: frissítés refresh_interval másodpercenként"""
+        while True:
+            try:
+                async with sessions() as db:
+                    if not self.ready or time.monotonic() - self.loaded_at >= self.full_reload_interval:
+                        await self.load(db)
+                    else:
+                        await self.refresh(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Salary snapshot refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+    
+    def _mask(
+        self,
+        data: SnapshotData,
+        job_title: Optional[str],
+        match: str,
+        location: Optional[str],
+        experience_level: Optional[str],
+        category_id: Optional[UUID]
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Szűrő maszk
+        
+        Returns:
+            (értékelhető-e itt, maszk vagy None ha nincs szűrő); fuzzy
+            munkakör szűrő itt nem értékelhető
+        """
+        dictionaries = data.dictionaries
+        conditions = []
+        
+        if job_title:
+            if match == MATCH_EXACT:
+                conditions.append(data.column("title") == dictionaries.title.lookup(job_title))
+            elif match == MATCH_CONTAINS:
+                codes = dictionaries.title.containing(job_title)
+                if len(codes) <= MAX_OR_CODES:
+                    title_mask = np.zeros(data.size, dtype=bool)
+                    for code in codes:
+                        title_mask |= data.column("title") == code
+                else:
+                    lookup = np.zeros(len(dictionaries.title.values), dtype=bool)
+                    lookup[codes] = True
+                    title_mask = lookup[data.column("title")]
+                conditions.append(title_mask)
+            else:
+                return False, None
+        for name, value in (
+            ("location", location),
+            ("experience_level", experience_level),
+            ("category", category_id),
+        ):
+            if value:
+                conditions.append(data.column(name) == getattr(dictionaries, name).lookup(value))
+        
+        if not conditions:
+            return True, None
+        mask = conditions[0]
+        for condition in conditions[1:]:
+            mask &= condition
+        return True, mask
+    
+    def statistics(
+        self,
+        job_title: Optional[str] = None,
+        location: Optional[str] = None,
+        experience_level: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        match: str = MATCH_CONTAINS
+    ) -> Optional[Dict]:
+        """
+        Pontos fizetési statisztika (salary_monthly_min, np.percentile szerinti
+        lineáris interpolációval) tetszőleges szűrőkombinációra; None, ha a
+        pillanatkép nem elérhető vagy a szűrő nem értékelhető itt
+        """
+        data = self.data
+        if data is None:
+            return None
+        supported, mask = self._mask(data, job_title, match, location, experience_level, category_id)
+        if not supported:
+            return None
+        
+        salaries = data.column("salary_min")
+        if mask is None:
+            count, total = data.totals()
+        else:
+            count = int(np.count_nonzero(mask))
+            total = int((salaries * mask.view(np.uint8)).sum(dtype=np.int64)) if count else 0
+        
+        if not count:
+            return {
+                "avg": None, "min": None, "max": None, "median": None,
+                "percentile_25": None, "percentile_75": None, "sample_size": 0
+            }
+        
+        minimum, percentile_25, median, percentile_75, maximum = _quantile_values(
+            data, mask, count, (0, 0.25, 0.5, 0.75, 1)
+        )
+        
+        return {
+            "avg": round(total / count),
+            "min": round(minimum),
+            "max": round(maximum),
+            "median": round(median),
+            "percentile_25": round(percentile_25),
+            "percentile_75": round(percentile_75),
+            "sample_size": count
+        }
+    
+    def quantiles(
+        self,
+        quantiles: Sequence[float],
+        job_title: Optional[str] = None,
+        location: Optional[str] = None,
+        experience_level: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        match: str = MATCH_CONTAINS
+    ) -> Optional[List[float]]:
+        """
+        Pontos kvantilisek (0..1) a szűrt eloszlásban; None, ha a pillanatkép
+        nem elérhető, a szűrő nem értékelhető itt, vagy nincs találat
+        """
+        data = self.data
+        if data is None:
+            return None
+        supported, mask = self._mask(data, job_title, match, location, experience_level, category_id)
+        if not supported:
+            return None
+        count = data.size if mask is None else int(np.count_nonzero(mask))
+        if not count:
+            return None
+        return _quantile_values(data, mask, count, quantiles)
+    
+    def rank(
+        self,
+        salary: int,
+        job_title: Optional[str] = None,
+        location: Optional[str] = None,
+        experience_level: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        match: str = MATCH_CONTAINS
+    ) -> Optional[Dict]:
+        """
+        Egy havi fizetés helye a szűrt eloszlásban: percentile = az
+        alacsonyabb ajánlatok aránya (az egyenlők fele beszámít), százalékban
+        """
+        data = self.data
+        if data is None:
+            return None
+        supported, mask = self._mask(data, job_title, match, location, experience_level, category_id)
+        if not supported:
+            return None
+        
+        salaries = data.column("salary_min")
+        # Az int32 oszlop típusával keresünk (különben a tömb konvertálódna)
+        value = np.int32(min(max(salary, 0), np.iinfo(np.int32).max))
+        lower = int(np.searchsorted(salaries, value, side="left"))
+        upper = int(np.searchsorted(salaries, value, side="right"))
+        if mask is None:
+            count, below, equal = data.size, lower, upper - lower
+        else:
+            count = int(np.count_nonzero(mask))
+            below = int(np.count_nonzero(mask[:lower]))
+            equal = int(np.count_nonzero(mask[lower:upper]))
+        
+        return {
+            "salary": salary,
+            "percentile": round(100 * (below + equal / 2) / count, 1) if count else None,
+            "sample_size": count
+        }
+    
+    def info(self) -> Dict:
+        """Állapot az admin / monitoring számára"""
+        data = self.data
+        return {
+            "ready": data is not None,
+            "jobs": data.size if data else 0,
+            "memory_bytes": data.nbytes if data else 0,
+            "watermark": data.watermark.isoformat() if data and data.watermark else None,
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None
+        }
@@ -0,0 +1,186 @@
+"""
+Titles
+Munkakör megnevezések normalizálása és csoportosítása (kanonikus munkakörök)
+"""
+
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Tuple
+import re
+import unicodedata
+
+# Tapasztalati szint és munkavégzés módja: nem része a munkakörnek
+SENIORITY_TOKENS = {
+    "senior", "sr", "junior", "jr", "medior", "mid", "lead", "principal",
+    "staff", "intern", "trainee", "gyakornok", "palyakezdo",
+}
+REMOTE_TOKENS = {
+    "remote", "hybrid", "hibrid", "onsite", "homeoffice", "tavmunka",
+}
+# Többszavas kifejezések, amelyek a tokenizálás előtt kikerülnek
+REMOTE_PHRASES = re.compile(r"\b(home office|full remote|fully remote|on-site)\b", re.IGNORECASE)
+
+# Szinonimák (ékezet nélkül, kisbetűvel) -> egységes token(ek)
+SYNONYMS = {
+    "fejleszto": "developer",
+    "programozo": "developer",
+    "dev": "developer",
+    "szoftverfejleszto": "software developer",
+    "mernok": "engineer",
+    "tesztelo": "tester",
+    "qa": "tester",
+    "elemzo": "analyst",
+    "menedzser": "manager",
+    "projektmenedzser": "project manager",
+    "projekt": "project",
+    "konyvelo": "accountant",
+    "ertekesito": "sales",
+    "uzletkoto": "sales",
+    "rendszergazda": "sysadmin",
+    "rendszermernok": "system engineer",
+    "adatelemzo": "data analyst",
+    "grafikus": "designer",
+    "tervezo": "designer",
+}
+
+# Zárójeles megjegyzések, nem / forma jelölések (pl. "(remote)", "m/f/d")
+_BRACKETS_RE = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_GENDER_RE = re.compile(r"\b[mfwdx]\s*/\s*[mfwdx](\s*/\s*[mfwdx])?\b", re.IGNORECASE)
+# Szóhatáron belüli kötőjel összevonása ("front-end" -> "frontend")
+_JOINED_RE = re.compile(r"(?<=\w)-(?=\w)")
+_TOKEN_RE = re.compile(r"[a-z0-9+#.]+")
+# Megjelenítendő név végéről / elejéről levágott elválasztók
+_EDGE_SEPARATORS = " -–—|/,:;"
+
+# A kulcs legnagyobb hossza (title_aliases.key)
+KEY_MAX_LENGTH = 255
+
+# Offline csoportosításnál ekkora hasonlóság (SequenceMatcher) felett
+# két kulcs ugyanaz a munkakör (elgépelés, ragozás)
+TITLE_MERGE_RATIO = 0.92
+# Csak ennél hosszabb (legalább ennyi), csupa betű / szám tokenek
+# elgépelése vonható össze: a rövid vagy jelet tartalmazó tokenek
+# ("c" / "c#" / "c++", "go" / ".net") különböző munkakörök
+FUZZY_TOKEN_MIN_LENGTH = 4
+
+
+def fold(text: str) -> str:
+    """Ékezetek elhagyása, kisbetűsítés"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def _stripped(title: str) -> str:
+    return _GENDER_RE.sub(" ", _BRACKETS_RE.sub(" ", title))
+
+
+def display_name(title: str) -> str:
+    """
+    Megjelenítendő munkakör név: zárójeles megjegyzések, tapasztalati
+    szint és munkavégzés módja nélkül, az eredeti kis- és nagybetűkkel
+    ("Senior Java fejlesztő (remote)" -> "Java fejlesztő")
+    """
+    text = REMOTE_PHRASES.sub(" ", _stripped(title))
+    words = []
+    for word in text.split():
+        bare = word.strip(_EDGE_SEPARATORS)
+        if fold(bare) in SENIORITY_TOKENS or fold(bare) in REMOTE_TOKENS:
+            continue
+        # Egymást követő elválasztókból (pl. "Java - - Backend") egy marad
+        if not bare and (not words or not words[-1].strip(_EDGE_SEPARATORS)):
+            continue
+        words.append(word)
+    return " ".join(words).strip(_EDGE_SEPARATORS) or " ".join(title.split())
+
+
+def title_key(title: str) -> str:
+    """
+    Normalizált kulcs: ékezet nélküli, szinonimákkal egységesített,
+    rendezett tokenek ("Java Developer - Senior" és "Senior Java
+    fejlesztő (remote)" kulcsa egyaránt "developer java")
+    """
+    text = _JOINED_RE.sub("", REMOTE_PHRASES.sub(" ", fold(_stripped(title))))
+    tokens = set()
+    for token in _TOKEN_RE.findall(text):
+        token = token.strip(".")
+        if not token or token in SENIORITY_TOKENS or token in REMOTE_TOKENS:
+            continue
+        tokens.update(SYNONYMS.get(token, token).split())
+    key = " ".join(sorted(tokens)) or fold(" ".join(title.split()))
+    return key[:KEY_MAX_LENGTH]
+
+
+def _fuzzy_mergeable(key: str, candidate: str) -> bool:
+    """
+    Két kulcs hasonlóság szerint összevonható-e: pontosan egy tokenben
+    térnek el, és mindkét eltérő token legalább FUZZY_TOKEN_MIN_LENGTH
+    hosszú, csak betűből és számból áll
+    """
+    tokens, candidate_tokens = set(key.split()), set(candidate.split())
+    for differing in (tokens - candidate_tokens, candidate_tokens - tokens):
+        if len(differing) != 1:
+            return False
+        token = next(iter(differing))
+        if len(token) < FUZZY_TOKEN_MIN_LENGTH or not token.isalnum():
+            return False
+    return True
+
+
+def cluster_titles(counts: Dict[str, int]) -> Dict[str, Tuple[str, str]]:
+    """
+    Munkakörök csoportosítása (offline, a teljes címlistán)
+    
+    1. azonos kulcsú címek egy csoportba kerülnek
+    2. a ritkább kulcsok a gyakoribb, azonos tokenszámú és kezdetű,
+       TITLE_MERGE_RATIO felett hasonló kulcshoz csatlakoznak, ha csak egy
+       hosszabb, csupa betű / szám tokenben térnek el ("develoepr java" ->
+       "developer java", de "c developer" és "c# developer" külön marad)
+    3. a csoport neve a tagok leggyakoribb megjelenítendő neve
+    
+    Args:
+        counts: cím -> állások száma
+    
+    Returns:
+        kulcs -> (a csoport reprezentáns kulcsa, a csoport neve)
+    """
+    key_counts: Counter = Counter()
+    names: Dict[str, Counter] = defaultdict(Counter)
+    for title, count in counts.items():
+        key = title_key(title)
+        key_counts[key] += count
+        names[key][display_name(title)] += count
+    
+    # Gyakoriság szerint: a gyakoribb kulcs lesz a reprezentáns
+    representatives: Dict[Tuple[int, str], List[str]] = defaultdict(list)
+    parent: Dict[str, str] = {}
+    for key, _ in key_counts.most_common():
+        block = (key.count(" "), key[:1])
+        target = key
+        for candidate in representatives[block]:
+            if not _fuzzy_mergeable(key, candidate):
+                continue
+            matcher = SequenceMatcher(None, key, candidate, autojunk=False)
+            if (
+                matcher.real_quick_ratio() >= TITLE_MERGE_RATIO
+                and matcher.quick_ratio() >= TITLE_MERGE_RATIO
+                and matcher.ratio() >= TITLE_MERGE_RATIO
+            ):
+                target = candidate
+                break
+        if target == key:
+            representatives[block].append(key)
+        parent[key] = target
+    
+    cluster_names: Dict[str, Counter] = defaultdict(Counter)
+    for key, representative in parent.items():
+        cluster_names[representative].update(names[key])
+    
+    return {
+        key: (representative, cluster_names[representative].most_common(1)[0][0])
+        for key, representative in parent.items()
+    }
+
+
+def title_keys(titles: Iterable[str]) -> Dict[str, str]:
+    """cím -> kulcs (ismétlődő címek egyszer számolva)"""
+    return {title: title_key(title) for title in set(titles) if title}
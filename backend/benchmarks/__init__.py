@@ -0,0 +1,4 @@
+"""
+Benchmarks
+Teljesítménymérő szkriptek (futtatás a backend könyvtárból: python -m benchmarks.<név>)
+"""
@@ -0,0 +1,109 @@
+"""
+Párhuzamossági benchmark: lista / keresés / statisztika endpointok terhelés alatt
+
+Futó backend ellen N párhuzamos kliensből küld kéréseket, és endpointonként
+kiírja az áteresztőképességet (req/s) és a p50/p99 késleltetést. A szinkron
+(psycopg2) és az aszinkron (asyncpg) adatbázis réteg összehasonlításához
+ugyanazt a futtatást kell elvégezni mindkét verzió szerverén.
+
+Futtatás (a backend könyvtárból, futó szerver mellett):
+    python -m benchmarks.bench_concurrency --base-url http://localhost:8000 --clients 50 200
+"""
+
+from typing import Dict, List, Tuple
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from .common import summarize
+
+# (címke, útvonal, query paraméterek)
+ENDPOINTS: List[Tuple[str, str, Dict]] = [
+    ("list", "/api/jobs/", {"limit": 20}),
+    ("list location", "/api/jobs/", {"limit": 20, "location": "Budapest"}),
+    ("search", "/api/jobs/search/", {"q": "python"}),
+    ("search prefix", "/api/jobs/search/", {"q": "fejleszt*"}),
+    ("statistics", "/api/statistics/salary", {"job_title": "developer"}),
+    ("categories", "/api/categories/", {}),
+]
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    deadline: float,
+    samples: Dict[str, List[float]],
+    errors: Dict[str, int]
+):
+    """Egy kliens: a határidőig véletlen endpointokat hív egymás után"""
+    while time.perf_counter() < deadline:
+        label, path, params = random.choice(ENDPOINTS)
+        start = time.perf_counter()
+        try:
+            response = await client.get(path, params=params)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        
+        if ok:
+            samples[label].append(elapsed)
+        else:
+            errors[label] += 1
+
+
+async def run_level(base_url: str, clients: int, duration: float):
+    """Egy párhuzamossági szint lefuttatása és kiértékelése"""
+    samples = {label: [] for label, _, _ in ENDPOINTS}
+    errors = {label: 0 for label, _, _ in ENDPOINTS}
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # Bemelegítés (kapcsolat pool feltöltése)
+        await asyncio.gather(
+            *(client.get("/health") for _ in range(clients)), return_exceptions=True
+        )
+        
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            worker(client, deadline, samples, errors) for _ in range(clients)
+        ))
+        wall = time.perf_counter() - started
+    
+    print(f"\n== {clients} párhuzamos kliens, {wall:.1f} s ==")
+    all_samples = []
+    for label, values in samples.items():
+        all_samples.extend(values)
+        if not values:
+            print(f"{label:<16} nincs sikeres kérés, hibák={errors[label]}")
+            continue
+        result = summarize(values)
+        print(
+            f"{label:<16} {len(values) / wall:8.1f} req/s  p50={result['p50']:9.2f} ms  "
+            f"p99={result['p99']:9.2f} ms  hibák={errors[label]}"
+        )
+    
+    if all_samples:
+        result = summarize(all_samples)
+        print(
+            f"{'összesen':<16} {len(all_samples) / wall:8.1f} req/s  p50={result['p50']:9.2f} ms  "
+            f"p99={result['p99']:9.2f} ms  hibák={sum(errors.values())}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--duration", type=float, default=30.0, help="Mérési idő szintenként (s)")
+    args = parser.parse_args()
+    
+    for clients in args.clients:
+        asyncio.run(run_level(args.base_url, clients, args.duration))
+
+
+if __name__ == "__main__":
+    main()
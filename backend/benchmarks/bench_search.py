@@ -0,0 +1,101 @@
+"""
+Keresés benchmark: ILIKE '%q%' vs. teljes szöveges index
+
+Szintetikus (alapból 1M soros) bench_jobs táblán méri a régi ILIKE alapú és
+az új tsvector/GIN alapú keresés p50/p99 késleltetését.
+
+Futtatás (a backend könyvtárból, migrációk után):
+    python -m benchmarks.bench_search --rows 1000000 --iterations 200
+"""
+
+from sqlalchemy import text
+import argparse
+import random
+
+from app.utils.search import SEARCH_CONFIG
+from .common import (
+    COMPANIES, DESCRIPTION_WORDS, TITLE_WORDS,
+    get_engine, measure, print_result, sql_array,
+)
+
+# Gyakori szavak és ritka (szelektív) "termékkód" tokenek vegyesen
+COMMON_QUERIES = ["python", "fejlesztő", "Kubernetes", "ügyfélszolgálati", "értékesítési célok"]
+RARE_TOKENS = 10_000
+
+# Az endpoint oldal + darabszám lekérdezést futtat, mindkettőt mérjük
+LEGACY_PREDICATE = (
+    "active = true AND (title ILIKE :pattern OR description ILIKE :pattern "
+    "OR company ILIKE :pattern)"
+)
+LEGACY_PAGE_SQL = text(f"SELECT id FROM bench_jobs WHERE {LEGACY_PREDICATE} LIMIT 10")
+LEGACY_COUNT_SQL = text(f"SELECT count(*) FROM bench_jobs WHERE {LEGACY_PREDICATE}")
+
+FTS_PREDICATE = f"active = true AND search_vector @@ plainto_tsquery('{SEARCH_CONFIG}', :q)"
+FTS_PAGE_SQL = text(f"""
+    SELECT id FROM bench_jobs WHERE {FTS_PREDICATE}
+    ORDER BY ts_rank(search_vector, plainto_tsquery('{SEARCH_CONFIG}', :q)) DESC
+    LIMIT 10
+""")
+FTS_COUNT_SQL = text(f"SELECT count(*) FROM bench_jobs WHERE {FTS_PREDICATE}")
+
+
+def random_query() -> str:
+    """Véletlen keresőszó: fele gyakori, fele ritka token"""
+    if random.random() < 0.5:
+        return random.choice(COMMON_QUERIES)
+    return f"kod{random.randrange(RARE_TOKENS)}"
+
+
+def seed(conn, rows: int):
+    """bench_jobs tábla létrehozása és feltöltése"""
+    conn.execute(text("DROP TABLE IF EXISTS bench_jobs"))
+    conn.execute(text(
+        "CREATE TABLE bench_jobs (LIKE jobs INCLUDING DEFAULTS INCLUDING GENERATED)"
+    ))
+    conn.execute(text(f"""
+        INSERT INTO bench_jobs (id, title, company, description, active)
+        SELECT
+            gen_random_uuid(),
+            t[1 + (g * 7) % array_length(t, 1)] || ' ' || t[1 + (g * 13) % array_length(t, 1)],
+            c[1 + g % array_length(c, 1)],
+            (SELECT string_agg(d[1 + (n * 31 + g * 17) % array_length(d, 1)], ' ')
+               FROM generate_series(1, 30 + g % 40) AS w(n)) || ' kod' || (g % :rare),
+            true
+        FROM generate_series(1, :rows) AS g,
+             (SELECT {sql_array(TITLE_WORDS)} AS t,
+                     {sql_array(COMPANIES)} AS c,
+                     {sql_array(DESCRIPTION_WORDS)} AS d) AS vocab
+    """), {"rows": rows, "rare": RARE_TOKENS})
+    conn.execute(text("CREATE INDEX ON bench_jobs USING gin (search_vector)"))
+    conn.execute(text("ANALYZE bench_jobs"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--skip-seed", action="store_true", help="Meglévő bench_jobs tábla használata")
+    args = parser.parse_args()
+    
+    engine = get_engine()
+    if not args.skip_seed:
+        with engine.begin() as conn:
+            seed(conn, args.rows)
+    
+    with engine.connect() as conn:
+        def legacy():
+            params = {"pattern": f"%{random_query()}%"}
+            conn.execute(LEGACY_PAGE_SQL, params).fetchall()
+            conn.execute(LEGACY_COUNT_SQL, params).scalar()
+        
+        def fts():
+            params = {"q": random_query()}
+            conn.execute(FTS_PAGE_SQL, params).fetchall()
+            conn.execute(FTS_COUNT_SQL, params).scalar()
+        
+        print_result("ILIKE '%q%' (előtte)", measure(legacy, args.iterations))
+        print_result("tsvector @@ tsquery + ts_rank (utána)", measure(fts, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Szerializációs mikro-benchmark: 100 állásos lista válasz felépítése
+
+Adatbázis nélkül, memóriában előállított adatokon méri a válasz törzsének
+előállítását:
+- előtte: ORM objektumok -> Job.to_dict() -> jsonable_encoder -> json.dumps
+  (a FastAPI alapértelmezett JSONResponse útja)
+- utána: Core sorok -> előre generált serializer -> orjson.dumps
+
+Futtatás (a backend könyvtárból):
+    python -m benchmarks.bench_serialization --rows 100 --iterations 2000
+"""
+
+from fastapi.encoders import jsonable_encoder
+from asyncpg.pgproto.pgproto import UUID as PgUUID
+from fastapi.responses import JSONResponse
+from datetime import datetime, timedelta
+import argparse
+import random
+import uuid
+
+from app.models.job import Job
+from app.utils.projection import JOB_FIELDS, JOB_SUMMARY_FIELDS, serialize_job_rows
+from app.utils.serialization import FastJSONResponse
+from .common import COMPANIES, DESCRIPTION_WORDS, LOCATIONS, TITLE_WORDS, measure, print_result
+
+
+def make_jobs(rows: int):
+    """Szintetikus állások ORM objektumként és Core sorként"""
+    now = datetime.utcnow()
+    jobs = []
+    for i in range(rows):
+        created_at = now - timedelta(minutes=i)
+        jobs.append(Job(
+            id=uuid.uuid4(),
+            title=" ".join(random.sample(TITLE_WORDS, 3)),
+            company=random.choice(COMPANIES),
+            location=random.choice(LOCATIONS),
+            salary_min=random.randrange(300_000, 900_000, 10_000),
+            salary_max=random.randrange(900_000, 1_500_000, 10_000),
+            salary_currency="HUF",
+            salary_period="monthly",
+            experience_level="senior",
+            employment_type="full-time",
+            skills=random.sample(DESCRIPTION_WORDS, 5),
+            description=" ".join(random.choices(DESCRIPTION_WORDS, k=120)),
+            source_url=f"https://example.com/allas/{i}",
+            source_portal="profession.hu",
+            scraped_at=created_at,
+            verified=True,
+            active=True,
+            category_id=uuid.uuid4(),
+            created_at=created_at,
+            updated_at=created_at,
+        ))
+    
+    # Az asyncpg a UUID oszlopokat saját alosztályként adja vissza
+    def row(job, fields):
+        values = (getattr(job, name) for name in fields)
+        return tuple(PgUUID(str(v)) if isinstance(v, uuid.UUID) else v for v in values)
+    
+    rows_full = [row(job, JOB_FIELDS) for job in jobs]
+    rows_summary = [row(job, JOB_SUMMARY_FIELDS) for job in jobs]
+    return jobs, rows_full, rows_summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    
+    jobs, rows_full, rows_summary = make_jobs(args.rows)
+    
+    def legacy():
+        content = {"total": len(jobs), "jobs": [job.to_dict() for job in jobs]}
+        return JSONResponse(jsonable_encoder(content)).body
+    
+    def legacy_orjson():
+        content = {"total": len(jobs), "jobs": [job.to_dict() for job in jobs]}
+        return FastJSONResponse(jsonable_encoder(content)).body
+    
+    def rows_full_orjson():
+        content = {"total": len(rows_full), "jobs": serialize_job_rows(rows_full, JOB_FIELDS)}
+        return FastJSONResponse(content).body
+    
+    def rows_summary_orjson():
+        content = {"total": len(rows_summary), "jobs": serialize_job_rows(rows_summary, JOB_SUMMARY_FIELDS)}
+        return FastJSONResponse(content).body
+    
+    assert legacy_orjson() == rows_full_orjson(), "A két út kimenete eltér"
+    
+    print(f"{args.rows} állás / válasz")
+    print_result("to_dict + jsonable_encoder + json (előtte)", measure(legacy, args.iterations))
+    print_result("to_dict + jsonable_encoder + orjson", measure(legacy_orjson, args.iterations))
+    print_result("Row serializer + orjson, full", measure(rows_full_orjson, args.iterations))
+    print_result("Row serializer + orjson, summary", measure(rows_summary_orjson, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Analitikai pillanatkép benchmark: NumPy maszkos lekérdezések memóriában
+
+Szintetikus állásokból (adatbázis nélkül) épít SalarySnapshot-ot, és méri:
+- a betöltés idejét és a tömbök memóriaigényét
+- statistics() futásidejét szűrő nélkül, egy és több dimenzió szerinti
+  szűréssel, részszöveges munkakör szűréssel
+- rank() futásidejét
+- az inkrementális frissítés (összefésülés) idejét
+
+Futtatás (a backend könyvtárból):
+    python -m benchmarks.bench_snapshot --rows 1000000
+"""
+
+from collections import namedtuple
+from datetime import datetime
+import argparse
+import random
+import time
+import uuid
+
+import numpy as np
+
+from app.utils.snapshot import COLUMNS, Dictionaries, SalarySnapshot, SnapshotData, eligible
+from .common import LOCATIONS, TITLE_WORDS, measure, print_result
+
+Row = namedtuple("Row", [
+    "id", "salary_monthly_min", "salary_monthly_max", "title", "location",
+    "experience_level", "category_id", "active", "updated_at",
+])
+
+LEVELS = ["junior", "medior", "senior", "lead", None]
+
+
+def synthetic_rows(count: int, titles: int, categories: int):
+    """Id szerint rendezett szintetikus állások (mint a teljes betöltés)"""
+    rng = random.Random(42)
+    title_pool = [
+        " ".join(rng.sample(TITLE_WORDS, 3)) + f" {i}" for i in range(titles)
+    ]
+    category_pool = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(categories)]
+    now = datetime.utcnow()
+    
+    ids = sorted((uuid.UUID(int=rng.getrandbits(128)) for _ in range(count)), key=lambda u: u.bytes)
+    for job_id in ids:
+        salary = int(600000 * rng.lognormvariate(0, 0.35))
+        yield Row(
+            job_id, salary, int(salary * 1.3), rng.choice(title_pool),
+            rng.choice(LOCATIONS), rng.choice(LEVELS), rng.choice(category_pool), True, now,
+        )
+
+
+def build(rows) -> SalarySnapshot:
+    """Teljes betöltés a load() lépéseivel (kódolás kötegenként, rendezés)"""
+    snapshot = SalarySnapshot()
+    dictionaries = Dictionaries()
+    chunks = [dictionaries.encode(rows[start:start + 10000]) for start in range(0, len(rows), 10000)]
+    ids = np.concatenate([chunk_ids for chunk_ids, _ in chunks])
+    columns = {name: np.concatenate([chunk[name] for _, chunk in chunks]) for name in COLUMNS}
+    snapshot.data = SnapshotData.from_id_ordered(ids, columns, dictionaries, rows[-1].updated_at)
+    return snapshot
+
+
+def changed_rows(rows, count: int):
+    """Módosult állások (fizetésemelés, inaktiválás) egy inkrementális frissítéshez"""
+    rng = random.Random(7)
+    changed = []
+    for row in rng.sample(rows, count):
+        if rng.random() < 0.2:
+            changed.append(row._replace(active=False))
+        else:
+            changed.append(row._replace(salary_monthly_min=int(row.salary_monthly_min * 1.1)))
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--titles", type=int, default=5000)
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    
+    rows = list(synthetic_rows(args.rows, args.titles, args.categories))
+    start = time.perf_counter()
+    snapshot = build(rows)
+    print(
+        f"{args.rows} állás betöltve {time.perf_counter() - start:.2f} s alatt, "
+        f"tömbök: {snapshot.data.nbytes / 2**20:.1f} MB"
+    )
+    
+    sample = rows[len(rows) // 2]
+    cases = [
+        ("szűrő nélkül", {}),
+        ("helyszín", {"location": "Budapest"}),
+        ("kategória", {"category_id": sample.category_id}),
+        ("helyszín + tapasztalat + kategória", {
+            "location": "Budapest", "experience_level": "senior", "category_id": sample.category_id,
+        }),
+        ("pontos munkakör", {"job_title": sample.title, "match": "exact"}),
+        ("részszöveges munkakör", {"job_title": "Python", "match": "contains"}),
+    ]
+    
+    print()
+    for label, filters in cases:
+        print_result(f"statistics: {label}", measure(lambda: snapshot.statistics(**filters), args.iterations))
+    for label, filters in cases[:4]:
+        print_result(f"rank: {label}", measure(lambda: snapshot.rank(650000, **filters), args.iterations))
+    
+    data = snapshot.data
+    for count in (100, 10000):
+        changed = changed_rows(rows, count)
+        keys = np.array([r.id.bytes for r in changed], dtype="S16")
+        ids, columns = data.dictionaries.encode([r for r in changed if eligible(r)])
+        print_result(
+            f"merged: {count} módosult állás",
+            measure(lambda: data.merged(keys, ids, columns, None), max(args.iterations // 20, 3))
+        )
+
+
+if __name__ == "__main__":
+    main()
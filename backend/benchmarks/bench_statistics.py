@@ -0,0 +1,167 @@
+"""
+Statisztika újraszámolás benchmark: munkakörönkénti ciklus vs. egy utasítás
+
+Külön bench_stats sémában (jobs és salary_statistics másolat) méri a
+calculate_and_store_statistics futásidejét a különböző munkakörök számának
+függvényében:
+- előtte: munkakörönként egy ORM lekérdezés (teljes Job sorok), Python
+  rendezés és percentilisek, majd munkakörönként egy salary_statistics keresés
+- utána: egy csoportosító lekérdezés (percentile_cont) és egy INSERT ... ON CONFLICT
+
+Mindkét út üres (insert) és már feltöltött (update) statisztika táblával fut.
+
+Futtatás (a backend könyvtárból, migrációk után):
+    python -m benchmarks.bench_statistics --titles 100 1000 5000 --jobs-per-title 20
+"""
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import argparse
+import asyncio
+import time
+
+from app.config.database import async_database_url
+from app.config.settings import settings
+from app.models.job import Job
+from app.models.salary_statistics import SalaryStatistics
+from app.services.statistics_service import StatisticsService
+from .common import summarize, print_result
+
+SCHEMA = "bench_stats"
+
+
+async def legacy_calculate_and_store(db: AsyncSession):
+    """A korábbi, munkakörönként lekérdező implementáció (összehasonlításhoz)"""
+    job_titles = (await db.execute(select(Job.title).distinct())).all()
+    
+    for (title,) in job_titles:
+        jobs = (await db.execute(
+            select(Job).where(
+                Job.title == title,
+                Job.active == True,
+                Job.salary_min.isnot(None)
+            )
+        )).scalars().all()
+        
+        salaries = sorted(job.salary_min for job in jobs if job.salary_min)
+        if len(salaries) < 3:
+            continue
+        
+        values = dict(
+            avg_salary=sum(salaries) / len(salaries),
+            median_salary=salaries[len(salaries) // 2],
+            min_salary=min(salaries),
+            max_salary=max(salaries),
+            percentile_25=salaries[len(salaries) // 4],
+            percentile_75=salaries[(3 * len(salaries)) // 4],
+            sample_size=len(salaries),
+        )
+        
+        existing = (await db.execute(
+            select(SalaryStatistics).where(SalaryStatistics.job_title == title)
+        )).scalars().first()
+        
+        if existing:
+            for name, value in values.items():
+                setattr(existing, name, value)
+        else:
+            db.add(SalaryStatistics(job_title=title, **values))
+    
+    await db.commit()
+
+
+async def current_calculate_and_store(db: AsyncSession):
+    await StatisticsService(db).calculate_and_store_statistics()
+
+
+async def setup(engine):
+    """bench_stats séma létrehozása a két tábla szerkezetével"""
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.execute(text(
+            f"CREATE TABLE {SCHEMA}.jobs "
+            "(LIKE public.jobs INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING INDEXES)"
+        ))
+        await conn.execute(text(
+            f"CREATE TABLE {SCHEMA}.salary_statistics "
+            "(LIKE public.salary_statistics INCLUDING DEFAULTS INCLUDING INDEXES)"
+        ))
+
+
+async def seed(engine, titles: int, jobs_per_title: int):
+    """Szintetikus állások: titles különböző munkakör, munkakörönként jobs_per_title állás"""
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {SCHEMA}.jobs, {SCHEMA}.salary_statistics"))
+        # A séma másolatban nincs trigger: havi fizetésként ugyanaz az érték
+        await conn.execute(text(f"""
+            INSERT INTO {SCHEMA}.jobs (id, title, salary_min, salary_monthly_min, description, active)
+            SELECT
+                gen_random_uuid(),
+                'Munkakör ' || (g % :titles),
+                salary,
+                salary,
+                repeat('leírás ', 100),
+                true
+            FROM (
+                SELECT g, 300000 + (random() * 900000)::int AS salary
+                FROM generate_series(1, :rows) AS g
+            ) s
+        """), {"titles": titles, "rows": titles * jobs_per_title})
+        await conn.execute(text(f"ANALYZE {SCHEMA}.jobs"))
+
+
+async def timed(sessions, fn) -> float:
+    """Egy futás ideje ezredmásodpercben"""
+    async with sessions() as db:
+        start = time.perf_counter()
+        await fn(db)
+        return (time.perf_counter() - start) * 1000
+
+
+async def run(args):
+    engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        connect_args={"server_settings": {"search_path": f"{SCHEMA},public"}}
+    )
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    
+    try:
+        await setup(engine)
+        for titles in args.titles:
+            await seed(engine, titles, args.jobs_per_title)
+            print(f"\n{titles} munkakör, {titles * args.jobs_per_title} állás")
+            
+            for label, fn in (
+                ("munkakörönkénti ciklus (előtte)", legacy_calculate_and_store),
+                ("egy utasítás (utána)", current_calculate_and_store),
+            ):
+                inserts, updates = [], []
+                for _ in range(args.repeat):
+                    async with engine.begin() as conn:
+                        await conn.execute(text(f"TRUNCATE {SCHEMA}.salary_statistics"))
+                    inserts.append(await timed(sessions, fn))
+                    updates.append(await timed(sessions, fn))
+                
+                print_result(f"{label}, insert", summarize(inserts))
+                print_result(f"{label}, update", summarize(updates))
+    finally:
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--jobs-per-title", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="bench_stats séma megtartása")
+    args = parser.parse_args()
+    
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark segédfüggvények
+Időmérés, percentilis összesítés és szintetikus adatok
+"""
+
+from sqlalchemy import create_engine
+from typing import Callable, Dict, List
+import statistics
+import time
+
+from app.config.settings import settings
+
+# Szókészlet a szintetikus állásokhoz
+TITLE_WORDS = [
+    "Senior", "Junior", "Medior", "Lead", "Python", "Java", "Frontend", "Backend",
+    "Full Stack", "DevOps", "Data", "Sales", "Marketing", "HR", "Pénzügyi",
+    "Fejlesztő", "Developer", "Engineer", "Manager", "Specialist", "Elemző",
+    "Könyvelő", "Ügyfélszolgálati", "Munkatárs", "Tanácsadó", "Mérnök",
+]
+DESCRIPTION_WORDS = [
+    "tapasztalt", "fejlesztőt", "keresünk", "projektekhez", "csapatunkba",
+    "rugalmas", "munkaidő", "home", "office", "versenyképes", "fizetés",
+    "felhő", "infrastruktúra", "adatbázis", "ügyfelek", "kapcsolattartás",
+    "értékesítési", "célok", "elérése", "angol", "nyelvtudás", "előny",
+    "Budapest", "Debrecen", "Szeged", "Győr", "Pécs", "modern", "irodában",
+    "Python", "Django", "PostgreSQL", "Docker", "Kubernetes", "React",
+]
+COMPANIES = ["TechCorp Kft.", "StartUp Ltd.", "BigCorp Hungary", "AI Solutions", "CloudTech"]
+LOCATIONS = ["Budapest", "Debrecen", "Szeged", "Győr", "Pécs", "Miskolc", "Remote"]
+
+
+def get_engine():
+    """Benchmark engine a DATABASE_URL alapján"""
+    return create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+
+def sql_array(values: List[str]) -> str:
+    """Python lista -> SQL ARRAY literál"""
+    escaped = ", ".join("'" + v.replace("'", "''") + "'" for v in values)
+    return f"ARRAY[{escaped}]"
+
+
+def measure(fn: Callable[[], object], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    """Függvény futásidejének mérése, p50/p99 ezredmásodpercben"""
+    for _ in range(warmup):
+        fn()
+    
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    
+    return summarize(samples)
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Mérési minták összesítése"""
+    ordered = sorted(samples_ms)
+    return {
+        "n": len(ordered),
+        "p50": statistics.median(ordered),
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "mean": statistics.fmean(ordered),
+    }
+
+
+def print_result(label: str, result: Dict[str, float]):
+    """Eredmény sor kiírása"""
+    print(
+        f"{label:<40} n={result['n']:<5} p50={result['p50']:9.2f} ms  "
+        f"p99={result['p99']:9.2f} ms  mean={result['mean']:9.2f} ms"
+    )
@@ -6,11 +6,15 @@ FastAPI alkalmazás az állások és fizetési információk kezelésére
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import time
 import logging
 
 from app.config.settings import settings
+from app.config.database import SessionLocal, engine
+from app.utils.serialization import FastJSONResponse
 from app.routers import jobs, categories, statistics, admin
+from app.services.statistics_service import salary_snapshot
 
 # Logging beállítás
 logging.basicConfig(
@@ -25,7 +29,8 @@ app = FastAPI(
     description="API a magyar munkaerőpiaci fizetési információk kezeléséhez",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -95,6 +100,10 @@ async def startup_event():
     
     # Database kapcsolat ellenőrzése
     # await check_database_connection()
+    
+    # Analitikai pillanatkép betöltése és frissítése a háttérben
+    if settings.SALARY_SNAPSHOT_ENABLED:
+        app.state.snapshot_task = asyncio.create_task(salary_snapshot.run(SessionLocal))
 
 
 # Shutdown event
@@ -102,6 +111,10 @@ async def startup_event():
 async def shutdown_event():
     logger.info("👋 Application shutting down...")
     # Cleanup tasks
+    snapshot_task = getattr(app.state, "snapshot_task", None)
+    if snapshot_task:
+        snapshot_task.cancel()
+    await engine.dispose()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+"""
+Karbantartó parancsok
+
+Futtatás (a backend könyvtárból):
+    python manage.py reconcile-counters
+    python manage.py compute-statistics
+    python manage.py rebuild-sketches
+    python manage.py refresh-summaries
+    python manage.py append-trends
+    python manage.py backfill-monthly-salaries
+    python manage.py build-canonical-titles
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.config.database import SessionLocal, engine
+from app.services.counter_service import CounterService
+from app.services.job_service import JobService
+from app.services.statistics_service import StatisticsService
+from app.services.title_service import TitleService
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_counters(args):
+    """Állásszámlálók újraszámolása és az eltérések javítása"""
+    async with SessionLocal() as db:
+        result = await CounterService(db).reconcile()
+    logger.info(f"Job counters reconciled: {result['updated']} updated, {result['removed']} removed")
+
+
+async def compute_statistics(args):
+    """Fizetési statisztika kocka pontos újraszámolása (salary_statistics)"""
+    async with SessionLocal() as db:
+        result = await StatisticsService(db).calculate_and_store_statistics()
+    logger.info(f"Salary statistics stored: {result['stored']} cells, {result['removed']} removed")
+
+
+async def rebuild_sketches(args):
+    """Fizetési kvantilis vázlatok újraépítése a jobs táblából"""
+    async with SessionLocal() as db:
+        rows = await StatisticsService(db).rebuild_sketches()
+    logger.info(f"Salary sketches rebuilt: {rows} buckets")
+
+
+async def refresh_summaries(args):
+    """Materializált összesítők frissítése (ütemezve, pl. cron)"""
+    async with SessionLocal() as db:
+        await StatisticsService(db).refresh_summaries()
+    logger.info("Summary views refreshed")
+
+
+async def append_trends(args):
+    """Fizetési idősor összesítők bővítése a lezárt napokkal (naponta, pl. cron)"""
+    async with SessionLocal() as db:
+        result = await StatisticsService(db).append_trend_rollups()
+    logger.info(f"Salary trends appended: {result['days']} daily rows, {result['weeks']} weekly rows")
+
+
+async def backfill_monthly_salaries(args):
+    """Havi fizetés oszlopok kötegelt újraszámolása (az alembic 0014 elvégzi; pl. átváltási szabály módosítása után)"""
+    async with SessionLocal() as db:
+        result = await JobService(db).backfill_monthly_salaries()
+        await StatisticsService(db).refresh_summaries()
+    logger.info(f"Monthly salaries backfilled: {result['updated']} jobs updated in {result['batches']} batches")
+
+
+async def build_canonical_titles(args):
+    """Címek offline újracsoportosítása kanonikus munkakörökbe (pl. hetente, cron)"""
+    async with SessionLocal() as db:
+        result = await TitleService(db).rebuild()
+        await StatisticsService(db).refresh_summaries()
+    logger.info(
+        f"Canonical titles built: {result['titles']} titles in {result['canonical_titles']} "
+        f"canonical titles, {result['updated']} jobs reassigned"
+    )
+
+
+COMMANDS = {
+    "reconcile-counters": reconcile_counters,
+    "compute-statistics": compute_statistics,
+    "rebuild-sketches": rebuild_sketches,
+    "refresh-summaries": refresh_summaries,
+    "append-trends": append_trends,
+    "backfill-monthly-salaries": backfill_monthly_salaries,
+    "build-canonical-titles": build_canonical_titles,
+}
+
+
+async def run(args):
+    try:
+        await COMMANDS[args.command](args)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, command in COMMANDS.items():
+        subparsers.add_parser(name, help=command.__doc__)
+    
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Alap scraper osztály, amiből az összes konkrét scraper származik
 
 import requests
 from bs4 import BeautifulSoup
+import os
 import time
 import random
 import logging
@@ -14,6 +15,10 @@ from fake_useragent import UserAgent
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Backend API (tömeges betöltés: POST /api/jobs/bulk)
+BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://backend:8000")
+SAVE_BATCH_SIZE = 5000
+
 
 class BaseScraper:
     """Alap scraper osztály"""
@@ -29,7 +34,7 @@ class BaseScraper:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         }
-        
+    
     def _get_page(self, url: str, retries: int = 3) -> Optional[str]:
         """HTTP GET kérés rate limiting-gel"""
         for attempt in range(retries):
@@ -45,7 +50,7 @@ class BaseScraper:
                 
                 logger.info(f"Successfully fetched: {url}")
                 return response.text
-                
+            
             except requests.exceptions.RequestException as e:
                 logger.error(f"Error fetching {url} (attempt {attempt + 1}/{retries}): {e}")
                 if attempt == retries - 1:
@@ -72,11 +77,37 @@ class BaseScraper:
         """
         raise NotImplementedError("Parse job method must be implemented in subclass")
     
-    def save_to_db(self, jobs: List[Dict]):
-        """Állások mentése adatbázisba"""
-        # TODO: Database connection és mentés
-        logger.info(f"Saving {len(jobs)} jobs to database")
+    def save_to_db(self, jobs: List[Dict]) -> Dict[str, int]:
+        """
+        Állások mentése adatbázisba a backend bulk endpointján keresztül
+        Kötegenként egy kérés; a (source_portal, source_url) alapú
+        deduplikáció és frissítés a backendben történik.
+        """
+        totals = {"received": 0, "inserted": 0, "updated": 0, "skipped": 0}
         
+        for start in range(0, len(jobs), SAVE_BATCH_SIZE):
+            batch = jobs[start:start + SAVE_BATCH_SIZE]
+            try:
+                response = self.session.post(
+                    f"{BACKEND_API_URL}/api/jobs/bulk",
+                    json={"jobs": batch},
+                    timeout=120
+                )
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Error saving {len(batch)} jobs: {e}")
+                continue
+            
+            result = response.json()
+            for key in totals:
+                totals[key] += result.get(key, 0)
+        
+        logger.info(
+            f"Saved jobs from {self.portal_name}: {totals['inserted']} new, "
+            f"{totals['updated']} updated, {totals['skipped']} skipped"
+        )
+        return totals
+    
     def normalize_salary(self, salary_text: str) -> Dict:
         """
         Fizetés normalizálása
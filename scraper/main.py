@@ -36,6 +36,7 @@ class ScraperManager:
                 jobs = scraper.scrape(max_pages=max_pages)
                 results[name] = jobs
                 logger.info(f"Scraper {name} finished: {len(jobs)} jobs")
+                scraper.save_to_db(jobs)
             except Exception as e:
                 logger.error(f"Error in scraper {name}: {e}")
                 results[name] = []
@@ -52,6 +53,7 @@ class ScraperManager:
         try:
             jobs = self.scrapers[portal].scrape(max_pages=max_pages)
             logger.info(f"Scraper {portal} finished: {len(jobs)} jobs")
+            self.scrapers[portal].save_to_db(jobs)
             return jobs
         except Exception as e:
             logger.error(f"Error in scraper {portal}: {e}")